@@ -3,14 +3,22 @@ import math
 import random
 import sys
 
-pygame.init()
+import canvas
+import glows
+import gradients
+import layers
+import profiler
+import quality
+import scenes
+import stamps
+import text
+import textures
+import timing
 
 WIDTH, HEIGHT = 900, 700
-screen = pygame.display.set_mode((WIDTH, HEIGHT))
-pygame.display.set_caption("Lo-Fi Aesthetic Room")
-
-clock = pygame.time.Clock()
 FPS = 60
+ANIMATION_DURATION = 20000
+CAPTION = "Lo-Fi Aesthetic Room"
 
 # Aesthetic Color Palette
 SOFT_PURPLE = (162, 155, 254)
@@ -30,79 +38,44 @@ DARK_GREEN = (34, 139, 34)
 
 def create_wood_texture(width, height):
     """Create wooden desk/floor texture"""
-    surface = pygame.Surface((width, height))
-    
-    # Base wood color with grain
-    for y in range(height):
-        for x in range(width):
-            # Wood grain pattern
-            grain = int(10 * math.sin(y * 0.1) * math.cos(x * 0.05))
-            noise = random.randint(-8, 8)
-            color_val = WOOD_BROWN[0] + grain + noise
-            surface.set_at((x, y), (
-                max(50, min(255, color_val)),
-                max(40, min(255, int(color_val * 0.65))),
-                max(20, min(255, int(color_val * 0.43)))
-            ))
-    
-    # Add wood lines
-    for _ in range(15):
-        line_y = random.randint(0, height)
-        line_darkness = random.randint(20, 40)
-        for x in range(width):
-            wave = int(3 * math.sin(x * 0.02 + line_y))
-            y_pos = line_y + wave
-            if 0 <= y_pos < height:
-                current_color = surface.get_at((x, y_pos))
-                new_color = tuple(max(0, c - line_darkness) for c in current_color[:3])
-                surface.set_at((x, y_pos), new_color)
+    surface = canvas.surface((width, height))
+    
+    # Base wood color with grain, plus darker wood lines
+    textures.fill_wood_grain(surface, WOOD_BROWN[0], 8, 15)
     
     return surface
 
 def create_book_spine_texture(width, height, color):
     """Create book spine with title texture"""
-    surface = pygame.Surface((width, height))
+    surface = canvas.surface((width, height))
     
     # Base color with slight variation
-    for y in range(height):
-        for x in range(width):
-            noise = random.randint(-5, 5)
-            surface.set_at((x, y), tuple(max(0, min(255, c + noise)) for c in color))
+    textures.fill_noise(surface, color, 5)
     
     # Add spine lines
-    pygame.draw.line(surface, tuple(max(0, c - 30) for c in color), 
-                    (2, 0), (2, height), 1)
-    pygame.draw.line(surface, tuple(max(0, c - 30) for c in color), 
-                    (width - 2, 0), (width - 2, height), 1)
+    canvas.line(surface, tuple(max(0, c - 30) for c in color), 
+               (2, 0), (2, height), 1)
+    canvas.line(surface, tuple(max(0, c - 30) for c in color), 
+               (width - 2, 0), (width - 2, height), 1)
     
     # Add title lines (decorative)
     for i in range(3):
         y_pos = height // 4 + i * 8
-        pygame.draw.line(surface, GOLDEN, (5, y_pos), (width - 5, y_pos), 2)
+        canvas.line(surface, GOLDEN, (5, y_pos), (width - 5, y_pos), 2)
     
     return surface
 
 def create_wall_texture(width, height):
     """Create soft textured wall"""
-    surface = pygame.Surface((width, height))
+    surface = canvas.surface((width, height))
     
     # Soft gradient base
-    for y in range(height):
-        color_factor = y / height
-        color = (
-            int(LAVENDER[0] + (SOFT_PURPLE[0] - LAVENDER[0]) * color_factor * 0.3),
-            int(LAVENDER[1] + (SOFT_PURPLE[1] - LAVENDER[1]) * color_factor * 0.3),
-            int(LAVENDER[2] + (SOFT_PURPLE[2] - LAVENDER[2]) * color_factor * 0.3)
-        )
-        for x in range(width):
-            noise = random.randint(-3, 3)
-            final_color = tuple(max(0, min(255, c + noise)) for c in color)
-            surface.set_at((x, y), final_color)
+    textures.fill_noise(surface, LAVENDER, 3, gradient=(SOFT_PURPLE, 0.3))
     
     return surface
 
 def draw_plant(surface, x, y, time):
-    """Draw animated potted plant"""
+    """Draw animated potted plant; returns the rect it covers"""
     # Pot
     pot_points = [
         (x - 20, y + 30),
@@ -110,11 +83,11 @@ def draw_plant(surface, x, y, time):
         (x + 15, y),
         (x + 20, y + 30)
     ]
-    pygame.draw.polygon(surface, CORAL, pot_points)
-    pygame.draw.polygon(surface, tuple(max(0, c - 40) for c in CORAL), pot_points, 2)
+    canvas.polygon(surface, CORAL, pot_points)
+    rect = canvas.polygon(surface, tuple(max(0, c - 40) for c in CORAL), pot_points, 2)
     
     # Soil
-    pygame.draw.ellipse(surface, DARK_WOOD, (x - 15, y - 5, 30, 10))
+    canvas.ellipse(surface, DARK_WOOD, (x - 15, y - 5, 30, 10))
     
     # Leaves with gentle sway
     leaves = 8
@@ -128,326 +101,394 @@ def draw_plant(surface, x, y, time):
         end_y = y - abs(math.sin(leaf_angle)) * leaf_length
         
         # Leaf stem
-        pygame.draw.line(surface, DARK_GREEN, (x, y), (int(end_x), int(end_y)), 3)
+        canvas.line(surface, DARK_GREEN, (x, y), (int(end_x), int(end_y)), 3)
         
         # Leaf shape
         leaf_size = 12 + (i % 2) * 4
-        pygame.draw.ellipse(surface, PLANT_GREEN, 
-                          (int(end_x - leaf_size/2), int(end_y - leaf_size/2), 
-                           leaf_size, leaf_size))
-        pygame.draw.ellipse(surface, DARK_GREEN, 
-                          (int(end_x - leaf_size/2), int(end_y - leaf_size/2), 
-                           leaf_size, leaf_size), 1)
+        canvas.ellipse(surface, PLANT_GREEN, 
+                     (int(end_x - leaf_size/2), int(end_y - leaf_size/2), 
+                      leaf_size, leaf_size))
+        rect = rect.union(canvas.ellipse(surface, DARK_GREEN, 
+                                         (int(end_x - leaf_size/2), int(end_y - leaf_size/2), 
+                                          leaf_size, leaf_size), 1))
+    
+    return rect
 
 def draw_mug(surface, x, y, steam_particles):
     """Draw coffee mug with steam"""
     # Mug body
-    pygame.draw.rect(surface, SOFT_PINK, (x - 20, y, 40, 35))
-    pygame.draw.rect(surface, tuple(max(0, c - 40) for c in SOFT_PINK), 
-                    (x - 20, y, 40, 35), 2)
+    canvas.rect(surface, SOFT_PINK, (x - 20, y, 40, 35))
+    canvas.rect(surface, tuple(max(0, c - 40) for c in SOFT_PINK), 
+               (x - 20, y, 40, 35), 2)
     
     # Handle
-    pygame.draw.arc(surface, SOFT_PINK, (x + 15, y + 5, 15, 25), 
-                   -math.pi/2, math.pi/2, 3)
+    canvas.arc(surface, SOFT_PINK, (x + 15, y + 5, 15, 25), 
+              -math.pi/2, math.pi/2, 3)
     
     # Coffee surface
-    pygame.draw.ellipse(surface, (101, 67, 33), (x - 18, y + 2, 36, 10))
+    canvas.ellipse(surface, (101, 67, 33), (x - 18, y + 2, 36, 10))
     
     # Heart latte art
-    pygame.draw.circle(surface, CREAM, (x - 5, y + 6), 4)
-    pygame.draw.circle(surface, CREAM, (x + 5, y + 6), 4)
+    canvas.circle(surface, CREAM, (x - 5, y + 6), 4)
+    canvas.circle(surface, CREAM, (x + 5, y + 6), 4)
     points = [(x - 8, y + 7), (x, y + 12), (x + 8, y + 7)]
-    pygame.draw.polygon(surface, CREAM, points)
+    canvas.polygon(surface, CREAM, points)
 
-# Create textures
-wall_texture = create_wall_texture(WIDTH, HEIGHT // 2)
-desk_texture = create_wood_texture(WIDTH, 200)
-floor_texture = create_wood_texture(WIDTH, 300)
-
-# Books
-books = []
+# Books on the desk: x, y, width, height, color. The layout is seeded like
+# the textures so the book spines can come from the texture cache.
+book_data = []
 book_colors = [SOFT_PURPLE, CORAL, MINT, SOFT_PINK, SOFT_BLUE, PEACH]
+book_layout = random.Random(textures.SEED)
 book_x = 100
 for i in range(8):
-    width = random.randint(25, 40)
-    height = random.randint(120, 160)
-    books.append({
-        'texture': create_book_spine_texture(width, height, random.choice(book_colors)),
+    width = book_layout.randint(25, 40)
+    height = book_layout.randint(120, 160)
+    book_data.append({
         'x': book_x,
         'y': 350 - height,
         'width': width,
-        'height': height
+        'height': height,
+        'color': book_layout.choice(book_colors)
     })
     book_x += width + 2
 
-# Floating particles (dust in light)
-particles = []
-for _ in range(40):
-    particles.append({
-        'x': random.randint(0, WIDTH),
-        'y': random.randint(0, HEIGHT // 2),
-        'speed_y': random.uniform(0.2, 0.5),
-        'speed_x': random.uniform(-0.1, 0.1),
-        'size': random.randint(1, 3),
-        'alpha': random.uniform(0.3, 0.8)
-    })
+# Textures: name -> (generator, args, placeholder colour[, textures.SCALABLE]),
+# loaded by textures.load()
+TEXTURES = {
+    'wall': (create_wall_texture, (WIDTH, HEIGHT // 2), LAVENDER, textures.SCALABLE),
+    'desk': (create_wood_texture, (WIDTH, 200), WOOD_BROWN, textures.SCALABLE),
+    'floor': (create_wood_texture, (WIDTH, 300), WOOD_BROWN, textures.SCALABLE),
+}
+for i, book in enumerate(book_data):
+    TEXTURES[f'book{i}'] = (create_book_spine_texture,
+                             (book['width'], book['height'], book['color']), book['color'])
 
-# Steam particles
-steam_particles = []
-
-# Window rain drops
-rain_drops = []
-for _ in range(30):
-    rain_drops.append({
-        'x': random.randint(520, 720),
-        'y': random.randint(80, 280),
-        'length': random.randint(15, 30),
-        'speed': random.uniform(1, 3)
-    })
+class Scene:
+    """A cosy room on a rainy day, with fairy lights, a steaming mug and a sleeping cat"""
 
-# Fairy lights
-fairy_lights = []
-for i in range(12):
-    fairy_lights.append({
-        'x': 50 + i * 70,
-        'y': 50,
-        'phase': random.uniform(0, math.pi * 2),
-        'color': random.choice([SOFT_PINK, SOFT_BLUE, GOLDEN, MINT])
-    })
+    def __init__(self, screen, texture):
+        self.screen = screen
+        # Simulation randomness has a stream of its own, so the random flicker
+        # drawn each frame never changes what happens next
+        self.random = random.Random(random.getrandbits(64))
 
-# Music notes
-music_notes = []
+        # Books
+        books = []
+        for i, book in enumerate(book_data):
+            books.append(dict(book, texture=texture[f'book{i}']))
 
-start_time = pygame.time.get_ticks()
-ANIMATION_DURATION = 20000
+        # Floating particles (dust in light)
+        self.particles = []
+        for _ in range(40):
+            particle = {
+                'x': random.randint(0, WIDTH),
+                'y': random.randint(0, HEIGHT // 2),
+                'speed_y': random.uniform(0.2, 0.5),
+                'speed_x': random.uniform(-0.1, 0.1),
+                'size': random.randint(1, 3),
+                'alpha': random.uniform(0.3, 0.8)
+            }
+            particle['previous'] = (particle['x'], particle['y'])
+            self.particles.append(particle)
 
-running = True
-while running:
-    current_time = pygame.time.get_ticks()
-    elapsed_time = current_time - start_time
-    
-    if elapsed_time > ANIMATION_DURATION:
-        pygame.time.wait(1000)
-        running = False
-    
-    time_normalized = elapsed_time / ANIMATION_DURATION
-    
-    for event in pygame.event.get():
-        if event.type == pygame.QUIT:
-            running = False
-        if event.type == pygame.KEYDOWN:
-            if event.key == pygame.K_ESCAPE:
-                running = False
-    
-    # Draw textured wall
-    screen.blit(wall_texture, (0, 0))
-    
-    # Draw window with view
-    window_rect = (520, 80, 200, 200)
-    
-    # Window - sky view
-    sky_gradient = pygame.Surface((200, 200))
-    for y in range(200):
-        color_factor = y / 200
-        color = (
-            int(SOFT_BLUE[0] + (SOFT_PURPLE[0] - SOFT_BLUE[0]) * color_factor),
-            int(SOFT_BLUE[1] + (SOFT_PURPLE[1] - SOFT_BLUE[1]) * color_factor),
-            int(SOFT_BLUE[2] + (SOFT_PURPLE[2] - SOFT_BLUE[2]) * color_factor)
-        )
-        pygame.draw.line(sky_gradient, color, (0, y), (200, y))
-    screen.blit(sky_gradient, (520, 80))
-    
-    # Rain on window
-    for drop in rain_drops:
-        drop['y'] += drop['speed']
-        if drop['y'] > 280:
-            drop['y'] = 80
-            drop['x'] = random.randint(520, 720)
-        pygame.draw.line(screen, SOFT_BLUE, 
-                        (int(drop['x']), int(drop['y'])),
-                        (int(drop['x'] + 2), int(drop['y'] + drop['length'])), 2)
-    
-    # Window frame
-    pygame.draw.rect(screen, CREAM, window_rect, 8)
-    pygame.draw.line(screen, CREAM, (620, 80), (620, 280), 8)
-    pygame.draw.line(screen, CREAM, (520, 180), (720, 180), 8)
-    
-    # Draw fairy lights
-    for light in fairy_lights:
-        light['phase'] += 0.05
-        brightness = (math.sin(light['phase']) + 1) / 2
-        
-        # Glow
-        for i in range(3, 0, -1):
-            glow_color = tuple(int(c * brightness * 0.4) for c in light['color'])
-            pygame.draw.circle(screen, glow_color, (light['x'], light['y']), 8 + i * 2)
-        
-        # Light bulb
-        color = tuple(int(c * (0.6 + brightness * 0.4)) for c in light['color'])
-        pygame.draw.circle(screen, color, (light['x'], light['y']), 6)
+        # Steam particles
+        self.steam_particles = steam_particles = []
+
+        # Window rain drops
+        self.rain_drops = []
+        for _ in range(30):
+            y = random.randint(80, 280)
+            self.rain_drops.append({
+                'x': random.randint(520, 720),
+                'y': y,
+                'previous_y': y,
+                'length': random.randint(15, 30),
+                'speed': random.uniform(1, 3)
+            })
+
+        # Fairy lights
+        self.fairy_lights = []
+        for i in range(12):
+            self.fairy_lights.append({
+                'x': 50 + i * 70,
+                'y': 50,
+                'phase': random.uniform(0, math.pi * 2),
+                'color': random.choice([SOFT_PINK, SOFT_BLUE, GOLDEN, MINT])
+            })
+
+        # Music notes
+        self.music_notes = []
+
+        # Positions of the desk items
+        window_rect = (520, 80, 200, 200)
+        self.laptop_x, self.laptop_y = laptop_x, laptop_y = 400, 280
+        self.mug_x, self.mug_y = mug_x, mug_y = 320, 310
+        self.vinyl_x, self.vinyl_y = vinyl_x, vinyl_y = 680, 300
+
+        # The wire from one fairy light to the next, blitted along with their glow
+        self.wire = wire = canvas.surface((72, 4))
+        wire.fill(layers.TRANSPARENT_KEY)
+        canvas.line(wire, DARK_WOOD, (0, 2), (70, 2), 2)
+        wire.set_colorkey(layers.TRANSPARENT_KEY)
+
+        def draw_window_frame(surface):
+            canvas.rect(surface, CREAM, window_rect, 8)
+            canvas.line(surface, CREAM, (620, 80), (620, 280), 8)
+            canvas.line(surface, CREAM, (520, 180), (720, 180), 8)
+
+        def draw_laptop_screen(surface):
+            # Screen
+            canvas.rect(surface, DEEP_BLUE, (laptop_x, laptop_y, 140, 100))
+            # Screen glow
+            canvas.rect(surface, SOFT_BLUE, (laptop_x + 5, laptop_y + 5, 130, 90))
+
+        def draw_books(surface):
+            for book in books:
+                canvas.blit(surface, book['texture'], (book['x'], book['y']))
+
+        def draw_record_player(surface):
+            # Base
+            canvas.rect(surface, WOOD_BROWN, (vinyl_x - 40, vinyl_y, 80, 50))
+            # Record
+            canvas.circle(surface, (20, 20, 20), (vinyl_x, vinyl_y + 15), 35)
+            canvas.circle(surface, DARK_WOOD, (vinyl_x, vinyl_y + 15), 5)
+            # Grooves
+            for r in range(30, 10, -4):
+                canvas.circle(surface, (40, 40, 40), (vinyl_x, vinyl_y + 15), r, 1)
+
+        # Static parts of the room, baked once. Animated elements are drawn in
+        # between them, so every run after the first is a transparent layer.
+        room = layers.StaticLayer((WIDTH, HEIGHT))
+        room.add('wall', lambda surface: canvas.blit(surface, texture['wall'], (0, 0)),
+                 key=lambda: texture.version)
+        room.add('window_sky', lambda surface: canvas.blit(surface,
+            gradients.vertical((200, 200), SOFT_BLUE, SOFT_PURPLE), (520, 80)))
+
+        self.window_frame = window_frame = layers.StaticLayer((WIDTH, HEIGHT), transparent=True)
+        window_frame.add('frame', draw_window_frame)
+
+        self.desk = desk = layers.StaticLayer((WIDTH, HEIGHT), transparent=True)
+        desk.add('floor', lambda surface: canvas.blit(surface, texture['floor'], (0, HEIGHT - 300)),
+                 key=lambda: texture.version)
+        desk.add('desk', lambda surface: canvas.blit(surface, texture['desk'], (0, 350)),
+                 key=lambda: texture.version)
+        desk.add('laptop_screen', draw_laptop_screen)
+
+        self.bookshelf = bookshelf = layers.StaticLayer((WIDTH, HEIGHT), transparent=True)
+        bookshelf.add('keyboard', lambda surface: canvas.rect(
+            surface, tuple(max(0, c - 20) for c in DEEP_BLUE), (laptop_x - 10, laptop_y + 100, 160, 40)))
+        bookshelf.add('books', draw_books, key=lambda: texture.version)
+
+        self.desk_items = desk_items = layers.StaticLayer((WIDTH, HEIGHT), transparent=True)
+        desk_items.add('mug', lambda surface: draw_mug(surface, mug_x, mug_y, steam_particles))
+        desk_items.add('record_player', draw_record_player)
+
+        # Redraws and presents only what moved when dirty-rect mode is on
+        self.frame = layers.DirtyRects(screen, [room, window_frame, desk, bookshelf, desk_items])
+
+        # The sleeping cat's "Z z z" never changes, so it is rendered once
+        self.zzz_text = text.font(canvas.pixels(24)).render("Z z z", True, SOFT_PURPLE)
+
+        # Timer with a soft glow
+        self.timer_glow = text.GlowText(42, CREAM, SOFT_PURPLE, range(3, 0, -1),
+                                        glow_alpha=lambda offset: 100 - offset * 30)
+
+    def update(self, elapsed_time):
+        """Advance the rain, lights, dust, steam and music notes by one step"""
+        # Rain on window
+        for drop in self.rain_drops:
+            drop['previous_y'] = drop['y']
+            drop['y'] += drop['speed']
+            if drop['y'] > 280:
+                drop['y'] = drop['previous_y'] = 80
+                drop['x'] = self.random.randint(520, 720)
+    
+        for light in self.fairy_lights:
+            light['phase'] += 0.05
+    
+        # Floating dust
+        for particle in self.particles:
+            particle['previous'] = (particle['x'], particle['y'])
+            particle['y'] += particle['speed_y']
+            particle['x'] += particle['speed_x']
         
-        # Wire
-        if light['x'] < WIDTH - 70:
-            pygame.draw.line(screen, DARK_WOOD, 
-                           (light['x'], light['y']), 
-                           (light['x'] + 70, light['y']), 2)
-    
-    # Draw floating particles
-    for particle in particles:
-        particle['y'] += particle['speed_y']
-        particle['x'] += particle['speed_x']
+            if particle['y'] > HEIGHT // 2:
+                particle['y'] = 0
+                particle['x'] = self.random.randint(0, WIDTH)
+                particle['previous'] = (particle['x'], particle['y'])
+    
+        # Generate steam particles
+        if self.random.random() > 0.7:
+            x = self.mug_x + self.random.randint(-5, 5)
+            self.steam_particles.append({
+                'x': x,
+                'y': self.mug_y,
+                'previous': (x, self.mug_y),
+                'speed': self.random.uniform(0.5, 1.0),
+                'life': 100,
+                'size': self.random.randint(3, 6)
+            })
+    
+        for steam in self.steam_particles[:]:
+            steam['previous'] = (steam['x'], steam['y'])
+            steam['y'] -= steam['speed']
+            steam['x'] += math.sin(steam['y'] * 0.1) * 0.5
+            steam['life'] -= 1
         
-        if particle['y'] > HEIGHT // 2:
-            particle['y'] = 0
-            particle['x'] = random.randint(0, WIDTH)
+            if steam['life'] <= 0:
+                self.steam_particles.remove(steam)
+    
+        # Music notes floating
+        if self.random.random() > 0.97:
+            self.music_notes.append({
+                'x': self.vinyl_x + self.random.randint(-20, 20),
+                'y': self.vinyl_y,
+                'previous_y': self.vinyl_y,
+                'life': 100,
+                'type': self.random.choice(['♪', '♫'])
+            })
+    
+        for note in self.music_notes[:]:
+            note['previous_y'] = note['y']
+            note['y'] -= 1
+            note['life'] -= 1
         
-        alpha = int(255 * particle['alpha'] * (math.sin(elapsed_time * 0.001 + particle['x']) * 0.5 + 0.5))
-        color = (*GOLDEN[:3], alpha)
-        pygame.draw.circle(screen, GOLDEN, 
-                         (int(particle['x']), int(particle['y'])), particle['size'])
-    
-    # Draw floor
-    screen.blit(floor_texture, (0, HEIGHT - 300))
-    
-    # Draw desk
-    screen.blit(desk_texture, (0, 350))
-    
-    # Draw desk items
-    
-    # Laptop
-    laptop_x, laptop_y = 400, 280
-    # Screen
-    pygame.draw.rect(screen, DEEP_BLUE, (laptop_x, laptop_y, 140, 100))
-    # Screen glow
-    pygame.draw.rect(screen, SOFT_BLUE, (laptop_x + 5, laptop_y + 5, 130, 90))
-    
-    # Code lines on screen
-    for i in range(6):
-        line_width = random.randint(60, 120)
-        pygame.draw.rect(screen, SOFT_PURPLE, 
-                        (laptop_x + 10, laptop_y + 10 + i * 13, line_width, 8))
-    
-    # Keyboard
-    pygame.draw.rect(screen, tuple(max(0, c - 20) for c in DEEP_BLUE), 
-                    (laptop_x - 10, laptop_y + 100, 160, 40))
-    
-    # Books on desk
-    for book in books:
-        screen.blit(book['texture'], (book['x'], book['y']))
-    
-    # Plant
-    draw_plant(screen, 150, 320, time_normalized)
-    
-    # Coffee mug with steam
-    mug_x, mug_y = 320, 310
-    
-    # Generate steam particles
-    if random.random() > 0.7:
-        steam_particles.append({
-            'x': mug_x + random.randint(-5, 5),
-            'y': mug_y,
-            'speed': random.uniform(0.5, 1.0),
-            'life': 100,
-            'size': random.randint(3, 6)
-        })
-    
-    # Draw steam
-    for steam in steam_particles[:]:
-        steam['y'] -= steam['speed']
-        steam['x'] += math.sin(steam['y'] * 0.1) * 0.5
-        steam['life'] -= 1
+            if note['life'] <= 0:
+                self.music_notes.remove(note)
+
+    def draw(self, elapsed_time, alpha):
+        """Draw the scene at ``elapsed_time``, ``alpha`` of the way through the last step"""
+        screen = self.screen
+        frame = self.frame
+        laptop_x, laptop_y = self.laptop_x, self.laptop_y
+    
+        time_normalized = elapsed_time / ANIMATION_DURATION
+    
+        # Draw textured wall and window with view
+        profiler.phase("room")
+        frame.clear()
+    
+        # Rain on window
+        profiler.phase("rain")
+        for drop in self.rain_drops:
+            y = timing.lerp(drop['previous_y'], drop['y'], alpha)
+            frame.add(canvas.line(screen, SOFT_BLUE, 
+                                  (int(drop['x']), int(y)),
+                                  (int(drop['x'] + 2), int(y + drop['length'])), 2))
+    
+        # Window frame
+        frame.cover(self.window_frame)
+    
+        # Soft glow around the bulbs, under them
+        profiler.phase("glows")
+        light_glows = [(20, light['color'], (math.sin(light['phase']) + 1) / 2 * 0.6,
+                        (light['x'], light['y'])) for light in self.fairy_lights]
+        for rect in glows.draw(screen, light_glows):
+            frame.add(rect)
+    
+        # Draw fairy lights
+        profiler.phase("lights")
+        light_stamps = []
+        for light in self.fairy_lights:
+            brightness = (math.sin(light['phase']) + 1) / 2
         
-        if steam['life'] <= 0:
-            steam_particles.remove(steam)
-        else:
-            alpha = steam['life'] / 100
-            color = tuple(int(c * alpha) for c in CREAM)
-            pygame.draw.circle(screen, color, 
-                             (int(steam['x']), int(steam['y'])), steam['size'])
-    
-    draw_mug(screen, mug_x, mug_y, steam_particles)
-    
-    # Vinyl record player
-    vinyl_x, vinyl_y = 680, 300
-    # Base
-    pygame.draw.rect(screen, WOOD_BROWN, (vinyl_x - 40, vinyl_y, 80, 50))
-    # Record
-    rotation = elapsed_time * 0.001
-    pygame.draw.circle(screen, (20, 20, 20), (vinyl_x, vinyl_y + 15), 35)
-    pygame.draw.circle(screen, DARK_WOOD, (vinyl_x, vinyl_y + 15), 5)
-    # Grooves
-    for r in range(30, 10, -4):
-        pygame.draw.circle(screen, (40, 40, 40), (vinyl_x, vinyl_y + 15), r, 1)
-    
-    # Music notes floating
-    if random.random() > 0.97:
-        music_notes.append({
-            'x': vinyl_x + random.randint(-20, 20),
-            'y': vinyl_y,
-            'life': 100,
-            'type': random.choice(['♪', '♫'])
-        })
-    
-    font = pygame.font.Font(None, 36)
-    for note in music_notes[:]:
-        note['y'] -= 1
-        note['life'] -= 1
+            # Light bulb
+            bulb_stamp = stamps.circle(6, light['color'], 0.6 + brightness * 0.4)
+            light_stamps.append(stamps.at(bulb_stamp, (light['x'], light['y'])))
         
-        if note['life'] <= 0:
-            music_notes.remove(note)
-        else:
-            alpha = note['life'] / 100
-            color = tuple(int(c * alpha) for c in SOFT_PURPLE)
+            # Wire
+            if light['x'] < WIDTH - 70:
+                light_stamps.append((self.wire, canvas.point((light['x'], light['y'] - 2))))
+        for rect in screen.blits(light_stamps):
+            frame.add(rect)
+    
+        # Draw floating particles
+        profiler.phase("dust")
+        for particle in self.particles[:quality.scale(len(self.particles))]:
+            x = timing.lerp(particle['previous'][0], particle['x'], alpha)
+            y = timing.lerp(particle['previous'][1], particle['y'], alpha)
+            frame.add(canvas.circle(screen, GOLDEN, (int(x), int(y)), particle['size']))
+    
+        # Draw floor, desk and laptop screen
+        profiler.phase("desk")
+        frame.cover(self.desk)
+    
+        # Code lines on screen
+        for i in range(6):
+            line_width = random.randint(60, 120)
+            frame.add(canvas.rect(screen, SOFT_PURPLE, 
+                                  (laptop_x + 10, laptop_y + 10 + i * 13, line_width, 8)))
+    
+        # Keyboard and books on desk
+        frame.cover(self.bookshelf)
+    
+        # Plant
+        profiler.phase("plant")
+        frame.add(draw_plant(screen, 150, 320, time_normalized))
+    
+        # Coffee mug with steam
+        profiler.phase("steam")
+        for steam in self.steam_particles:
+            x = timing.lerp(steam['previous'][0], steam['x'], alpha)
+            y = timing.lerp(steam['previous'][1], steam['y'], alpha)
+            steam_alpha = steam['life'] / 100
+            color = tuple(int(c * steam_alpha) for c in CREAM)
+            frame.add(canvas.circle(screen, color, (int(x), int(y)), steam['size']))
+    
+        # Mug and vinyl record player
+        frame.cover(self.desk_items)
+    
+        # Music notes floating
+        profiler.phase("notes")
+        font = text.font(canvas.pixels(36))
+        for note in self.music_notes:
+            y = timing.lerp(note['previous_y'], note['y'], alpha)
+            note_alpha = note['life'] / 100
+            color = tuple(int(c * note_alpha) for c in SOFT_PURPLE)
             note_text = font.render(note['type'], True, color)
-            screen.blit(note_text, (int(note['x']), int(note['y'])))
-    
-    # Cat sleeping on desk corner
-    cat_x, cat_y = 750, 330
-    # Body
-    pygame.draw.ellipse(screen, PEACH, (cat_x, cat_y, 80, 40))
-    # Head
-    head_bob = math.sin(elapsed_time * 0.002) * 2
-    pygame.draw.circle(screen, PEACH, (cat_x + 20, int(cat_y + 10 + head_bob)), 18)
-    # Ears
-    pygame.draw.polygon(screen, PEACH, [
-        (cat_x + 12, cat_y + head_bob),
-        (cat_x + 7, cat_y - 8 + head_bob),
-        (cat_x + 17, cat_y + 5 + head_bob)
-    ])
-    pygame.draw.polygon(screen, PEACH, [
-        (cat_x + 28, cat_y + head_bob),
-        (cat_x + 33, cat_y - 8 + head_bob),
-        (cat_x + 23, cat_y + 5 + head_bob)
-    ])
-    # Closed eyes (sleeping)
-    pygame.draw.arc(screen, (0, 0, 0), (cat_x + 12, cat_y + 12 + head_bob, 6, 4), 
-                   0, math.pi, 2)
-    pygame.draw.arc(screen, (0, 0, 0), (cat_x + 20, cat_y + 12 + head_bob, 6, 4), 
-                   0, math.pi, 2)
-    # ZZZ
-    zzz_font = pygame.font.Font(None, 24)
-    zzz_y = cat_y - 20 + math.sin(elapsed_time * 0.003) * 5
-    zzz_text = zzz_font.render("Z z z", True, SOFT_PURPLE)
-    screen.blit(zzz_text, (cat_x + 40, int(zzz_y)))
-    
-    # Aesthetic timer
-    timer_font = pygame.font.Font(None, 42)
-    time_left = (ANIMATION_DURATION - elapsed_time) / 1000
-    
-    # Soft glow
-    for offset in range(3, 0, -1):
-        glow_color = SOFT_PURPLE
-        timer_text = timer_font.render(f"{time_left:.1f}s", True, glow_color)
-        timer_surface = timer_text.copy()
-        timer_surface.set_alpha(100 - offset * 30)
-        screen.blit(timer_surface, (WIDTH // 2 - 45 + offset, 15))
-        screen.blit(timer_surface, (WIDTH // 2 - 45 - offset, 15))
-    
-    timer_text = timer_font.render(f"{time_left:.1f}s", True, CREAM)
-    screen.blit(timer_text, (WIDTH // 2 - 45, 15))
-    
-    pygame.display.flip()
-    clock.tick(FPS)
-
-pygame.quit()
-sys.exit()
\ No newline at end of file
+            frame.add(canvas.blit(screen, note_text, (int(note['x']), int(y))))
+    
+        # Cat sleeping on desk corner
+        profiler.phase("cat")
+        cat_x, cat_y = 750, 330
+        # Body
+        frame.add(canvas.ellipse(screen, PEACH, (cat_x, cat_y, 80, 40)))
+        # Head
+        head_bob = math.sin(elapsed_time * 0.002) * 2
+        frame.add(canvas.circle(screen, PEACH, (cat_x + 20, int(cat_y + 10 + head_bob)), 18))
+        # Ears
+        frame.add(canvas.polygon(screen, PEACH, [
+            (cat_x + 12, cat_y + head_bob),
+            (cat_x + 7, cat_y - 8 + head_bob),
+            (cat_x + 17, cat_y + 5 + head_bob)
+        ]))
+        frame.add(canvas.polygon(screen, PEACH, [
+            (cat_x + 28, cat_y + head_bob),
+            (cat_x + 33, cat_y - 8 + head_bob),
+            (cat_x + 23, cat_y + 5 + head_bob)
+        ]))
+        # Closed eyes (sleeping)
+        canvas.arc(screen, (0, 0, 0), (cat_x + 12, cat_y + 12 + head_bob, 6, 4), 
+                  0, math.pi, 2)
+        canvas.arc(screen, (0, 0, 0), (cat_x + 20, cat_y + 12 + head_bob, 6, 4), 
+                  0, math.pi, 2)
+        # ZZZ
+        zzz_y = cat_y - 20 + math.sin(elapsed_time * 0.003) * 5
+        frame.add(canvas.blit(screen, self.zzz_text, (cat_x + 40, int(zzz_y))))
+    
+        # Aesthetic timer
+        profiler.phase("text")
+        time_left = (ANIMATION_DURATION - elapsed_time) / 1000
+        frame.add(self.timer_glow.draw(screen, f"{time_left:.1f}s", (WIDTH // 2 - 45, 15)))
+
+    def present(self):
+        """Flip the display, or update only the dirty rects"""
+        self.frame.present()
+
+
+def main():
+    scenes.run(sys.modules[__name__])
+
+
+if __name__ == "__main__":
+    main()
\ No newline at end of file
@@ -3,14 +3,20 @@ import math
 import random
 import sys
 
-pygame.init()
+import canvas
+import gradients
+import layers
+import profiler
+import scenes
+import stamps
+import text
+import textures
+import timing
 
 WIDTH, HEIGHT = 800, 600
-screen = pygame.display.set_mode((WIDTH, HEIGHT))
-pygame.display.set_caption("Underwater Scene")
-
-clock = pygame.time.Clock()
 FPS = 60
+ANIMATION_DURATION = 20000  # 20 seconds
+CAPTION = "Underwater Scene"
 
 # Colors
 BLACK = (0, 0, 0)
@@ -26,54 +32,36 @@ SEAWEED_GREEN = (34, 139, 34)
 
 def create_sand_texture(width, height):
     """Create a sandy ocean floor texture"""
-    surface = pygame.Surface((width, height))
-    base_color = SAND_COLOR
-    
-    for y in range(height):
-        for x in range(width):
-            variation = random.randint(-15, 15)
-            color = (
-                max(0, min(255, base_color[0] + variation)),
-                max(0, min(255, base_color[1] + variation)),
-                max(0, min(255, base_color[2] + variation))
-            )
-            surface.set_at((x, y), color)
+    surface = canvas.surface((width, height))
+    textures.fill_noise(surface, SAND_COLOR, 15)
     
     # Add some darker spots for depth
     for _ in range(50):
         spot_x = random.randint(0, width)
         spot_y = random.randint(0, height)
         spot_size = random.randint(2, 5)
-        pygame.draw.circle(surface, (150, 130, 90), (spot_x, spot_y), spot_size)
+        canvas.circle(surface, (150, 130, 90), (spot_x, spot_y), spot_size)
     
     return surface
 
 def create_coral_texture(width, height, base_color):
     """Create a textured coral surface"""
-    surface = pygame.Surface((width, height))
+    surface = canvas.surface((width, height))
     surface.set_colorkey(BLACK)
     
-    for y in range(height):
-        for x in range(width):
-            # Create bumpy texture
-            noise = int(20 * math.sin(x * 0.3) * math.cos(y * 0.3))
-            color = (
-                max(0, min(255, base_color[0] + noise)),
-                max(0, min(255, base_color[1] + noise)),
-                max(0, min(255, base_color[2] + noise))
-            )
-            surface.set_at((x, y), color)
+    # Create bumpy texture
+    textures.fill_noise(surface, base_color, 0, ripple=(20, 0.3, 0.3))
     
     return surface
 
 def create_fish_texture(width, height):
     """Create a fish with scale texture"""
-    surface = pygame.Surface((width, height))
+    surface = canvas.surface((width, height))
     surface.set_colorkey(BLACK)
     surface.fill(BLACK)
     
     # Draw fish body
-    pygame.draw.ellipse(surface, FISH_ORANGE, (5, height//4, width-10, height//2))
+    canvas.ellipse(surface, FISH_ORANGE, (5, height//4, width-10, height//2))
     
     # Draw scales
     for row in range(3):
@@ -81,126 +69,132 @@ def create_fish_texture(width, height):
             x = 10 + col * 12
             y = height//4 + 5 + row * 10
             shade = random.randint(200, 255)
-            pygame.draw.circle(surface, (shade, 120, 0), (x, y), 4, 1)
+            canvas.circle(surface, (shade, 120, 0), (x, y), 4, 1)
     
     # Draw tail
     points = [(width-10, height//2), (width, height//4), (width, 3*height//4)]
-    pygame.draw.polygon(surface, FISH_YELLOW, points)
+    canvas.polygon(surface, FISH_YELLOW, points)
     
     # Draw eye
-    pygame.draw.circle(surface, WHITE, (15, height//3), 4)
-    pygame.draw.circle(surface, BLACK, (15, height//3), 2)
+    canvas.circle(surface, WHITE, (15, height//3), 4)
+    canvas.circle(surface, BLACK, (15, height//3), 2)
     
     return surface
 
-# Create textures
-sand_texture = create_sand_texture(WIDTH, 80)
-coral1_texture = create_coral_texture(60, 80, CORAL_PINK)
-coral2_texture = create_coral_texture(50, 70, CORAL_PURPLE)
-fish_texture = create_fish_texture(60, 30)
+# Textures: name -> (generator, args, placeholder colour[, textures.SCALABLE]),
+# loaded by textures.load()
+TEXTURES = {
+    'sand': (create_sand_texture, (WIDTH, 80), SAND_COLOR, textures.SCALABLE),
+    'coral1': (create_coral_texture, (60, 80, CORAL_PINK), None),
+    'coral2': (create_coral_texture, (50, 70, CORAL_PURPLE), None),
+    'fish': (create_fish_texture, (60, 30), None),
+}
 
-# Animation parameters
-start_time = pygame.time.get_ticks()
-ANIMATION_DURATION = 20000  # 20 seconds
+class Scene:
+    """Seaweed swaying over the ocean floor while a fish swims by and bubbles rise"""
 
-# Fish parameters
-fish_x = -70
-fish_y = HEIGHT // 3
-
-# Bubble parameters
-bubbles = []
-for _ in range(15):
-    bubbles.append({
-        'x': random.randint(0, WIDTH),
-        'y': random.randint(HEIGHT//2, HEIGHT),
-        'speed': random.uniform(0.5, 2.0),
-        'size': random.randint(2, 6),
-        'wobble': random.uniform(0, 2 * math.pi)
-    })
-
-# Seaweed parameters
-seaweed_positions = [100, 250, 400, 550, 700]
-
-running = True
-while running:
-    current_time = pygame.time.get_ticks()
-    elapsed_time = current_time - start_time
-    
-    # Check if animation is complete
-    if elapsed_time > ANIMATION_DURATION:
-        pygame.time.wait(1000)
-        running = False
-    
-    # Normalized time (0 to 1)
-    time_normalized = elapsed_time / ANIMATION_DURATION
-    
-    # Handle events
-    for event in pygame.event.get():
-        if event.type == pygame.QUIT:
-            running = False
-        if event.type == pygame.KEYDOWN:
-            if event.key == pygame.K_ESCAPE:
-                running = False
-    
-    # Create gradient ocean background
-    for y in range(HEIGHT):
-        color_factor = y / HEIGHT
-        color = (
-            int(OCEAN_BLUE[0] + (LIGHT_BLUE[0] - OCEAN_BLUE[0]) * color_factor),
-            int(OCEAN_BLUE[1] + (LIGHT_BLUE[1] - OCEAN_BLUE[1]) * color_factor),
-            int(OCEAN_BLUE[2] + (LIGHT_BLUE[2] - OCEAN_BLUE[2]) * color_factor)
-        )
-        pygame.draw.line(screen, color, (0, y), (WIDTH, y))
-    
-    # Draw sandy ocean floor
-    screen.blit(sand_texture, (0, HEIGHT - 80))
-    
-    # Draw coral formations (textured)
-    screen.blit(coral1_texture, (150, HEIGHT - 150))
-    screen.blit(coral2_texture, (300, HEIGHT - 140))
-    screen.blit(coral1_texture, (500, HEIGHT - 160))
-    screen.blit(coral2_texture, (650, HEIGHT - 145))
-    
-    # Draw swaying seaweed
-    for pos in seaweed_positions:
-        sway = math.sin(time_normalized * 6 + pos * 0.01) * 15
-        for i in range(5):
-            segment_y = HEIGHT - 80 - i * 15
-            segment_x = pos + sway * (i / 5)
-            thickness = 8 - i
-            pygame.draw.circle(screen, SEAWEED_GREEN, (int(segment_x), segment_y), thickness)
-    
-    # Animate fish swimming across screen
-    fish_x = -70 + (WIDTH + 140) * time_normalized
-    fish_wave = math.sin(time_normalized * 10) * 30
-    fish_y = HEIGHT // 3 + fish_wave
-    
-    screen.blit(fish_texture, (int(fish_x), int(fish_y)))
-    
-    # Animate bubbles rising
-    for bubble in bubbles:
-        bubble['y'] -= bubble['speed']
-        bubble['x'] += math.sin(bubble['wobble'] + elapsed_time * 0.003) * 0.5
-        bubble['wobble'] += 0.02
-        
-        # Reset bubble when it reaches top
-        if bubble['y'] < 0:
-            bubble['y'] = HEIGHT
-            bubble['x'] = random.randint(0, WIDTH)
+    def __init__(self, screen, texture):
+        self.screen = screen
+        # Simulation randomness has a stream of its own, so the random flicker
+        # drawn each frame never changes what happens next
+        self.random = random.Random(random.getrandbits(64))
+        self.texture = texture
+
+        # Bubble parameters
+        self.bubbles = []
+        for _ in range(15):
+            x = random.randint(0, WIDTH)
+            y = random.randint(HEIGHT//2, HEIGHT)
+            self.bubbles.append({
+                'x': x,
+                'y': y,
+                'previous': (x, y),
+                'speed': random.uniform(0.5, 2.0),
+                'size': random.randint(2, 6),
+                'wobble': random.uniform(0, 2 * math.pi)
+            })
+
+        # Seaweed parameters
+        self.seaweed_positions = [100, 250, 400, 550, 700]
+
+        def draw_corals(surface):
+            canvas.blit(surface, texture['coral1'], (150, HEIGHT - 150))
+            canvas.blit(surface, texture['coral2'], (300, HEIGHT - 140))
+            canvas.blit(surface, texture['coral1'], (500, HEIGHT - 160))
+            canvas.blit(surface, texture['coral2'], (650, HEIGHT - 145))
+
+        # Static background, baked once and blitted every frame
+        self.background = layers.StaticLayer((WIDTH, HEIGHT))
+        self.background.add('ocean', lambda surface: canvas.blit(surface,
+            gradients.vertical((WIDTH, HEIGHT), OCEAN_BLUE, LIGHT_BLUE), (0, 0)))
+        self.background.add('sand', lambda surface: canvas.blit(surface, texture['sand'], (0, HEIGHT - 80)),
+                            key=lambda: texture.version)
+        self.background.add('corals', draw_corals, key=lambda: texture.version)
+
+    def update(self, elapsed_time):
+        """Advance the bubbles by one step"""
+        for bubble in self.bubbles:
+            bubble['previous'] = (bubble['x'], bubble['y'])
+            bubble['y'] -= bubble['speed']
+            bubble['x'] += math.sin(bubble['wobble'] + elapsed_time * 0.003) * 0.5
+            bubble['wobble'] += 0.02
         
-        # Draw bubble with transparency effect
-        pygame.draw.circle(screen, LIGHT_BLUE, (int(bubble['x']), int(bubble['y'])), bubble['size'], 1)
-        pygame.draw.circle(screen, WHITE, (int(bubble['x'] - 1), int(bubble['y'] - 1)), bubble['size'] // 3)
-    
-    # Draw timer
-    font = pygame.font.Font(None, 36)
-    time_left = (ANIMATION_DURATION - elapsed_time) / 1000
-    timer_text = font.render(f"Time: {time_left:.1f}s", True, WHITE)
-    screen.blit(timer_text, (10, 10))
-    
-    # Update display
-    pygame.display.flip()
-    clock.tick(FPS)
+            # Reset bubble when it reaches top
+            if bubble['y'] < 0:
+                bubble['y'] = HEIGHT
+                bubble['x'] = self.random.randint(0, WIDTH)
+                bubble['previous'] = (bubble['x'], bubble['y'])
+
+    def draw(self, elapsed_time, alpha):
+        """Draw the scene at ``elapsed_time``, ``alpha`` of the way through the last step"""
+        screen = self.screen
+
+        # Normalized time (0 to 1)
+        time_normalized = elapsed_time / ANIMATION_DURATION
+    
+        # Draw ocean, sandy floor and coral formations
+        profiler.phase("background")
+        self.background.draw(screen)
+    
+        # Draw swaying seaweed
+        profiler.phase("seaweed")
+        for pos in self.seaweed_positions:
+            sway = math.sin(time_normalized * 6 + pos * 0.01) * 15
+            for i in range(5):
+                segment_y = HEIGHT - 80 - i * 15
+                segment_x = pos + sway * (i / 5)
+                thickness = 8 - i
+                canvas.circle(screen, SEAWEED_GREEN, (int(segment_x), segment_y), thickness)
+    
+        # Animate fish swimming across screen
+        profiler.phase("fish")
+        fish_x = -70 + (WIDTH + 140) * time_normalized
+        fish_wave = math.sin(time_normalized * 10) * 30
+        fish_y = HEIGHT // 3 + fish_wave
+    
+        canvas.blit(screen, self.texture['fish'], (int(fish_x), int(fish_y)))
+    
+        # Draw bubbles with transparency effect
+        profiler.phase("bubbles")
+        bubble_stamps = []
+        for bubble in self.bubbles:
+            x = timing.lerp(bubble['previous'][0], bubble['x'], alpha)
+            y = timing.lerp(bubble['previous'][1], bubble['y'], alpha)
+            bubble_stamps.append(stamps.at(stamps.circle(bubble['size'], LIGHT_BLUE, width=1),
+                                           (int(x), int(y))))
+            bubble_stamps.append(stamps.at(stamps.circle(bubble['size'] // 3, WHITE),
+                                           (int(x - 1), int(y - 1))))
+        screen.blits(bubble_stamps, doreturn=False)
+    
+        # Draw timer
+        profiler.phase("text")
+        time_left = (ANIMATION_DURATION - elapsed_time) / 1000
+        text.atlas(36, WHITE).draw(screen, f"Time: {time_left:.1f}s", (10, 10))
+
+
+def main():
+    scenes.run(sys.modules[__name__])
+
 
-pygame.quit()
-sys.exit()
\ No newline at end of file
+if __name__ == "__main__":
+    main()
\ No newline at end of file
@@ -3,14 +3,22 @@ import math
 import random
 import sys
 
-pygame.init()
+import canvas
+import layers
+import profiler
+import quality
+import scenes
+import stamps
+import text
+import textures
+import timing
 
 WIDTH, HEIGHT = 900, 700
-screen = pygame.display.set_mode((WIDTH, HEIGHT))
-pygame.display.set_caption("Cyberpunk City Night")
-
-clock = pygame.time.Clock()
 FPS = 120
+# The rain and sparks are tuned to move at 120 steps per second
+SIM_RATE = 120
+ANIMATION_DURATION = 20000
+CAPTION = "Cyberpunk City Night"
 
 # Colors
 NIGHT_SKY = (10, 5, 30)
@@ -25,14 +33,10 @@ RAIN_BLUE = (150, 180, 220)
 
 def create_building_texture(width, height, window_color):
     """Create a textured building with windows"""
-    surface = pygame.Surface((width, height))
+    surface = canvas.surface((width, height))
     
     # Building base - create concrete texture
-    for y in range(height):
-        for x in range(width):
-            noise = random.randint(-10, 10)
-            gray = 30 + noise
-            surface.set_at((x, y), (gray, gray, gray + 10))
+    textures.fill_noise(surface, (30, 30, 40), 10)
     
     # Add windows in a grid pattern
     window_width = 8
@@ -50,27 +54,27 @@ def create_building_texture(width, height, window_color):
                     int(window_color[1] * brightness),
                     int(window_color[2] * brightness)
                 )
-                pygame.draw.rect(surface, win_color, 
-                               (col, row, window_width, window_height))
+                canvas.rect(surface, win_color, 
+                          (col, row, window_width, window_height))
                 # Add glow effect
                 glow_color = (
                     int(window_color[0] * brightness * 0.5),
                     int(window_color[1] * brightness * 0.5),
                     int(window_color[2] * brightness * 0.5)
                 )
-                pygame.draw.rect(surface, glow_color, 
-                               (col - 1, row - 1, window_width + 2, window_height + 2), 1)
+                canvas.rect(surface, glow_color, 
+                          (col - 1, row - 1, window_width + 2, window_height + 2), 1)
     
     return surface
 
 def create_neon_sign_texture(width, height, text, color):
     """Create a glowing neon sign texture"""
-    surface = pygame.Surface((width, height))
+    surface = canvas.surface((width, height))
     surface.set_colorkey((0, 0, 0))
     surface.fill((0, 0, 0))
     
     # Create glow effect
-    font = pygame.font.Font(None, 40)
+    font = pygame.font.Font(None, canvas.pixels(40))
     
     # Outer glow layers
     for offset in range(8, 0, -2):
@@ -81,33 +85,29 @@ def create_neon_sign_texture(width, height, text, color):
             color[2] // 2
         )
         text_surface = font.render(text, True, glow_color)
-        surface.blit(text_surface, (offset, height//2 - 10))
-        surface.blit(text_surface, (-offset, height//2 - 10))
-        surface.blit(text_surface, (0, height//2 - 10 + offset))
-        surface.blit(text_surface, (0, height//2 - 10 - offset))
+        canvas.blit(surface, text_surface, (offset, height//2 - 10))
+        canvas.blit(surface, text_surface, (-offset, height//2 - 10))
+        canvas.blit(surface, text_surface, (0, height//2 - 10 + offset))
+        canvas.blit(surface, text_surface, (0, height//2 - 10 - offset))
     
     # Main text
     text_surface = font.render(text, True, color)
-    surface.blit(text_surface, (0, height//2 - 10))
+    canvas.blit(surface, text_surface, (0, height//2 - 10))
     
     return surface
 
 def create_road_texture(width, height):
     """Create a wet asphalt road texture"""
-    surface = pygame.Surface((width, height))
+    surface = canvas.surface((width, height))
     
     # Base asphalt color with variation
-    for y in range(height):
-        for x in range(width):
-            noise = random.randint(-15, 15)
-            gray = 40 + noise
-            # Add slight blue tint for wetness
-            surface.set_at((x, y), (gray, gray, gray + 20))
+    # Add slight blue tint for wetness
+    textures.fill_noise(surface, (40, 40, 60), 15)
     
     # Add road markings
     line_y = height // 2
     for x in range(0, width, 40):
-        pygame.draw.rect(surface, (255, 255, 255), (x, line_y - 2, 20, 4))
+        canvas.rect(surface, (255, 255, 255), (x, line_y - 2, 20, 4))
     
     # Add puddle reflections (darker spots)
     for _ in range(20):
@@ -116,13 +116,12 @@ def create_road_texture(width, height):
         puddle_size = random.randint(10, 30)
         for i in range(puddle_size, 0, -3):
             alpha = 50 + i
-            pygame.draw.ellipse(surface, (20, 20, 50), 
-                              (puddle_x - i, puddle_y - i//2, i*2, i))
+            canvas.ellipse(surface, (20, 20, 50), 
+                         (puddle_x - i, puddle_y - i//2, i*2, i))
     
     return surface
 
-# Create textures
-buildings = []
+# Buildings: x, width, height, window color
 building_data = [
     (50, 150, 250, WINDOW_YELLOW),
     (180, 150, 300, WINDOW_CYAN),
@@ -132,179 +131,218 @@ building_data = [
     (770, 150, 180, WINDOW_CYAN),
 ]
 
-for x, width, height, color in building_data:
-    buildings.append({
-        'x': x,
-        'y': HEIGHT - height - 150,
-        'texture': create_building_texture(width, height, color),
-        'height': height
-    })
-
-# Create neon signs
-neon_signs = [
-    create_neon_sign_texture(150, 60, "CYBER", NEON_PINK),
-    create_neon_sign_texture(150, 60, "TECH", NEON_CYAN),
-    create_neon_sign_texture(150, 60, "NEON", NEON_PURPLE),
+neon_sign_data = [
+    ("CYBER", NEON_PINK),
+    ("TECH", NEON_CYAN),
+    ("NEON", NEON_PURPLE),
 ]
 
-# Create road texture
-road_texture = create_road_texture(WIDTH, 150)
+# Textures: name -> (generator, args, placeholder colour), loaded by textures.load()
+TEXTURES = {}
+for i, (x, width, height, color) in enumerate(building_data):
+    TEXTURES[f'building{i}'] = (create_building_texture, (width, height, color), BUILDING_DARK)
+for i, (sign_text, color) in enumerate(neon_sign_data):
+    TEXTURES[f'neon{i}'] = (create_neon_sign_texture, (150, 60, sign_text, color), None)
+TEXTURES['road'] = (create_road_texture, (WIDTH, 150), (40, 40, 60))
 
-# Rain drops
-rain_drops = []
-for _ in range(150):
-    rain_drops.append({
-        'x': random.randint(0, WIDTH),
-        'y': random.randint(0, HEIGHT),
-        'speed': random.uniform(8, 15),
-        'length': random.randint(10, 20)
-    })
+class Scene:
+    """A rainy neon city at night with flickering signs and a flying car"""
 
-# Flying car
-car = {
-    'x': -100,
-    'y': HEIGHT // 6,
-    'speed': 3
-}
+    def __init__(self, screen, texture):
+        self.screen = screen
+        # Simulation randomness has a stream of its own, so the random flicker
+        # drawn each frame never changes what happens next
+        self.random = random.Random(random.getrandbits(64))
 
-# Floating particles/sparks
-particles = []
-for _ in range(50):
-    particles.append({
-        'x': random.randint(0, WIDTH),
-        'y': random.randint(0, HEIGHT // 2),
-        'speed': random.uniform(0.2, 0.8),
-        'size': random.randint(1, 3),
-        'color': random.choice([NEON_PINK, NEON_CYAN, NEON_PURPLE, NEON_ORANGE]),
-        'pulse': random.uniform(0, math.pi * 2)
-    })
+        self.buildings = buildings = []
+        for i, (x, width, height, color) in enumerate(building_data):
+            buildings.append({
+                'x': x,
+                'y': HEIGHT - height - 150,
+                'texture': texture[f'building{i}'],
+                'width': width,
+                'height': height
+            })
 
-start_time = pygame.time.get_ticks()
-ANIMATION_DURATION = 20000
+        # Create neon signs
+        self.neon_signs = [texture[f'neon{i}'] for i in range(len(neon_sign_data))]
 
-running = True
-while running:
-    current_time = pygame.time.get_ticks()
-    elapsed_time = current_time - start_time
-    
-    if elapsed_time > ANIMATION_DURATION:
-        pygame.time.wait(1000)
-        running = False
-    
-    time_normalized = elapsed_time / ANIMATION_DURATION
+        # Create road texture
+        self.road_texture = texture['road']
+
+        # Rain drops
+        self.rain_drops = []
+        for _ in range(150):
+            y = random.randint(0, HEIGHT)
+            self.rain_drops.append({
+                'x': random.randint(0, WIDTH),
+                'y': y,
+                'previous_y': y,
+                'speed': random.uniform(8, 15),
+                'length': random.randint(10, 20)
+            })
+
+        # Flying car
+        self.car = {
+            'x': -100,
+            'previous_x': -100,
+            'y': HEIGHT // 6,
+            'speed': 3
+        }
+
+        # Floating particles/sparks
+        self.particles = []
+        for _ in range(50):
+            y = random.randint(0, HEIGHT // 2)
+            self.particles.append({
+                'x': random.randint(0, WIDTH),
+                'y': y,
+                'previous_y': y,
+                'speed': random.uniform(0.2, 0.8),
+                'size': random.randint(1, 3),
+                'color': random.choice([NEON_PINK, NEON_CYAN, NEON_PURPLE, NEON_ORANGE]),
+                'pulse': random.uniform(0, math.pi * 2)
+            })
+
+        def draw_buildings(surface):
+            for building in buildings:
+                canvas.blit(surface, building['texture'], (building['x'], building['y']))
+        
+                # Add building edge highlights
+                canvas.line(surface, NEON_CYAN, 
+                           (building['x'], building['y']),
+                           (building['x'], building['y'] + building['height']), 2)
+
+        def draw_reflections(surface):
+            reflection_y = HEIGHT - 100
+            for building in buildings:
+                glow_x = building['x'] + building['width'] // 2
+                for i in range(5):
+                    color = (NEON_CYAN[0] // 4, NEON_CYAN[1] // 4, NEON_CYAN[2] // 4)
+                    canvas.circle(surface, color,
+                                (glow_x, reflection_y + i * 10), 30 - i * 5)
+
+        # Static parts of the city, baked once. They sit between animated
+        # elements, so each is a transparent layer of its own.
+        self.skyline = skyline = layers.StaticLayer((WIDTH, HEIGHT), transparent=True)
+        skyline.add('buildings', draw_buildings, key=lambda: texture.version)
+        self.reflections = reflections = layers.StaticLayer((WIDTH, HEIGHT), transparent=True)
+        reflections.add('road_glow', draw_reflections)
+
+        # Timer with a neon glow
+        glow_color = (NEON_PINK[0] // 2, NEON_PINK[1] // 2, NEON_PINK[2] // 2)
+        self.timer_glow = text.GlowText(48, NEON_PINK, glow_color, range(4, 0, -1))
+
+    def update(self, elapsed_time):
+        """Advance the sparks, flying car and rain by one step"""
+        for particle in self.particles:
+            particle['previous_y'] = particle['y']
+            particle['y'] += particle['speed']
+            if particle['y'] > HEIGHT // 2:
+                particle['y'] = particle['previous_y'] = 0
+                particle['x'] = self.random.randint(0, WIDTH)
+            particle['pulse'] += 0.1
     
-    for event in pygame.event.get():
-        if event.type == pygame.QUIT:
-            running = False
-        if event.type == pygame.KEYDOWN:
-            if event.key == pygame.K_ESCAPE:
-                running = False
+        car = self.car
+        car['previous_x'] = car['x']
+        car['x'] += car['speed']
+        if car['x'] > WIDTH + 100:
+            car['x'] = car['previous_x'] = -100
+            car['y'] = self.random.randint(150, 350)
     
-    # Draw night sky with stars
-    screen.fill(NIGHT_SKY)
+        for drop in self.rain_drops:
+            drop['previous_y'] = drop['y']
+            drop['y'] += drop['speed']
+            if drop['y'] > HEIGHT:
+                drop['y'] = drop['previous_y'] = 0
+                drop['x'] = self.random.randint(0, WIDTH)
+
+    def draw(self, elapsed_time, alpha):
+        """Draw the scene at ``elapsed_time``, ``alpha`` of the way through the last step"""
+        screen = self.screen
     
-    # Draw twinkling stars
-    for _ in range(30):
-        star_x = random.randint(0, WIDTH)
-        star_y = random.randint(0, HEIGHT // 2)
-        star_brightness = int(150 + 105 * math.sin(elapsed_time * 0.005 + star_x))
-        pygame.draw.circle(screen, (star_brightness, star_brightness, star_brightness), 
-                         (star_x, star_y), 1)
+        # Draw night sky with stars
+        profiler.phase("sky")
+        screen.fill(NIGHT_SKY)
     
-    # Draw floating particles
-    for particle in particles:
-        particle['y'] += particle['speed']
-        if particle['y'] > HEIGHT // 2:
-            particle['y'] = 0
-            particle['x'] = random.randint(0, WIDTH)
-        
-        particle['pulse'] += 0.1
-        alpha_factor = (math.sin(particle['pulse']) + 1) / 2
-        color = tuple(int(c * alpha_factor) for c in particle['color'])
-        pygame.draw.circle(screen, color, 
-                         (int(particle['x']), int(particle['y'])), particle['size'])
+        # Draw twinkling stars
+        for _ in range(quality.scale(30)):
+            star_x = random.randint(0, WIDTH)
+            star_y = random.randint(0, HEIGHT // 2)
+            star_brightness = int(150 + 105 * math.sin(elapsed_time * 0.005 + star_x))
+            canvas.circle(screen, (star_brightness, star_brightness, star_brightness), 
+                        (star_x, star_y), 1)
     
-    # Draw buildings with textures
-    for building in buildings:
-        screen.blit(building['texture'], (building['x'], building['y']))
-        
-        # Add building edge highlights
-        pygame.draw.line(screen, NEON_CYAN, 
-                        (building['x'], building['y']),
-                        (building['x'], building['y'] + building['height']), 2)
+        # Draw floating particles
+        profiler.phase("sparks")
+        particle_stamps = []
+        for particle in self.particles[:quality.scale(len(self.particles))]:
+            y = timing.lerp(particle['previous_y'], particle['y'], alpha)
+            alpha_factor = (math.sin(particle['pulse']) + 1) / 2
+            particle_stamp = stamps.circle(particle['size'], particle['color'], alpha_factor)
+            particle_stamps.append(stamps.at(particle_stamp, (int(particle['x']), int(y))))
+        screen.blits(particle_stamps, doreturn=False)
     
-    # Draw neon signs on buildings
-    sign_positions = [(100, 250), (300, 200), (550, 280)]
-    for i, (sx, sy) in enumerate(sign_positions):
-        # Flickering effect
-        if random.random() > 0.05:
-            flicker = math.sin(elapsed_time * 0.01 + i) * 0.2 + 0.8
-            sign_surface = neon_signs[i].copy()
-            sign_surface.set_alpha(int(255 * flicker))
-            screen.blit(sign_surface, (sx, sy))
+        # Draw buildings with textures and edge highlights
+        profiler.phase("skyline")
+        self.skyline.draw(screen)
     
-    # Draw flying car
-    car['x'] += car['speed']
-    if car['x'] > WIDTH + 100:
-        car['x'] = -100
-        car['y'] = random.randint(150, 350)
+        # Draw neon signs on buildings
+        profiler.phase("signs")
+        sign_positions = [(100, 250), (300, 200), (550, 280)]
+        for i, (sx, sy) in enumerate(sign_positions):
+            # Flickering effect
+            if random.random() > 0.05:
+                flicker = math.sin(elapsed_time * 0.01 + i) * 0.2 + 0.8
+                sign_surface = self.neon_signs[i].copy()
+                sign_surface.set_alpha(int(255 * flicker))
+                canvas.blit(screen, sign_surface, (sx, sy))
     
-    car_y_wave = car['y'] + math.sin(elapsed_time * 0.003) * 10
+        # Draw flying car
+        profiler.phase("car")
+        car_x = timing.lerp(self.car['previous_x'], self.car['x'], alpha)
+        car_y_wave = self.car['y'] + math.sin(elapsed_time * 0.003) * 10
     
-    # Car body
-    pygame.draw.rect(screen, (80, 80, 100), 
-                    (int(car['x']), int(car_y_wave), 60, 20))
-    # Car windows
-    pygame.draw.rect(screen, NEON_CYAN, 
-                    (int(car['x']) + 5, int(car_y_wave) + 5, 50, 10))
-    # Glow underneath
-    for i in range(3):
-        glow_alpha = 100 - i * 30
-        pygame.draw.line(screen, NEON_CYAN, 
-                        (int(car['x']), int(car_y_wave) + 20 + i),
-                        (int(car['x']) + 60, int(car_y_wave) + 20 + i), 1)
+        # Car body
+        canvas.rect(screen, (80, 80, 100), 
+                   (int(car_x), int(car_y_wave), 60, 20))
+        # Car windows
+        canvas.rect(screen, NEON_CYAN, 
+                   (int(car_x) + 5, int(car_y_wave) + 5, 50, 10))
+        # Glow underneath
+        for i in range(3):
+            glow_alpha = 100 - i * 30
+            canvas.line(screen, NEON_CYAN, 
+                       (int(car_x), int(car_y_wave) + 20 + i),
+                       (int(car_x) + 60, int(car_y_wave) + 20 + i), 1)
     
-    # Draw road with texture
-    screen.blit(road_texture, (0, HEIGHT - 150))
+        # Draw road with texture
+        profiler.phase("road")
+        canvas.blit(screen, self.road_texture, (0, HEIGHT - 150))
     
-    # Draw rain
-    for drop in rain_drops:
-        drop['y'] += drop['speed']
-        if drop['y'] > HEIGHT:
-            drop['y'] = 0
-            drop['x'] = random.randint(0, WIDTH)
+        # Draw rain
+        profiler.phase("rain")
+        for drop in self.rain_drops[:quality.scale(len(self.rain_drops))]:
+            y = timing.lerp(drop['previous_y'], drop['y'], alpha)
         
-        # Rain streak
-        pygame.draw.line(screen, RAIN_BLUE,
-                        (int(drop['x']), int(drop['y'])),
-                        (int(drop['x'] - 2), int(drop['y'] - drop['length'])), 1)
-    
-    # Add reflection glow on road
-    reflection_y = HEIGHT - 100
-    for building in buildings:
-        glow_x = building['x'] + building['texture'].get_width() // 2
-        for i in range(5):
-            alpha = 30 - i * 5
-            color = (NEON_CYAN[0] // 4, NEON_CYAN[1] // 4, NEON_CYAN[2] // 4)
-            pygame.draw.circle(screen, color,
-                             (glow_x, reflection_y + i * 10), 30 - i * 5)
+            # Rain streak
+            canvas.line(screen, RAIN_BLUE,
+                       (int(drop['x']), int(y)),
+                       (int(drop['x'] - 2), int(y - drop['length'])), 1)
     
-    # Draw timer with neon effect
-    font = pygame.font.Font(None, 48)
-    time_left = (ANIMATION_DURATION - elapsed_time) / 1000
+        # Add reflection glow on road
+        profiler.phase("reflections")
+        self.reflections.draw(screen)
     
-    # Glow effect for timer
-    for offset in range(4, 0, -1):
-        glow_color = (NEON_PINK[0] // 2, NEON_PINK[1] // 2, NEON_PINK[2] // 2)
-        timer_text = font.render(f"{time_left:.1f}s", True, glow_color)
-        screen.blit(timer_text, (WIDTH - 140 + offset, 20))
-        screen.blit(timer_text, (WIDTH - 140 - offset, 20))
-    
-    timer_text = font.render(f"{time_left:.1f}s", True, NEON_PINK)
-    screen.blit(timer_text, (WIDTH - 140, 20))
-    
-    pygame.display.flip()
-    clock.tick(FPS)
+        # Draw timer with neon effect
+        profiler.phase("text")
+        time_left = (ANIMATION_DURATION - elapsed_time) / 1000
+        self.timer_glow.draw(screen, f"{time_left:.1f}s", (WIDTH - 140, 20))
+
+
+def main():
+    scenes.run(sys.modules[__name__])
+
 
-pygame.quit()
-sys.exit()
\ No newline at end of file
+if __name__ == "__main__":
+    main()
\ No newline at end of file
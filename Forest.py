@@ -1,16 +1,25 @@
 import pygame
 import math
+import os
 import random
 import sys
 
-pygame.init()
+import canvas
+import layers
+import leaves
+import profiler
+import quality
+import scenes
+import sprites
+import text
+import textures
+import timing
 
 WIDTH, HEIGHT = 800, 600
-screen = pygame.display.set_mode((WIDTH, HEIGHT))
-pygame.display.set_caption("Forest Scene")
-
-clock = pygame.time.Clock()
+# Render rate cap; the leaves and flowers move at timing.SIM_RATE steps per second
 FPS = 400
+ANIMATION_DURATION = 20000  # 20 seconds
+CAPTION = "Forest Scene"
 
 # Colors
 SKY_BLUE = (135, 206, 235)
@@ -25,20 +34,22 @@ BUTTERFLY_ORANGE = (255, 140, 0)
 BUTTERFLY_BLACK = (0, 0, 0)
 WHITE = (255, 255, 255)
 
+# Butterflies are drawn from a sprite sheet at this many steps of the wing
+# flap and at these sizes
+FLAP_FRAMES = 16
+BUTTERFLY_SCALES = (0.5, 0.75, 1.0)
+# Butterflies on their own paths besides the one circling the clearing;
+# none unless ANIM_BUTTERFLIES=N asks for them
+EXTRA_BUTTERFLIES = int(os.environ.get("ANIM_BUTTERFLIES", "0"))
+# Falling leaves, or a great many more in autumn (ANIM_AUTUMN=1)
+LEAVES = leaves.AUTUMN_LEAVES if leaves.AUTUMN else 20
+
 def create_bark_texture(width, height):
     """Create a realistic tree bark texture"""
-    surface = pygame.Surface((width, height))
+    surface = canvas.surface((width, height))
     
     # Base brown color
-    for y in range(height):
-        for x in range(width):
-            variation = random.randint(-20, 20)
-            color = (
-                max(0, min(255, BROWN[0] + variation)),
-                max(0, min(255, BROWN[1] + variation)),
-                max(0, min(255, BROWN[2] + variation))
-            )
-            surface.set_at((x, y), color)
+    textures.fill_noise(surface, BROWN, 20)
     
     # Add vertical bark lines
     for x in range(0, width, 8):
@@ -46,45 +57,41 @@ def create_bark_texture(width, height):
         for y in range(0, height, 3):
             line_x = x + offset + int(math.sin(y * 0.1) * 2)
             if 0 <= line_x < width:
-                pygame.draw.circle(surface, DARK_BROWN, (line_x, y), 1)
+                canvas.circle(surface, DARK_BROWN, (line_x, y), 1)
     
     # Add knots and texture
     for _ in range(8):
         knot_x = random.randint(5, width - 5)
         knot_y = random.randint(5, height - 5)
         knot_size = random.randint(3, 8)
-        pygame.draw.circle(surface, DARK_BROWN, (knot_x, knot_y), knot_size, 2)
+        canvas.circle(surface, DARK_BROWN, (knot_x, knot_y), knot_size, 2)
     
     return surface
 
 def create_grass_texture(width, height):
     """Create textured grass ground"""
-    surface = pygame.Surface((width, height))
+    surface = canvas.surface((width, height))
     
     # Base grass color with variation
-    for y in range(height):
-        for x in range(width):
-            variation = random.randint(-15, 15)
-            color = (
-                max(0, min(255, GRASS_GREEN[0] + variation)),
-                max(0, min(255, GRASS_GREEN[1] + variation)),
-                max(0, min(255, GRASS_GREEN[2] + variation))
-            )
-            surface.set_at((x, y), color)
+    textures.fill_noise(surface, GRASS_GREEN, 15)
     
     # Add grass blades
     for _ in range(200):
         blade_x = random.randint(0, width)
         blade_y = random.randint(0, height)
         blade_height = random.randint(3, 8)
-        pygame.draw.line(surface, DARK_GREEN, (blade_x, blade_y), 
-                        (blade_x + random.randint(-2, 2), blade_y - blade_height), 1)
+        canvas.line(surface, DARK_GREEN, (blade_x, blade_y), 
+                   (blade_x + random.randint(-2, 2), blade_y - blade_height), 1)
     
     return surface
 
-def draw_butterfly(surface, x, y, time, scale=1.0):
-    """Draw an animated butterfly"""
-    wing_flap = abs(math.sin(time * 10)) * 15
+def butterfly_flap(time):
+    """How far open the wings are at ``time``, from 0 to 1"""
+    return abs(math.sin(time * 10))
+
+def draw_butterfly(surface, x, y, flap, scale=1.0):
+    """Draw a butterfly with its wings ``flap`` open; returns the rect it covers"""
+    wing_flap = flap * 15
     
     # Left wing
     left_wing = [
@@ -93,7 +100,7 @@ def draw_butterfly(surface, x, y, time, scale=1.0):
         (x - 20 * scale - wing_flap * scale, y + 10 * scale),
     ]
     pygame.draw.polygon(surface, BUTTERFLY_ORANGE, left_wing)
-    pygame.draw.polygon(surface, BUTTERFLY_BLACK, left_wing, 2)
+    rect = pygame.draw.polygon(surface, BUTTERFLY_BLACK, left_wing, 2)
     
     # Right wing
     right_wing = [
@@ -102,172 +109,229 @@ def draw_butterfly(surface, x, y, time, scale=1.0):
         (x + 20 * scale + wing_flap * scale, y + 10 * scale),
     ]
     pygame.draw.polygon(surface, BUTTERFLY_ORANGE, right_wing)
-    pygame.draw.polygon(surface, BUTTERFLY_BLACK, right_wing, 2)
+    rect = rect.union(pygame.draw.polygon(surface, BUTTERFLY_BLACK, right_wing, 2))
     
     # Body
     pygame.draw.ellipse(surface, BUTTERFLY_BLACK, 
                        (x - 3 * scale, y - 10 * scale, 6 * scale, 20 * scale))
     
     # Antennae
-    pygame.draw.line(surface, BUTTERFLY_BLACK, 
-                    (x - 2 * scale, y - 10 * scale), 
-                    (x - 5 * scale, y - 18 * scale), 1)
-    pygame.draw.line(surface, BUTTERFLY_BLACK, 
-                    (x + 2 * scale, y - 10 * scale), 
-                    (x + 5 * scale, y - 18 * scale), 1)
+    rect = rect.union(pygame.draw.line(surface, BUTTERFLY_BLACK, 
+                                       (x - 2 * scale, y - 10 * scale), 
+                                       (x - 5 * scale, y - 18 * scale), 1))
+    rect = rect.union(pygame.draw.line(surface, BUTTERFLY_BLACK, 
+                                       (x + 2 * scale, y - 10 * scale), 
+                                       (x + 5 * scale, y - 18 * scale), 1))
+    
+    return rect
 
 def draw_flower(surface, x, y, color):
-    """Draw a simple flower"""
+    """Draw a simple flower; returns the rect it covers"""
     # Stem
-    pygame.draw.line(surface, DARK_GREEN, (x, y), (x, y + 30), 3)
+    rect = canvas.line(surface, DARK_GREEN, (x, y), (x, y + 30), 3)
     
     # Petals
     for angle in range(0, 360, 72):
         rad = math.radians(angle)
         petal_x = x + math.cos(rad) * 8
         petal_y = y + math.sin(rad) * 8
-        pygame.draw.circle(surface, color, (int(petal_x), int(petal_y)), 5)
+        rect = rect.union(canvas.circle(surface, color, (int(petal_x), int(petal_y)), 5))
     
     # Center
-    pygame.draw.circle(surface, FLOWER_YELLOW, (x, y), 4)
+    canvas.circle(surface, FLOWER_YELLOW, (x, y), 4)
+    
+    return rect
 
-# Create textures
-tree_bark = create_bark_texture(80, 200)
-grass_texture = create_grass_texture(WIDTH, 120)
+_butterfly_sheet = None
 
-# Animation parameters
-start_time = pygame.time.get_ticks()
-ANIMATION_DURATION = 20000  # 20 seconds
+def butterfly_sheet():
+    """The butterfly at every step of its flap and every size, rendered once"""
+    global _butterfly_sheet
+    if _butterfly_sheet is None:
+        # The wings reach 40 px either side of the body, the antennae 18 px up
+        _butterfly_sheet = sprites.SpriteSheet(
+            lambda surface, x, y, frame, scale: draw_butterfly(surface, x, y, frame / (FLAP_FRAMES - 1), scale),
+            FLAP_FRAMES, BUTTERFLY_SCALES, (84, 40))
+    return _butterfly_sheet
 
-# Butterfly flight path
-butterfly_path_radius = 150
+# Textures: name -> (generator, args, placeholder colour[, textures.SCALABLE]),
+# loaded by textures.load()
+TEXTURES = {
+    'tree_bark': (create_bark_texture, (80, 200), BROWN),
+    'grass': (create_grass_texture, (WIDTH, 120), GRASS_GREEN, textures.SCALABLE),
+}
 
-# Falling leaves
-leaves = []
-for _ in range(20):
-    leaves.append({
-        'x': random.randint(0, WIDTH),
-        'y': random.randint(-HEIGHT, 0),
-        'speed': random.uniform(0.5, 1.5),
-        'rotation': random.uniform(0, 360),
-        'rotation_speed': random.uniform(-5, 5),
-        'size': random.randint(4, 8)
-    })
+class Scene:
+    """A tree swaying in the wind while a butterfly circles, leaves fall and flowers grow"""
 
-# Flowers
-flowers = []
-for _ in range(15):
-    flowers.append({
-        'x': random.randint(50, WIDTH - 50),
-        'y': HEIGHT - 100 + random.randint(-10, 10),
-        'color': random.choice([FLOWER_PINK, FLOWER_YELLOW, (255, 100, 180)]),
-        'growth': 0
-    })
+    def __init__(self, screen, texture):
+        self.screen = screen
+        # Simulation randomness has a stream of its own, so the random flicker
+        # drawn each frame never changes what happens next
+        self.random = random.Random(random.getrandbits(64))
 
-running = True
-while running:
-    current_time = pygame.time.get_ticks()
-    elapsed_time = current_time - start_time
-    
-    # Check if animation is complete
-    if elapsed_time > ANIMATION_DURATION:
-        pygame.time.wait(1000)
-        running = False
-    
-    # Normalized time (0 to 1)
-    time_normalized = elapsed_time / ANIMATION_DURATION
-    
-    # Handle events
-    for event in pygame.event.get():
-        if event.type == pygame.QUIT:
-            running = False
-        if event.type == pygame.KEYDOWN:
-            if event.key == pygame.K_ESCAPE:
-                running = False
-    
-    # Draw sky
-    screen.fill(SKY_BLUE)
-    
-    # Draw textured grass ground
-    screen.blit(grass_texture, (0, HEIGHT - 120))
-    
-    # Draw tree with textured bark
-    tree_x = WIDTH // 4
-    tree_y = HEIGHT - 320
-    screen.blit(tree_bark, (tree_x, tree_y))
+        # Butterfly flight path
+        self.butterfly_path_radius = 150
+        self.butterfly_sheet = butterfly_sheet()
+
+        # Falling leaves, blown about by the wind
+        self.leaves = leaves.system(LEAVES, WIDTH, HEIGHT, random)
+
+        # Flowers
+        self.flowers = []
+        for _ in range(15):
+            self.flowers.append({
+                'x': random.randint(50, WIDTH - 50),
+                'y': HEIGHT - 100 + random.randint(-10, 10),
+                'color': random.choice([FLOWER_PINK, FLOWER_YELLOW, (255, 100, 180)]),
+                'growth': 0,
+                'previous_growth': 0,
+                'bloomed': False
+            })
+
+        # Butterflies: the first circles the clearing, any others fly
+        # ellipses of their own, at their own pace and size
+        sheet = self.butterfly_sheet
+        self.butterflies = [{
+            'center': (WIDTH // 2, HEIGHT // 3),
+            'radius': (self.butterfly_path_radius, self.butterfly_path_radius * 0.6),
+            'laps': 2, 'phase': 0, 'flap_rate': 1, 'flap_phase': 0,
+            'scale': sheet.scale_index(1.0),
+        }]
+        for _ in range(EXTRA_BUTTERFLIES):
+            radius_x = random.uniform(40, 140)
+            self.butterflies.append({
+                'center': (random.randint(200, WIDTH - 200), random.randint(120, HEIGHT // 2)),
+                'radius': (radius_x, radius_x * random.uniform(0.3, 0.8)),
+                'laps': random.choice([-3, -2, -1, 1, 2, 3]),
+                'phase': random.uniform(0, math.pi * 2),
+                'flap_rate': random.uniform(1.5, 4),
+                'flap_phase': random.uniform(0, math.pi / 10),
+                'scale': sheet.scale_index(random.choice(BUTTERFLY_SCALES[:-1])),
+            })
+
+        # Tree position
+        self.tree_x = tree_x = WIDTH // 4
+        self.tree_y = tree_y = HEIGHT - 320
+
+        # Static background, baked once and blitted every frame
+        background = layers.StaticLayer((WIDTH, HEIGHT))
+        background.add('sky', lambda surface: surface.fill(SKY_BLUE))
+        background.add('grass', lambda surface: canvas.blit(surface, texture['grass'], (0, HEIGHT - 120)),
+                       key=lambda: texture.version)
+        background.add('tree_bark', lambda surface: canvas.blit(surface, texture['tree_bark'], (tree_x, tree_y)),
+                       key=lambda: texture.version)
+        # The crown sways by whole pixels about once a second, so it is baked
+        # in too and rebaked only when one of its circles has moved
+        self.crown_x = self.crown_sway(0)
+        background.add('crown', self.draw_crown, key=lambda: self.crown_x)
+
+        # Flowers that have finished growing no longer change, so they are
+        # baked into a layer of their own and drawn as one blit
+        self.bloomed = layers.StaticLayer((WIDTH, HEIGHT), transparent=True)
+
+        # Redraws and presents only what moved when dirty-rect mode is on
+        self.frame = layers.DirtyRects(screen, [background, self.bloomed])
+
+    def update(self, elapsed_time):
+        """Advance the falling leaves and growing flowers by one step"""
+        self.leaves.update(elapsed_time / 1000)
     
-    # Draw tree crown
-    for i in range(3):
-        crown_y = tree_y - 30 - i * 40
-        crown_size = 100 + i * 20
-        # Add swaying effect
-        sway = math.sin(time_normalized * 4 + i) * 5
-        pygame.draw.circle(screen, LEAF_GREEN, 
-                         (int(tree_x + 40 + sway), int(crown_y)), crown_size)
-        pygame.draw.circle(screen, DARK_GREEN, 
-                         (int(tree_x + 40 + sway), int(crown_y)), crown_size, 2)
+        for i, flower in enumerate(self.flowers):
+            if flower['bloomed']:
+                continue
+            flower['previous_growth'] = flower['growth']
+            if flower['growth'] < 1.0:
+                flower['growth'] = min(1.0, flower['growth'] + 0.008)
+            elif flower['previous_growth'] >= 1.0:
+                # Full grown however far through the step it is drawn
+                flower['bloomed'] = True
+                self.bloomed.add(i, lambda surface, flower=flower: draw_flower(
+                    surface, flower['x'], flower['y'], flower['color']))
+
+    def crown_sway(self, time_normalized):
+        """X coordinate of each crown circle's centre at ``time_normalized``"""
+        return tuple(int(self.tree_x + 40 + math.sin(time_normalized * 4 + i) * 5) for i in range(3))
+
+    def draw_crown(self, surface):
+        """Draw the tree crown at its current sway"""
+        for i, crown_x in enumerate(self.crown_x):
+            crown_y = self.tree_y - 30 - i * 40
+            crown_size = 100 + i * 20
+            canvas.circle(surface, LEAF_GREEN, (crown_x, crown_y), crown_size)
+            canvas.circle(surface, DARK_GREEN, (crown_x, crown_y), crown_size, 2)
+
+    def draw(self, elapsed_time, alpha):
+        """Draw the scene at ``elapsed_time``, ``alpha`` of the way through the last step"""
+        screen = self.screen
+        frame = self.frame
     
-    # Animate butterfly flying in a path
-    butterfly_center_x = WIDTH // 2
-    butterfly_center_y = HEIGHT // 3
-    butterfly_x = butterfly_center_x + math.cos(time_normalized * 2 * math.pi * 2) * butterfly_path_radius
-    butterfly_y = butterfly_center_y + math.sin(time_normalized * 2 * math.pi * 2) * butterfly_path_radius * 0.6
+        # Normalized time (0 to 1)
+        time_normalized = elapsed_time / ANIMATION_DURATION
     
-    draw_butterfly(screen, int(butterfly_x), int(butterfly_y), time_normalized)
+        # Draw sky, textured grass ground, tree trunk and the swaying crown
+        profiler.phase("background")
+        self.crown_x = self.crown_sway(time_normalized)
+        frame.clear()
     
-    # Animate falling leaves
-    for leaf in leaves:
-        leaf['y'] += leaf['speed']
-        leaf['x'] += math.sin(leaf['y'] * 0.01) * 0.5
-        leaf['rotation'] += leaf['rotation_speed']
-        
-        # Reset leaf when it falls off screen
-        if leaf['y'] > HEIGHT:
-            leaf['y'] = -20
-            leaf['x'] = random.randint(0, WIDTH)
-        
-        # Draw leaf
-        leaf_points = []
-        for angle in range(0, 360, 90):
-            rad = math.radians(angle + leaf['rotation'])
-            px = leaf['x'] + math.cos(rad) * leaf['size']
-            py = leaf['y'] + math.sin(rad) * leaf['size'] * 0.6
-            leaf_points.append((int(px), int(py)))
-        
-        pygame.draw.polygon(screen, (255, 200, 0), leaf_points)
-        pygame.draw.polygon(screen, (200, 150, 0), leaf_points, 1)
+        # Animate butterflies flying in their paths, one blit each
+        profiler.phase("butterfly")
+        sheet = self.butterfly_sheet
+        butterfly_blits = []
+        for butterfly in self.butterflies[:quality.scale(len(self.butterflies))]:
+            center_x, center_y = butterfly['center']
+            radius_x, radius_y = butterfly['radius']
+            angle = time_normalized * 2 * math.pi * butterfly['laps'] + butterfly['phase']
+            butterfly_x = center_x + math.cos(angle) * radius_x
+            butterfly_y = center_y + math.sin(angle) * radius_y
+            flap = butterfly_flap(time_normalized * butterfly['flap_rate'] + butterfly['flap_phase'])
+            butterfly_blits.append(sheet.at((int(butterfly_x), int(butterfly_y)),
+                                            int(flap * (FLAP_FRAMES - 1) + 0.5), butterfly['scale']))
+        for rect in screen.blits(butterfly_blits):
+            frame.add(rect)
     
-    # Animate flowers growing
-    for flower in flowers:
-        if flower['growth'] < 1.0:
-            flower['growth'] = min(1.0, flower['growth'] + 0.008)
-        
-        if flower['growth'] > 0:
-            scale_y = flower['growth']
-            scaled_y = flower['y'] + 30 * (1 - scale_y)
-            draw_flower(screen, flower['x'], int(scaled_y), flower['color'])
+        # Draw falling leaves from the pre-rotated sprites, one blit each
+        profiler.phase("leaves")
+        for rect in screen.blits(self.leaves.blits(alpha, quality.scale(len(self.leaves)))):
+            frame.add(rect)
     
-    # Draw sun
-    sun_x = WIDTH - 100
-    sun_y = 80
-    pygame.draw.circle(screen, FLOWER_YELLOW, (sun_x, sun_y), 30)
-    # Sun rays
-    for angle in range(0, 360, 45):
-        rad = math.radians(angle + time_normalized * 50)
-        ray_end_x = sun_x + math.cos(rad) * 50
-        ray_end_y = sun_y + math.sin(rad) * 50
-        pygame.draw.line(screen, FLOWER_YELLOW, (sun_x, sun_y), 
-                        (int(ray_end_x), int(ray_end_y)), 3)
+        # Draw growing flowers
+        profiler.phase("flowers")
+        for flower in self.flowers:
+            if flower['bloomed']:
+                continue
+            scale_y = timing.lerp(flower['previous_growth'], flower['growth'], alpha)
+            if scale_y > 0:
+                scaled_y = flower['y'] + 30 * (1 - scale_y)
+                frame.add(draw_flower(screen, flower['x'], int(scaled_y), flower['color']))
+        frame.cover(self.bloomed)
     
-    # Draw timer
-    font = pygame.font.Font(None, 36)
-    time_left = (ANIMATION_DURATION - elapsed_time) / 1000
-    timer_text = font.render(f"Time: {time_left:.1f}s", True, WHITE)
-    screen.blit(timer_text, (10, 10))
+        # Draw sun
+        profiler.phase("sun")
+        sun_x = WIDTH - 100
+        sun_y = 80
+        frame.add(canvas.circle(screen, FLOWER_YELLOW, (sun_x, sun_y), 30))
+        # Sun rays
+        for angle in range(0, 360, 45):
+            rad = math.radians(angle + time_normalized * 50)
+            ray_end_x = sun_x + math.cos(rad) * 50
+            ray_end_y = sun_y + math.sin(rad) * 50
+            frame.add(canvas.line(screen, FLOWER_YELLOW, (sun_x, sun_y), 
+                                  (int(ray_end_x), int(ray_end_y)), 3))
     
-    # Update display
-    pygame.display.flip()
-    clock.tick(FPS)
+        # Draw timer
+        profiler.phase("text")
+        time_left = (ANIMATION_DURATION - elapsed_time) / 1000
+        frame.add(text.atlas(36, WHITE).draw(screen, f"Time: {time_left:.1f}s", (10, 10)))
+
+    def present(self):
+        """Flip the display, or update only the dirty rects"""
+        self.frame.present()
+
+
+def main():
+    scenes.run(sys.modules[__name__])
+
 
-pygame.quit()
-sys.exit()
\ No newline at end of file
+if __name__ == "__main__":
+    main()
\ No newline at end of file
@@ -3,14 +3,19 @@ import math
 import random
 import sys
 
-pygame.init()
+import canvas
+import particles
+import profiler
+import quality
+import scenes
+import text
+import textures
+import timing
 
 WIDTH, HEIGHT = 900, 700
-screen = pygame.display.set_mode((WIDTH, HEIGHT))
-pygame.display.set_caption("Spaceship Launch")
-
-clock = pygame.time.Clock()
 FPS = 60
+ANIMATION_DURATION = 20000
+CAPTION = "Spaceship Launch"
 
 # Colors
 SKY_BLUE = (135, 206, 235)
@@ -30,41 +35,34 @@ STAR_WHITE = (255, 255, 255)
 WHITE = (255, 255, 255)
 MOON_GRAY = (200, 200, 200)
 
+# Exhaust flame colours, picked at random per flame particle
+FLAME_COLORS = [FIRE_ORANGE, FIRE_YELLOW, FIRE_RED]
+
 def create_metal_texture(width, height):
     """Create metallic spaceship texture"""
-    surface = pygame.Surface((width, height))
+    surface = canvas.surface((width, height))
     
     # Base metal color with shine
-    for y in range(height):
-        for x in range(width):
-            # Create metallic shine effect
-            shine = int(20 * math.sin(x * 0.1) * math.cos(y * 0.1))
-            noise = random.randint(-10, 10)
-            base = 200 + shine + noise
-            surface.set_at((x, y), (base, base, base + 20))
+    textures.fill_noise(surface, (200, 200, 220), 10, ripple=(20, 0.1, 0.1))
     
     # Add panel lines
     for y in range(0, height, 30):
-        pygame.draw.line(surface, DARK_GRAY, (0, y), (width, y), 2)
+        canvas.line(surface, DARK_GRAY, (0, y), (width, y), 2)
     
     # Add rivets
     for y in range(15, height, 30):
         for x in range(15, width, 20):
-            pygame.draw.circle(surface, DARK_GRAY, (x, y), 2)
-            pygame.draw.circle(surface, (180, 180, 180), (x - 1, y - 1), 1)
+            canvas.circle(surface, DARK_GRAY, (x, y), 2)
+            canvas.circle(surface, (180, 180, 180), (x - 1, y - 1), 1)
     
     return surface
 
 def create_concrete_texture(width, height):
     """Create launch pad concrete texture"""
-    surface = pygame.Surface((width, height))
+    surface = canvas.surface((width, height))
     
     # Base concrete color
-    for y in range(height):
-        for x in range(width):
-            noise = random.randint(-15, 15)
-            gray = 128 + noise
-            surface.set_at((x, y), (gray, gray, gray + 5))
+    textures.fill_noise(surface, (128, 128, 133), 15)
     
     # Add cracks
     for _ in range(20):
@@ -82,9 +80,9 @@ def create_concrete_texture(width, height):
             next_y += random.randint(-5, 5)
             
             if 0 <= next_x < width and 0 <= next_y < height:
-                pygame.draw.line(surface, DARK_GRAY, 
-                               (int(prev_x), int(prev_y)), 
-                               (int(next_x), int(next_y)), 2)
+                canvas.line(surface, DARK_GRAY, 
+                          (int(prev_x), int(prev_y)), 
+                          (int(next_x), int(next_y)), 2)
             prev_x, prev_y = next_x, next_y
     
     # Add scorch marks
@@ -94,334 +92,326 @@ def create_concrete_texture(width, height):
         scorch_size = random.randint(20, 50)
         for i in range(scorch_size, 0, -3):
             darkness = int(100 * (i / scorch_size))
-            pygame.draw.circle(surface, (darkness, darkness, darkness), 
-                             (scorch_x, scorch_y), i)
+            canvas.circle(surface, (darkness, darkness, darkness), 
+                        (scorch_x, scorch_y), i)
     
     return surface
 
-# Create textures
-rocket_body_texture = create_metal_texture(80, 200)
-launchpad_texture = create_concrete_texture(300, 100)
-
-# Rocket parameters
-rocket = {
-    'x': WIDTH // 2,
-    'y': HEIGHT - 200,
-    'start_y': HEIGHT - 200,
-    'velocity': 0,
-    'acceleration': 0.15,
-    'launched': False
+# Textures: name -> (generator, args, placeholder colour[, textures.SCALABLE]),
+# loaded by textures.load()
+TEXTURES = {
+    'rocket_body': (create_metal_texture, (80, 200), (200, 200, 220)),
+    'launchpad': (create_concrete_texture, (300, 100), CONCRETE_GRAY, textures.SCALABLE),
 }
 
-# Flame particles
-flames = []
-smoke_particles = []
+class Scene:
+    """A rocket counting down on its launch pad and lifting off from day into space"""
 
-# Exhaust flames (bottom of rocket)
-exhaust_flames = []
+    def __init__(self, screen, texture):
+        self.screen = screen
+        # Simulation randomness has a stream of its own, so the random flicker
+        # drawn each frame never changes what happens next
+        self.random = random.Random(random.getrandbits(64))
+        self.texture = texture
 
-# Stars (for space)
-stars = []
-for _ in range(150):
-    stars.append({
-        'x': random.randint(0, WIDTH),
-        'y': random.randint(0, HEIGHT // 2),
-        'size': random.randint(1, 3),
-        'twinkle': random.uniform(0, math.pi * 2)
-    })
+        # Rocket parameters
+        self.rocket = {
+            'x': WIDTH // 2,
+            'y': HEIGHT - 200,
+            'previous': (WIDTH // 2, HEIGHT - 200),
+            'start_y': HEIGHT - 200,
+            'velocity': 0,
+            'acceleration': 0.15,
+            'launched': False
+        }
 
-# Clouds
-clouds = []
-for _ in range(8):
-    clouds.append({
-        'x': random.randint(-100, WIDTH + 100),
-        'y': random.randint(50, 250),
-        'width': random.randint(80, 150),
-        'speed': random.uniform(0.3, 0.8)
-    })
+        # Flame particles: 8 per step living up to 40 steps, and 3 puffs of
+        # smoke per step living up to 80
+        self.flames = particles.system(512, FLAME_COLORS, 40)
+        self.smoke_particles = particles.system(256, [SMOKE_GRAY], 80, growth=0.3)
 
-# Moon
-moon = {
-    'x': WIDTH - 150,
-    'y': 100,
-    'radius': 50
-}
+        # Stars (for space)
+        self.stars = []
+        for _ in range(150):
+            self.stars.append({
+                'x': random.randint(0, WIDTH),
+                'y': random.randint(0, HEIGHT // 2),
+                'size': random.randint(1, 3),
+                'twinkle': random.uniform(0, math.pi * 2)
+            })
 
-# Countdown
-countdown_time = 3000  # 3 seconds countdown
-launch_time = None
+        # Clouds
+        self.clouds = []
+        for _ in range(8):
+            x = random.randint(-100, WIDTH + 100)
+            self.clouds.append({
+                'x': x,
+                'previous_x': x,
+                'y': random.randint(50, 250),
+                'width': random.randint(80, 150),
+                'speed': random.uniform(0.3, 0.8)
+            })
 
-start_time = pygame.time.get_ticks()
-ANIMATION_DURATION = 20000
+        # Moon
+        self.moon = {
+            'x': WIDTH - 150,
+            'y': 100,
+            'radius': 50
+        }
+
+        # Countdown
+        self.countdown_time = 3000  # 3 seconds countdown
+        self.launch_time = None
+        self.countdown_glow = text.GlowText(120, FIRE_RED, FIRE_ORANGE, range(5, 0, -1),
+                                            glow_alpha=lambda offset: 100 - offset * 15)
+
+    def transition(self):
+        """How far the sky has turned from blue to space (0 to 1)"""
+        if self.rocket['launched']:
+            return min(1.0, self.rocket['velocity'] * 0.15)
+        return 0
 
-running = True
-while running:
-    current_time = pygame.time.get_ticks()
-    elapsed_time = current_time - start_time
+    def update(self, elapsed_time):
+        """Advance the countdown, rocket, clouds, stars and exhaust by one step"""
+        rocket = self.rocket
+
+        # Start countdown at 1 second, launch at 4 seconds
+        if elapsed_time >= 1000 and not rocket['launched'] and self.launch_time is None:
+            self.launch_time = elapsed_time
+    
+        if self.launch_time is not None and elapsed_time - self.launch_time >= self.countdown_time:
+            rocket['launched'] = True
     
-    if elapsed_time > ANIMATION_DURATION:
-        pygame.time.wait(1000)
-        running = False
+        transition = self.transition()
     
-    time_normalized = elapsed_time / ANIMATION_DURATION
+        # Twinkle stars (once they show in space)
+        if transition > 0.3:
+            for star in self.stars:
+                star['twinkle'] += 0.05
     
-    for event in pygame.event.get():
-        if event.type == pygame.QUIT:
-            running = False
-        if event.type == pygame.KEYDOWN:
-            if event.key == pygame.K_ESCAPE:
-                running = False
+        # Drift clouds (until they fade out)
+        if transition < 0.8:
+            for cloud in self.clouds:
+                cloud['previous_x'] = cloud['x']
+                cloud['x'] += cloud['speed']
+                if cloud['x'] > WIDTH + 100:
+                    cloud['x'] = -100
+                    cloud['previous_x'] = cloud['x']
     
-    # Start countdown at 1 second, launch at 4 seconds
-    if elapsed_time >= 1000 and not rocket['launched'] and launch_time is None:
-        launch_time = elapsed_time
+        # Update rocket position
+        rocket['previous'] = (rocket['x'], rocket['y'])
+        if rocket['launched']:
+            rocket['velocity'] += rocket['acceleration']
+            rocket['y'] -= rocket['velocity']
     
-    if launch_time is not None and elapsed_time - launch_time >= countdown_time:
-        rocket['launched'] = True
+        # Generate exhaust flames
+        if rocket['launched']:
+            for _ in range(quality.scale(8)):
+                self.flames.emit(x=rocket['x'] + self.random.randint(-15, 15),
+                                 y=rocket['y'] + 100,
+                                 velocity_y=self.random.uniform(2, 5),
+                                 velocity_x=self.random.uniform(-2, 2),
+                                 size=self.random.randint(8, 20),
+                                 life=self.random.randint(20, 40),
+                                 color=self.random.randrange(len(FLAME_COLORS)))
+        
+            # Smoke particles
+            for _ in range(quality.scale(3)):
+                self.smoke_particles.emit(x=rocket['x'] + self.random.randint(-20, 20),
+                                          y=rocket['y'] + 100,
+                                          velocity_y=self.random.uniform(0.5, 1.5),
+                                          velocity_x=self.random.uniform(-1, 1),
+                                          size=self.random.randint(10, 25),
+                                          life=self.random.randint(40, 80))
     
-    # Calculate sky transition (blue to space)
-    if rocket['launched']:
-        transition = min(1.0, rocket['velocity'] * 0.15)
-    else:
-        transition = 0
+        self.smoke_particles.update()
+        self.flames.update()
+    
+        # Vibration effect when launching
+        if rocket['y'] < HEIGHT + 100 and rocket['launched'] and rocket['velocity'] < 5:
+            shake_x = self.random.randint(-2, 2)
+            shake_y = self.random.randint(-2, 2)
+            rocket['x'] += shake_x
+            rocket['y'] += shake_y
+
+    def draw(self, elapsed_time, alpha):
+        """Draw the scene at ``elapsed_time``, ``alpha`` of the way through the last step"""
+        screen = self.screen
+        moon = self.moon
+        launch_time = self.launch_time
+        transition = self.transition()
+        rocket_x = timing.lerp(self.rocket['previous'][0], self.rocket['x'], alpha)
+        rocket_y = timing.lerp(self.rocket['previous'][1], self.rocket['y'], alpha)
     
-    # Draw sky/space gradient
-    for y in range(HEIGHT):
-        # Sky to space transition
+        # Draw sky/space gradient. The sky to space transition moves every
+        # row by the same amount, so a single fill paints the whole frame.
+        profiler.phase("sky")
         sky_color = (
             int(SKY_BLUE[0] * (1 - transition) + SPACE_BLACK[0] * transition),
             int(SKY_BLUE[1] * (1 - transition) + SPACE_BLACK[1] * transition),
             int(SKY_BLUE[2] * (1 - transition) + SPACE_BLACK[2] * transition)
         )
-        pygame.draw.line(screen, sky_color, (0, y), (WIDTH, y))
+        screen.fill(sky_color)
     
-    # Draw stars (fade in as we go to space)
-    if transition > 0.3:
-        for star in stars:
-            star['twinkle'] += 0.05
-            brightness = (math.sin(star['twinkle']) + 1) / 2
-            alpha = brightness * (transition - 0.3) / 0.7
-            color = tuple(int(c * alpha) for c in STAR_WHITE)
-            pygame.draw.circle(screen, color, (star['x'], star['y']), star['size'])
+        # Draw stars (fade in as we go to space)
+        profiler.phase("stars")
+        if transition > 0.3:
+            for star in self.stars[:quality.scale(len(self.stars))]:
+                brightness = (math.sin(star['twinkle']) + 1) / 2
+                star_alpha = brightness * (transition - 0.3) / 0.7
+                color = tuple(int(c * star_alpha) for c in STAR_WHITE)
+                canvas.circle(screen, color, (star['x'], star['y']), star['size'])
     
-    # Draw moon (fade in)
-    if transition > 0.5:
-        moon_alpha = (transition - 0.5) / 0.5
-        moon_color = tuple(int(c * moon_alpha) for c in MOON_GRAY)
-        pygame.draw.circle(screen, moon_color, (moon['x'], moon['y']), moon['radius'])
-        # Craters
-        if moon_alpha > 0.5:
-            pygame.draw.circle(screen, tuple(int(c * 0.8) for c in moon_color), 
-                             (moon['x'] - 15, moon['y'] - 10), 8)
-            pygame.draw.circle(screen, tuple(int(c * 0.8) for c in moon_color), 
-                             (moon['x'] + 10, moon['y'] + 5), 12)
-            pygame.draw.circle(screen, tuple(int(c * 0.8) for c in moon_color), 
-                             (moon['x'] + 5, moon['y'] - 20), 6)
+        # Draw moon (fade in)
+        profiler.phase("moon")
+        if transition > 0.5:
+            moon_alpha = (transition - 0.5) / 0.5
+            moon_color = tuple(int(c * moon_alpha) for c in MOON_GRAY)
+            canvas.circle(screen, moon_color, (moon['x'], moon['y']), moon['radius'])
+            # Craters
+            if moon_alpha > 0.5:
+                canvas.circle(screen, tuple(int(c * 0.8) for c in moon_color), 
+                            (moon['x'] - 15, moon['y'] - 10), 8)
+                canvas.circle(screen, tuple(int(c * 0.8) for c in moon_color), 
+                            (moon['x'] + 10, moon['y'] + 5), 12)
+                canvas.circle(screen, tuple(int(c * 0.8) for c in moon_color), 
+                            (moon['x'] + 5, moon['y'] - 20), 6)
     
-    # Draw clouds (fade out as we go to space)
-    if transition < 0.8:
-        for cloud in clouds:
-            cloud['x'] += cloud['speed']
-            if cloud['x'] > WIDTH + 100:
-                cloud['x'] = -100
+        # Draw clouds (fade out as we go to space)
+        profiler.phase("clouds")
+        if transition < 0.8:
+            for cloud in self.clouds:
+                cloud_x = timing.lerp(cloud['previous_x'], cloud['x'], alpha)
+                cloud_alpha = 1 - (transition / 0.8)
+                cloud_color = tuple(int(c * cloud_alpha) for c in CLOUD_WHITE)
             
-            cloud_alpha = 1 - (transition / 0.8)
-            cloud_color = tuple(int(c * cloud_alpha) for c in CLOUD_WHITE)
-            
-            # Cloud puffs
-            pygame.draw.ellipse(screen, cloud_color, 
-                              (int(cloud['x']), cloud['y'], cloud['width'], 40))
-            pygame.draw.ellipse(screen, cloud_color, 
-                              (int(cloud['x'] + 20), cloud['y'] - 15, cloud['width'] - 40, 40))
-            pygame.draw.ellipse(screen, cloud_color, 
-                              (int(cloud['x'] + 40), cloud['y'] - 10, cloud['width'] - 60, 35))
+                # Cloud puffs
+                canvas.ellipse(screen, cloud_color, 
+                             (int(cloud_x), cloud['y'], cloud['width'], 40))
+                canvas.ellipse(screen, cloud_color, 
+                             (int(cloud_x + 20), cloud['y'] - 15, cloud['width'] - 40, 40))
+                canvas.ellipse(screen, cloud_color, 
+                             (int(cloud_x + 40), cloud['y'] - 10, cloud['width'] - 60, 35))
     
-    # Draw ground (fade out as we go to space)
-    if transition < 0.7:
-        ground_alpha = 1 - (transition / 0.7)
-        ground_color = tuple(int(GROUND_GREEN[i] * ground_alpha + SPACE_BLACK[i] * (1 - ground_alpha)) 
-                           for i in range(3))
-        pygame.draw.rect(screen, ground_color, (0, HEIGHT - 100, WIDTH, 100))
+        # Draw ground (fade out as we go to space)
+        profiler.phase("ground")
+        if transition < 0.7:
+            ground_alpha = 1 - (transition / 0.7)
+            ground_color = tuple(int(GROUND_GREEN[i] * ground_alpha + SPACE_BLACK[i] * (1 - ground_alpha)) 
+                               for i in range(3))
+            canvas.rect(screen, ground_color, (0, HEIGHT - 100, WIDTH, 100))
         
-        # Ground details
-        for _ in range(30):
-            grass_x = random.randint(0, WIDTH)
-            grass_y = HEIGHT - random.randint(80, 100)
-            grass_color = tuple(int(c * ground_alpha * 0.7) for c in GROUND_GREEN)
-            pygame.draw.line(screen, grass_color, 
-                           (grass_x, grass_y), 
-                           (grass_x, grass_y - random.randint(5, 15)), 1)
+            # Ground details
+            for _ in range(30):
+                grass_x = random.randint(0, WIDTH)
+                grass_y = HEIGHT - random.randint(80, 100)
+                grass_color = tuple(int(c * ground_alpha * 0.7) for c in GROUND_GREEN)
+                canvas.line(screen, grass_color, 
+                          (grass_x, grass_y), 
+                          (grass_x, grass_y - random.randint(5, 15)), 1)
     
-    # Draw launch pad
-    if rocket['y'] > HEIGHT - 10:
-        pad_alpha = min(1.0, (rocket['y'] - (HEIGHT - 500)) / 200)
-        if pad_alpha > 0:
-            launchpad_surface = launchpad_texture.copy()
-            launchpad_surface.set_alpha(int(255 * pad_alpha))
-            screen.blit(launchpad_surface, (WIDTH // 2 - 150, HEIGHT - 150))
+        # Draw launch pad
+        profiler.phase("launch pad")
+        if rocket_y > HEIGHT - 10:
+            pad_alpha = min(1.0, (rocket_y - (HEIGHT - 500)) / 200)
+            if pad_alpha > 0:
+                launchpad_surface = self.texture['launchpad'].copy()
+                launchpad_surface.set_alpha(int(255 * pad_alpha))
+                canvas.blit(screen, launchpad_surface, (WIDTH // 2 - 150, HEIGHT - 150))
             
-            # Support towers
-            tower_color = tuple(int(c * pad_alpha) for c in CONCRETE_GRAY)
-            pygame.draw.rect(screen, tower_color, (WIDTH // 2 - 180, HEIGHT - 250, 20, 150))
-            pygame.draw.rect(screen, tower_color, (WIDTH // 2 + 160, HEIGHT - 250, 20, 150))
+                # Support towers
+                tower_color = tuple(int(c * pad_alpha) for c in CONCRETE_GRAY)
+                canvas.rect(screen, tower_color, (WIDTH // 2 - 180, HEIGHT - 250, 20, 150))
+                canvas.rect(screen, tower_color, (WIDTH // 2 + 160, HEIGHT - 250, 20, 150))
             
-            # Connecting bridges
-            pygame.draw.rect(screen, tower_color, (WIDTH // 2 - 180, HEIGHT - 230, 40, 5))
-            pygame.draw.rect(screen, tower_color, (WIDTH // 2 + 140, HEIGHT - 230, 40, 5))
-    
-    # Update rocket position
-    if rocket['launched']:
-        rocket['velocity'] += rocket['acceleration']
-        rocket['y'] -= rocket['velocity']
+                # Connecting bridges
+                canvas.rect(screen, tower_color, (WIDTH // 2 - 180, HEIGHT - 230, 40, 5))
+                canvas.rect(screen, tower_color, (WIDTH // 2 + 140, HEIGHT - 230, 40, 5))
     
-    # Generate exhaust flames
-    if rocket['launched']:
-        for _ in range(8):
-            flames.append({
-                'x': rocket['x'] + random.randint(-15, 15),
-                'y': rocket['y'] + 100,
-                'velocity_y': random.uniform(2, 5),
-                'velocity_x': random.uniform(-2, 2),
-                'size': random.randint(8, 20),
-                'life': random.randint(20, 40),
-                'color_type': random.choice(['orange', 'yellow', 'red'])
-            })
-        
-        # Smoke particles
-        for _ in range(3):
-            smoke_particles.append({
-                'x': rocket['x'] + random.randint(-20, 20),
-                'y': rocket['y'] + 100,
-                'velocity_y': random.uniform(0.5, 1.5),
-                'velocity_x': random.uniform(-1, 1),
-                'size': random.randint(10, 25),
-                'life': random.randint(40, 80)
-            })
+        # Draw smoke
+        profiler.phase("smoke")
+        self.smoke_particles.draw(screen, alpha)
     
-    # Draw smoke
-    for smoke in smoke_particles[:]:
-        smoke['y'] += smoke['velocity_y']
-        smoke['x'] += smoke['velocity_x']
-        smoke['life'] -= 1
-        smoke['size'] += 0.3
-        
-        if smoke['life'] <= 0:
-            smoke_particles.remove(smoke)
-        else:
-            alpha = smoke['life'] / 80
-            color = tuple(int(SMOKE_GRAY[i] * alpha) for i in range(3))
-            pygame.draw.circle(screen, color, 
-                             (int(smoke['x']), int(smoke['y'])), int(smoke['size']))
+        # Draw flames
+        profiler.phase("flames")
+        self.flames.draw(screen, alpha)
     
-    # Draw flames
-    for flame in flames[:]:
-        flame['y'] += flame['velocity_y']
-        flame['x'] += flame['velocity_x']
-        flame['life'] -= 1
-        
-        if flame['life'] <= 0:
-            flames.remove(flame)
-        else:
-            alpha = flame['life'] / 40
-            if flame['color_type'] == 'orange':
-                color = tuple(int(FIRE_ORANGE[i] * alpha) for i in range(3))
-            elif flame['color_type'] == 'yellow':
-                color = tuple(int(FIRE_YELLOW[i] * alpha) for i in range(3))
-            else:
-                color = tuple(int(FIRE_RED[i] * alpha) for i in range(3))
-            
-            pygame.draw.circle(screen, color, 
-                             (int(flame['x']), int(flame['y'])), int(flame['size']))
-    
-    # Draw rocket
-    if rocket['y'] < HEIGHT + 100:
-        # Nose cone (red)
-        nose_points = [
-            (rocket['x'], rocket['y'] - 40),
-            (rocket['x'] - 40, rocket['y']),
-            (rocket['x'] + 40, rocket['y'])
-        ]
-        pygame.draw.polygon(screen, ROCKET_RED, nose_points)
-        pygame.draw.polygon(screen, (180, 0, 40), nose_points, 2)
-        
-        # Rocket body with texture
-        rocket_surface = rocket_body_texture.copy()
-        screen.blit(rocket_surface, (int(rocket['x'] - 40), int(rocket['y'])))
+        # Draw rocket
+        profiler.phase("rocket")
+        if rocket_y < HEIGHT + 100:
+            # Nose cone (red)
+            nose_points = [
+                (rocket_x, rocket_y - 40),
+                (rocket_x - 40, rocket_y),
+                (rocket_x + 40, rocket_y)
+            ]
+            canvas.polygon(screen, ROCKET_RED, nose_points)
+            canvas.polygon(screen, (180, 0, 40), nose_points, 2)
         
-        # Fins
-        left_fin = [
-            (rocket['x'] - 40, rocket['y'] + 180),
-            (rocket['x'] - 70, rocket['y'] + 200),
-            (rocket['x'] - 40, rocket['y'] + 200)
-        ]
-        right_fin = [
-            (rocket['x'] + 40, rocket['y'] + 180),
-            (rocket['x'] + 70, rocket['y'] + 200),
-            (rocket['x'] + 40, rocket['y'] + 200)
-        ]
-        pygame.draw.polygon(screen, ROCKET_RED, left_fin)
-        pygame.draw.polygon(screen, ROCKET_RED, right_fin)
-        pygame.draw.polygon(screen, (180, 0, 40), left_fin, 2)
-        pygame.draw.polygon(screen, (180, 0, 40), right_fin, 2)
+            # Rocket body with texture
+            canvas.blit(screen, self.texture['rocket_body'], (int(rocket_x - 40), int(rocket_y)))
         
-        # Window
-        pygame.draw.circle(screen, SKY_BLUE, (int(rocket['x']), int(rocket['y'] + 30)), 12)
-        pygame.draw.circle(screen, DARK_GRAY, (int(rocket['x']), int(rocket['y'] + 30)), 12, 2)
+            # Fins
+            left_fin = [
+                (rocket_x - 40, rocket_y + 180),
+                (rocket_x - 70, rocket_y + 200),
+                (rocket_x - 40, rocket_y + 200)
+            ]
+            right_fin = [
+                (rocket_x + 40, rocket_y + 180),
+                (rocket_x + 70, rocket_y + 200),
+                (rocket_x + 40, rocket_y + 200)
+            ]
+            canvas.polygon(screen, ROCKET_RED, left_fin)
+            canvas.polygon(screen, ROCKET_RED, right_fin)
+            canvas.polygon(screen, (180, 0, 40), left_fin, 2)
+            canvas.polygon(screen, (180, 0, 40), right_fin, 2)
         
-        # Engine nozzles
-        pygame.draw.rect(screen, DARK_GRAY, 
-                        (rocket['x'] - 30, rocket['y'] + 200, 20, 15))
-        pygame.draw.rect(screen, DARK_GRAY, 
-                        (rocket['x'] + 10, rocket['y'] + 200, 20, 15))
+            # Window
+            canvas.circle(screen, SKY_BLUE, (int(rocket_x), int(rocket_y + 30)), 12)
+            canvas.circle(screen, DARK_GRAY, (int(rocket_x), int(rocket_y + 30)), 12, 2)
         
-        # Vibration effect when launching
-        if rocket['launched'] and rocket['velocity'] < 5:
-            shake_x = random.randint(-2, 2)
-            shake_y = random.randint(-2, 2)
-            rocket['x'] += shake_x
-            rocket['y'] += shake_y
+            # Engine nozzles
+            canvas.rect(screen, DARK_GRAY, 
+                       (rocket_x - 30, rocket_y + 200, 20, 15))
+            canvas.rect(screen, DARK_GRAY, 
+                       (rocket_x + 10, rocket_y + 200, 20, 15))
     
-    # Draw countdown
-    if launch_time is not None and elapsed_time - launch_time < countdown_time:
-        countdown_remaining = countdown_time - (elapsed_time - launch_time)
-        countdown_number = int(countdown_remaining / 1000) + 1
-        
-        font = pygame.font.Font(None, 120)
-        countdown_text = font.render(str(countdown_number), True, FIRE_RED)
-        text_rect = countdown_text.get_rect(center=(WIDTH // 2, HEIGHT // 2 - 100))
-        
-        # Glow effect
-        for offset in range(5, 0, -1):
-            glow_surface = font.render(str(countdown_number), True, FIRE_ORANGE)
-            glow_surface.set_alpha(100 - offset * 15)
-            screen.blit(glow_surface, (text_rect.x + offset, text_rect.y))
-            screen.blit(glow_surface, (text_rect.x - offset, text_rect.y))
+        # Draw countdown
+        profiler.phase("text")
+        if launch_time is not None and elapsed_time - launch_time < self.countdown_time:
+            countdown_remaining = self.countdown_time - (elapsed_time - launch_time)
+            countdown_number = int(countdown_remaining / 1000) + 1
         
-        screen.blit(countdown_text, text_rect)
+            countdown_text = str(countdown_number)
+            text_rect = pygame.Rect((0, 0), self.countdown_glow.size(countdown_text))
+            text_rect.center = (WIDTH // 2, HEIGHT // 2 - 100)
+            self.countdown_glow.draw(screen, countdown_text, text_rect.topleft)
     
-    # Draw timer
-    timer_font = pygame.font.Font(None, 42)
-    time_left = (ANIMATION_DURATION - elapsed_time) / 1000
-    timer_text = timer_font.render(f"{time_left:.1f}s", True, WHITE)
-    screen.blit(timer_text, (WIDTH - 120, 20))
+        # Draw timer
+        time_left = (ANIMATION_DURATION - elapsed_time) / 1000
+        text.atlas(42, WHITE).draw(screen, f"{time_left:.1f}s", (WIDTH - 120, 20))
     
-    # Launch status
-    status_font = pygame.font.Font(None, 36)
-    if not rocket['launched'] and launch_time is None:
-        status = "READY FOR LAUNCH"
-        color = FIRE_YELLOW
-    elif launch_time is not None and not rocket['launched']:
-        status = "LAUNCHING..."
-        color = FIRE_ORANGE
-    else:
-        status = "LIFTOFF!"
-        color = FIRE_RED
-    
-    status_text = status_font.render(status, True, color)
-    screen.blit(status_text, (WIDTH // 2 - status_text.get_width() // 2, 20))
+        # Launch status
+        status_font = text.font(canvas.pixels(36))
+        if not self.rocket['launched'] and launch_time is None:
+            status = "READY FOR LAUNCH"
+            color = FIRE_YELLOW
+        elif launch_time is not None and not self.rocket['launched']:
+            status = "LAUNCHING..."
+            color = FIRE_ORANGE
+        else:
+            status = "LIFTOFF!"
+            color = FIRE_RED
     
-    pygame.display.flip()
-    clock.tick(FPS)
+        status_text = status_font.render(status, True, color)
+        status_x = WIDTH // 2 - canvas.unscaled(status_text.get_width()) // 2
+        canvas.blit(screen, status_text, (status_x, 20))
+
+
+def main():
+    scenes.run(sys.modules[__name__])
+
 
-pygame.quit()
-sys.exit()
\ No newline at end of file
+if __name__ == "__main__":
+    main()
\ No newline at end of file
@@ -3,14 +3,22 @@ import math
 import random
 import sys
 
-pygame.init()
+import canvas
+import glows
+import gradients
+import layers
+import profiler
+import quality
+import scenes
+import stamps
+import text
+import textures
+import timing
 
 WIDTH, HEIGHT = 900, 700
-screen = pygame.display.set_mode((WIDTH, HEIGHT))
-pygame.display.set_caption("Magical Portal Temple")
-
-clock = pygame.time.Clock()
 FPS = 60
+ANIMATION_DURATION = 20000
+CAPTION = "Magical Portal Temple"
 
 # Colors
 DEEP_PURPLE = (20, 0, 40)
@@ -28,14 +36,10 @@ ORANGE = (255, 140, 0)
 
 def create_stone_texture(width, height):
     """Create ancient stone brick texture"""
-    surface = pygame.Surface((width, height))
+    surface = canvas.surface((width, height))
     
     # Base stone color with weathering
-    for y in range(height):
-        for x in range(width):
-            noise = random.randint(-20, 20)
-            base = 85 + noise
-            surface.set_at((x, y), (base, base, base + 5))
+    textures.fill_noise(surface, (85, 85, 90), 20)
     
     # Draw brick pattern
     brick_height = 25
@@ -46,17 +50,17 @@ def create_stone_texture(width, height):
         for col in range(-brick_width, width + brick_width, brick_width):
             x = col + offset
             # Brick outlines
-            pygame.draw.rect(surface, DARK_STONE, 
-                           (x, row, brick_width - 2, brick_height - 2), 1)
+            canvas.rect(surface, DARK_STONE, 
+                      (x, row, brick_width - 2, brick_height - 2), 1)
             
             # Add cracks
             if random.random() > 0.7:
                 crack_start_x = x + random.randint(5, brick_width - 10)
                 crack_start_y = row + random.randint(5, brick_height - 10)
                 crack_length = random.randint(5, 15)
-                pygame.draw.line(surface, DARK_STONE,
-                               (crack_start_x, crack_start_y),
-                               (crack_start_x + crack_length, crack_start_y + crack_length), 1)
+                canvas.line(surface, DARK_STONE,
+                          (crack_start_x, crack_start_y),
+                          (crack_start_x + crack_length, crack_start_y + crack_length), 1)
     
     # Add moss patches
     for _ in range(30):
@@ -64,16 +68,16 @@ def create_stone_texture(width, height):
         moss_y = random.randint(0, height)
         moss_size = random.randint(3, 8)
         for i in range(moss_size):
-            pygame.draw.circle(surface, MOSS_GREEN, 
-                             (moss_x + random.randint(-5, 5), 
-                              moss_y + random.randint(-5, 5)), 
-                             random.randint(1, 3))
+            canvas.circle(surface, MOSS_GREEN, 
+                        (moss_x + random.randint(-5, 5), 
+                         moss_y + random.randint(-5, 5)), 
+                        random.randint(1, 3))
     
     return surface
 
 def create_rune_texture(size):
     """Create glowing magical rune"""
-    surface = pygame.Surface((size, size))
+    surface = canvas.surface((size, size))
     surface.set_colorkey((0, 0, 0))
     surface.fill((0, 0, 0))
     
@@ -81,7 +85,7 @@ def create_rune_texture(size):
     
     # Draw mystical symbol
     # Outer circle
-    pygame.draw.circle(surface, MAGIC_CYAN, (center, center), size // 2 - 2, 2)
+    canvas.circle(surface, MAGIC_CYAN, (center, center), size // 2 - 2, 2)
     
     # Inner star pattern
     points = []
@@ -95,20 +99,20 @@ def create_rune_texture(size):
         y = center + math.sin(angle) * radius
         points.append((int(x), int(y)))
     
-    pygame.draw.polygon(surface, MAGIC_PURPLE, points, 2)
+    canvas.polygon(surface, MAGIC_PURPLE, points, 2)
     
     # Center circle
-    pygame.draw.circle(surface, MAGIC_PINK, (center, center), size // 8)
+    canvas.circle(surface, MAGIC_PINK, (center, center), size // 8)
     
     # Add glow
     for i in range(3, 0, -1):
-        pygame.draw.circle(surface, (80, 20, 120), (center, center), size // 2 - 2 + i * 2, 1)
+        canvas.circle(surface, (80, 20, 120), (center, center), size // 2 - 2 + i * 2, 1)
     
     return surface
 
 def create_crystal_texture(width, height):
     """Create glowing crystal texture"""
-    surface = pygame.Surface((width, height))
+    surface = canvas.surface((width, height))
     surface.set_colorkey((0, 0, 0))
     surface.fill((0, 0, 0))
     
@@ -121,217 +125,282 @@ def create_crystal_texture(width, height):
         (0, height // 3)
     ]
     
-    pygame.draw.polygon(surface, CRYSTAL_BLUE, points)
+    canvas.polygon(surface, CRYSTAL_BLUE, points)
     
     # Add internal facet lines
     for i in range(len(points)):
-        pygame.draw.line(surface, WHITE, points[i], (width // 2, height // 2), 1)
+        canvas.line(surface, WHITE, points[i], (width // 2, height // 2), 1)
     
     # Highlight
-    pygame.draw.circle(surface, WHITE, (width // 2, height // 4), 3)
+    canvas.circle(surface, WHITE, (width // 2, height // 4), 3)
     
     return surface
 
-# Create textures
-temple_wall_left = create_stone_texture(200, 500)
-temple_wall_right = create_stone_texture(200, 500)
-ground_texture = create_stone_texture(WIDTH, 150)
+def create_rune_glow(pulse_alpha):
+    """Create the glow behind a rune at one point of its pulse"""
+    glow_size = int(70 + 10 * pulse_alpha)
+    glow_surf = canvas.surface((glow_size, glow_size))
+    glow_surf.set_colorkey((0, 0, 0))
+    glow_surf.fill((0, 0, 0))
+    glow_color = (
+        int(MAGIC_CYAN[0] * pulse_alpha * 0.3),
+        int(MAGIC_CYAN[1] * pulse_alpha * 0.3),
+        int(MAGIC_CYAN[2] * pulse_alpha * 0.3)
+    )
+    canvas.circle(glow_surf, glow_color, (glow_size // 2, glow_size // 2), glow_size // 2)
+    return glow_surf
+
+# Steps per pulse in the rune glow table; the pulse advances 0.05 radians a
+# frame, so 128 steps is about one per frame
+RUNE_GLOW_STEPS = 128
+
+_rune_glows = None
+
+def rune_glows():
+    """The rune glow at every step of its pulse, built the first time a
+    scene asks for it and shared by every scene after"""
+    global _rune_glows
+    if _rune_glows is None:
+        _rune_glows = []
+        for step in range(RUNE_GLOW_STEPS):
+            pulse_alpha = (math.sin(step / RUNE_GLOW_STEPS * math.pi * 2) + 1) / 2
+            glow_surf = create_rune_glow(pulse_alpha).convert()
+            glow_surf.set_colorkey((0, 0, 0), pygame.RLEACCEL)
+            _rune_glows.append(glow_surf)
+    return _rune_glows
 
-# Create runes
-runes = []
 rune_positions = [
     (150, 200), (750, 200), (150, 350), (750, 350)
 ]
-for pos in rune_positions:
-    runes.append({
-        'texture': create_rune_texture(60),
-        'x': pos[0],
-        'y': pos[1],
-        'pulse': random.uniform(0, math.pi * 2)
-    })
 
-# Create crystals
-crystals = []
 crystal_positions = [
     (100, HEIGHT - 200), (800, HEIGHT - 220), (200, HEIGHT - 180), (700, HEIGHT - 190)
 ]
-for pos in crystal_positions:
-    crystals.append({
-        'texture': create_crystal_texture(30, 40),
-        'x': pos[0],
-        'y': pos[1],
-        'glow_phase': random.uniform(0, math.pi * 2)
-    })
 
-# Portal parameters
-portal_center_x = WIDTH // 2
-portal_center_y = HEIGHT // 2
-portal_radius = 120
+# Textures: name -> (generator, args, placeholder colour), loaded by textures.load()
+TEXTURES = {
+    'temple_wall_left': (create_stone_texture, (200, 500), DARK_STONE),
+    'temple_wall_right': (create_stone_texture, (200, 500), DARK_STONE),
+    'ground': (create_stone_texture, (WIDTH, 150), DARK_STONE),
+}
+for i in range(len(rune_positions)):
+    TEXTURES[f'rune{i}'] = (create_rune_texture, (60,), None)
+for i in range(len(crystal_positions)):
+    TEXTURES[f'crystal{i}'] = (create_crystal_texture, (30, 40), None)
 
-# Energy particles orbiting portal
-particles = []
-for _ in range(100):
-    particles.append({
-        'angle': random.uniform(0, math.pi * 2),
-        'distance': random.uniform(50, 150),
-        'speed': random.uniform(0.02, 0.05),
-        'size': random.randint(2, 5),
-        'color': random.choice([MAGIC_PURPLE, MAGIC_CYAN, MAGIC_PINK])
-    })
+class Scene:
+    """A temple with a swirling portal, orbiting energy, floating orbs and glowing runes"""
 
-# Lightning bolts from portal
-lightning_bolts = []
+    def __init__(self, screen, texture):
+        self.screen = screen
+        # Simulation randomness has a stream of its own, so the random flicker
+        # drawn each frame never changes what happens next
+        self.random = random.Random(random.getrandbits(64))
 
-# Floating orbs
-orbs = []
-for _ in range(8):
-    orbs.append({
-        'x': random.randint(100, WIDTH - 100),
-        'y': random.randint(100, 300),
-        'float_offset': random.uniform(0, math.pi * 2),
-        'float_speed': random.uniform(0.02, 0.04),
-        'size': random.randint(8, 15),
-        'color': random.choice([MAGIC_PURPLE, MAGIC_CYAN, MAGIC_PINK, GOLD])
-    })
+        # Create runes
+        self.runes = []
+        for i, pos in enumerate(rune_positions):
+            self.runes.append({
+                'texture': texture[f'rune{i}'],
+                'x': pos[0],
+                'y': pos[1],
+                'pulse': random.uniform(0, math.pi * 2)
+            })
 
-# Torch flames
-torches = [
-    {'x': 100, 'y': 150},
-    {'x': 800, 'y': 150}
-]
+        # Rune glow for each step of the pulse; the glow used to be drawn five
+        # times over, identically, so one blit of the cached sprite is enough
+        self.rune_glows = rune_glows()
 
-start_time = pygame.time.get_ticks()
-ANIMATION_DURATION = 20000
+        # Create crystals
+        self.crystals = []
+        for i, pos in enumerate(crystal_positions):
+            self.crystals.append({
+                'texture': texture[f'crystal{i}'],
+                'x': pos[0],
+                'y': pos[1],
+                'glow_phase': random.uniform(0, math.pi * 2)
+            })
+
+        # Portal parameters
+        self.portal_center_x = WIDTH // 2
+        self.portal_center_y = HEIGHT // 2
+        self.portal_radius = 120
+
+        # Energy particles orbiting portal
+        self.particles = []
+        for _ in range(100):
+            angle = random.uniform(0, math.pi * 2)
+            self.particles.append({
+                'angle': angle,
+                'previous_angle': angle,
+                'distance': random.uniform(50, 150),
+                'speed': random.uniform(0.02, 0.05),
+                'size': random.randint(2, 5),
+                'color': random.choice([MAGIC_PURPLE, MAGIC_CYAN, MAGIC_PINK])
+            })
 
-running = True
-while running:
-    current_time = pygame.time.get_ticks()
-    elapsed_time = current_time - start_time
-    
-    if elapsed_time > ANIMATION_DURATION:
-        pygame.time.wait(1000)
-        running = False
-    
-    time_normalized = elapsed_time / ANIMATION_DURATION
-    
-    for event in pygame.event.get():
-        if event.type == pygame.QUIT:
-            running = False
-        if event.type == pygame.KEYDOWN:
-            if event.key == pygame.K_ESCAPE:
-                running = False
-    
-    # Draw gradient background (deep purple sky)
-    for y in range(HEIGHT):
-        color_factor = y / HEIGHT
-        color = (
-            int(DEEP_PURPLE[0] + (MAGIC_PURPLE[0] - DEEP_PURPLE[0]) * color_factor * 0.3),
-            int(DEEP_PURPLE[1] + (MAGIC_PURPLE[1] - DEEP_PURPLE[1]) * color_factor * 0.3),
-            int(DEEP_PURPLE[2] + (MAGIC_PURPLE[2] - DEEP_PURPLE[2]) * color_factor * 0.3)
-        )
-        pygame.draw.line(screen, color, (0, y), (WIDTH, y))
-    
-    # Draw stars
-    for _ in range(50):
-        star_x = random.randint(0, WIDTH)
-        star_y = random.randint(0, HEIGHT // 2)
-        if random.random() > 0.5:
-            pygame.draw.circle(screen, WHITE, (star_x, star_y), 1)
-    
-    # Draw ground
-    screen.blit(ground_texture, (0, HEIGHT - 150))
-    
-    # Draw temple walls
-    screen.blit(temple_wall_left, (0, HEIGHT - 650))
-    screen.blit(temple_wall_right, (WIDTH - 200, HEIGHT - 650))
-    
-    # Draw glowing runes on walls
-    for rune in runes:
-        rune['pulse'] += 0.05
-        pulse_alpha = (math.sin(rune['pulse']) + 1) / 2
-        glow_size = int(70 + 10 * pulse_alpha)
+        # Lightning bolts from portal
+        self.lightning_bolts = []
+
+        # Floating orbs
+        self.orbs = []
+        for _ in range(8):
+            orb = {
+                'x': random.randint(100, WIDTH - 100),
+                'y': random.randint(100, 300),
+                'float_offset': random.uniform(0, math.pi * 2),
+                'float_speed': random.uniform(0.02, 0.04),
+                'size': random.randint(8, 15),
+                'color': random.choice([MAGIC_PURPLE, MAGIC_CYAN, MAGIC_PINK, GOLD])
+            }
+            orb['previous_offset'] = orb['float_offset']
+            self.orbs.append(orb)
+
+        # Torch flames
+        self.torches = [
+            {'x': 100, 'y': 150},
+            {'x': 800, 'y': 150}
+        ]
+
+        # Ground and temple walls, baked once; transparent so the stars drawn
+        # before them stay visible in between
+        self.temple = temple = layers.StaticLayer((WIDTH, HEIGHT), transparent=True)
+        temple.add('ground', lambda surface: canvas.blit(surface, texture['ground'], (0, HEIGHT - 150)),
+                   key=lambda: texture.version)
+        temple.add('temple_wall_left',
+                   lambda surface: canvas.blit(surface, texture['temple_wall_left'], (0, HEIGHT - 650)),
+                   key=lambda: texture.version)
+        temple.add('temple_wall_right',
+                   lambda surface: canvas.blit(surface, texture['temple_wall_right'], (WIDTH - 200, HEIGHT - 650)),
+                   key=lambda: texture.version)
+
+        # Timer with a magical glow
+        self.timer_glow = text.GlowText(48, MAGIC_CYAN, (100, 50, 150), range(4, 0, -1))
+
+    def update(self, elapsed_time):
+        """Advance the runes, orbiting particles, lightning, crystals and orbs by one step"""
+        for rune in self.runes:
+            rune['pulse'] += 0.05
+    
+        for particle in self.particles:
+            particle['previous_angle'] = particle['angle']
+            particle['angle'] += particle['speed']
+    
+        # Random lightning from portal
+        if self.random.random() > 0.95:
+            target_x = self.random.randint(100, WIDTH - 100)
+            target_y = self.random.randint(100, HEIGHT - 200)
+            self.lightning_bolts.append({
+                'x': target_x,
+                'y': target_y,
+                'life': 5
+            })
+    
+        for bolt in self.lightning_bolts[:]:
+            bolt['life'] -= 1
+            if bolt['life'] <= 0:
+                self.lightning_bolts.remove(bolt)
+    
+        for crystal in self.crystals:
+            crystal['glow_phase'] += 0.05
+    
+        for orb in self.orbs:
+            orb['previous_offset'] = orb['float_offset']
+            orb['float_offset'] += orb['float_speed']
+
+    def draw(self, elapsed_time, alpha):
+        """Draw the scene at ``elapsed_time``, ``alpha`` of the way through the last step"""
+        screen = self.screen
+        portal_center_x = self.portal_center_x
+        portal_center_y = self.portal_center_y
+        portal_radius = self.portal_radius
+    
+        # Draw gradient background (deep purple sky)
+        profiler.phase("sky")
+        canvas.blit(screen, gradients.vertical((WIDTH, HEIGHT), DEEP_PURPLE, MAGIC_PURPLE, 0.3), (0, 0))
+    
+        # Draw stars
+        for _ in range(quality.scale(50)):
+            star_x = random.randint(0, WIDTH)
+            star_y = random.randint(0, HEIGHT // 2)
+            if random.random() > 0.5:
+                canvas.circle(screen, WHITE, (star_x, star_y), 1)
+    
+        # Draw ground and temple walls
+        profiler.phase("temple")
+        self.temple.draw(screen)
+    
+        # Draw glowing runes on walls
+        profiler.phase("runes")
+        for rune in self.runes:
+            step = int(rune['pulse'] / (math.pi * 2) * RUNE_GLOW_STEPS + 0.5) % RUNE_GLOW_STEPS
+            glow_surf = self.rune_glows[step]
+            glow_size = canvas.unscaled(glow_surf.get_width())
         
-        # Glow effect
-        for i in range(5, 0, -1):
-            glow_surf = pygame.Surface((glow_size, glow_size))
-            glow_surf.set_colorkey((0, 0, 0))
-            glow_surf.fill((0, 0, 0))
-            glow_color = (
-                int(MAGIC_CYAN[0] * pulse_alpha * 0.3),
-                int(MAGIC_CYAN[1] * pulse_alpha * 0.3),
-                int(MAGIC_CYAN[2] * pulse_alpha * 0.3)
-            )
-            pygame.draw.circle(glow_surf, glow_color, (glow_size // 2, glow_size // 2), glow_size // 2)
-            screen.blit(glow_surf, (rune['x'] - glow_size // 2, rune['y'] - glow_size // 2))
+            # Glow effect
+            canvas.blit(screen, glow_surf, (rune['x'] - glow_size // 2, rune['y'] - glow_size // 2))
         
-        screen.blit(rune['texture'], (rune['x'] - 30, rune['y'] - 30))
-    
-    # Draw portal
-    # Portal rings
-    for ring in range(5, 0, -1):
-        ring_radius = portal_radius + ring * 10
-        ring_alpha = (math.sin(elapsed_time * 0.003 + ring) + 1) / 2
-        color = (
-            int(MAGIC_PURPLE[0] * ring_alpha),
-            int(MAGIC_PURPLE[1] * ring_alpha),
-            int(MAGIC_PURPLE[2] * ring_alpha)
-        )
-        pygame.draw.circle(screen, color, (portal_center_x, portal_center_y), 
-                         ring_radius, 3)
-    
-    # Portal center (swirling effect)
-    for i in range(20):
-        angle = (elapsed_time * 0.005 + i * (math.pi * 2 / 20)) % (math.pi * 2)
-        radius = portal_radius - i * 6
-        if radius > 0:
-            x = portal_center_x + math.cos(angle) * radius
-            y = portal_center_y + math.sin(angle) * radius
-            color_index = i / 20
+            canvas.blit(screen, rune['texture'], (rune['x'] - 30, rune['y'] - 30))
+    
+        # Draw portal
+        profiler.phase("portal")
+        # Portal rings
+        for ring in range(quality.scale(5), 0, -1):
+            ring_radius = portal_radius + ring * 10
+            ring_alpha = (math.sin(elapsed_time * 0.003 + ring) + 1) / 2
             color = (
-                int(MAGIC_PURPLE[0] * (1 - color_index) + MAGIC_CYAN[0] * color_index),
-                int(MAGIC_PURPLE[1] * (1 - color_index) + MAGIC_CYAN[1] * color_index),
-                int(MAGIC_PURPLE[2] * (1 - color_index) + MAGIC_CYAN[2] * color_index)
+                int(MAGIC_PURPLE[0] * ring_alpha),
+                int(MAGIC_PURPLE[1] * ring_alpha),
+                int(MAGIC_PURPLE[2] * ring_alpha)
             )
-            pygame.draw.circle(screen, color, (int(x), int(y)), 5)
-    
-    # Orbiting particles
-    for particle in particles:
-        particle['angle'] += particle['speed']
-        x = portal_center_x + math.cos(particle['angle']) * particle['distance']
-        y = portal_center_y + math.sin(particle['angle']) * particle['distance']
+            canvas.circle(screen, color, (portal_center_x, portal_center_y), 
+                        ring_radius, 3)
+    
+        # Portal center (swirling effect)
+        portal_stamps = []
+        for i in range(20):
+            angle = (elapsed_time * 0.005 + i * (math.pi * 2 / 20)) % (math.pi * 2)
+            radius = portal_radius - i * 6
+            if radius > 0:
+                x = portal_center_x + math.cos(angle) * radius
+                y = portal_center_y + math.sin(angle) * radius
+                color_index = i / 20
+                color = (
+                    int(MAGIC_PURPLE[0] * (1 - color_index) + MAGIC_CYAN[0] * color_index),
+                    int(MAGIC_PURPLE[1] * (1 - color_index) + MAGIC_CYAN[1] * color_index),
+                    int(MAGIC_PURPLE[2] * (1 - color_index) + MAGIC_CYAN[2] * color_index)
+                )
+                portal_stamps.append(stamps.at(stamps.circle(5, color), (int(x), int(y))))
+        screen.blits(portal_stamps, doreturn=False)
+    
+        # Orbiting particles
+        profiler.phase("particles")
+        particle_stamps = []
+        trail_length = quality.scale(5)
+        for particle in self.particles[:quality.scale(len(self.particles))]:
+            particle_angle = timing.lerp(particle['previous_angle'], particle['angle'], alpha)
+            x = portal_center_x + math.cos(particle_angle) * particle['distance']
+            y = portal_center_y + math.sin(particle_angle) * particle['distance']
         
-        # Trail effect
-        trail_length = 5
-        for t in range(trail_length):
-            trail_angle = particle['angle'] - t * 0.1
-            trail_x = portal_center_x + math.cos(trail_angle) * particle['distance']
-            trail_y = portal_center_y + math.sin(trail_angle) * particle['distance']
-            trail_alpha = 1 - (t / trail_length)
-            trail_color = tuple(int(c * trail_alpha) for c in particle['color'])
-            pygame.draw.circle(screen, trail_color, (int(trail_x), int(trail_y)), 
-                             max(1, particle['size'] - t))
+            # Trail effect
+            for t in range(trail_length):
+                trail_angle = particle_angle - t * 0.1
+                trail_x = portal_center_x + math.cos(trail_angle) * particle['distance']
+                trail_y = portal_center_y + math.sin(trail_angle) * particle['distance']
+                trail_alpha = 1 - (t / trail_length)
+                trail_stamp = stamps.circle(max(1, particle['size'] - t), particle['color'], trail_alpha)
+                particle_stamps.append(stamps.at(trail_stamp, (int(trail_x), int(trail_y))))
+        
+            particle_stamps.append(stamps.at(stamps.circle(particle['size'], particle['color']),
+                                             (int(x), int(y))))
+        screen.blits(particle_stamps, doreturn=False)
+    
+        # Draw lightning
+        profiler.phase("lightning")
+        for bolt in self.lightning_bolts:
+            bolt_alpha = bolt['life'] / 5
+            color = tuple(int(c * bolt_alpha) for c in MAGIC_CYAN)
         
-        pygame.draw.circle(screen, particle['color'], (int(x), int(y)), particle['size'])
-    
-    # Random lightning from portal
-    if random.random() > 0.95:
-        target_x = random.randint(100, WIDTH - 100)
-        target_y = random.randint(100, HEIGHT - 200)
-        lightning_bolts.append({
-            'x': target_x,
-            'y': target_y,
-            'life': 5
-        })
-    
-    # Draw lightning
-    for bolt in lightning_bolts[:]:
-        bolt['life'] -= 1
-        if bolt['life'] <= 0:
-            lightning_bolts.remove(bolt)
-        else:
-            alpha = bolt['life'] / 5
-            color = tuple(int(c * alpha) for c in MAGIC_CYAN)
-            
             # Jagged lightning line
             steps = 10
             prev_x, prev_y = portal_center_x, portal_center_y
@@ -339,84 +408,66 @@ while running:
                 t = (i + 1) / steps
                 x = portal_center_x + (bolt['x'] - portal_center_x) * t + random.randint(-10, 10)
                 y = portal_center_y + (bolt['y'] - portal_center_y) * t + random.randint(-10, 10)
-                pygame.draw.line(screen, color, (int(prev_x), int(prev_y)), (int(x), int(y)), 2)
+                canvas.line(screen, color, (int(prev_x), int(prev_y)), (int(x), int(y)), 2)
                 prev_x, prev_y = x, y
     
-    # Draw crystals
-    for crystal in crystals:
-        crystal['glow_phase'] += 0.05
-        glow = (math.sin(crystal['glow_phase']) + 1) / 2
+        # Draw crystals over their glows, which are added in one pass
+        profiler.phase("crystals")
+        crystal_glows = [(math.sin(crystal['glow_phase']) + 1) / 2 for crystal in self.crystals]
+        glows.draw(screen, [(45, CRYSTAL_BLUE, glow * 0.5, (crystal['x'] + 15, crystal['y'] + 20))
+                            for crystal, glow in zip(self.crystals, crystal_glows)])
+        for crystal, glow in zip(self.crystals, crystal_glows):
+            canvas.blit(screen, crystal['texture'], (crystal['x'], crystal['y']))
         
-        # Glow
-        for i in range(5, 0, -1):
-            glow_color = (
-                int(CRYSTAL_BLUE[0] * glow * 0.3),
-                int(CRYSTAL_BLUE[1] * glow * 0.3),
-                int(CRYSTAL_BLUE[2] * glow * 0.3)
-            )
-            pygame.draw.circle(screen, glow_color, 
-                             (crystal['x'] + 15, crystal['y'] + 20), 
-                             30 + i * 3)
+            # Light beam to portal
+            if glow > 0.7:
+                canvas.line(screen, CRYSTAL_BLUE, 
+                          (crystal['x'] + 15, crystal['y']),
+                          (portal_center_x, portal_center_y), 1)
+    
+        # Draw floating orbs over their glows
+        profiler.phase("orbs")
+        orb_centers = []
+        for orb in self.orbs:
+            float_offset = timing.lerp(orb['previous_offset'], orb['float_offset'], alpha)
+            orb_centers.append((int(orb['x']), int(orb['y'] + math.sin(float_offset) * 20)))
+        glows.draw(screen, [(orb['size'] + 16, orb['color'], 0.5, center)
+                            for orb, center in zip(self.orbs, orb_centers)])
+        for orb, center in zip(self.orbs, orb_centers):
+            canvas.circle(screen, orb['color'], center, orb['size'])
+    
+        # Draw torch flames, lit by glows added over them
+        profiler.phase("torches")
+        torch_glows = []
+        for torch in self.torches:
+            flame_height = 20 + 10 * math.sin(elapsed_time * 0.01)
+            flame_points = [
+                (torch['x'], torch['y']),
+                (torch['x'] - 10, torch['y'] + flame_height),
+                (torch['x'], torch['y'] + flame_height - 5),
+                (torch['x'] + 10, torch['y'] + flame_height)
+            ]
+            canvas.polygon(screen, ORANGE, flame_points)
+            canvas.polygon(screen, GOLD, [
+                (torch['x'], torch['y']),
+                (torch['x'] - 5, torch['y'] + flame_height // 2),
+                (torch['x'], torch['y'] + flame_height // 2 - 3),
+                (torch['x'] + 5, torch['y'] + flame_height // 2)
+            ])
         
-        screen.blit(crystal['texture'], (crystal['x'], crystal['y']))
-        
-        # Light beam to portal
-        if glow > 0.7:
-            pygame.draw.line(screen, CRYSTAL_BLUE, 
-                           (crystal['x'] + 15, crystal['y']),
-                           (portal_center_x, portal_center_y), 1)
-    
-    # Draw floating orbs
-    for orb in orbs:
-        orb['float_offset'] += orb['float_speed']
-        float_y = orb['y'] + math.sin(orb['float_offset']) * 20
-        
-        # Glow
-        for i in range(3, 0, -1):
-            glow_color = tuple(int(c * 0.3) for c in orb['color'])
-            pygame.draw.circle(screen, glow_color, 
-                             (int(orb['x']), int(float_y)), 
-                             orb['size'] + i * 4)
-        
-        pygame.draw.circle(screen, orb['color'], 
-                         (int(orb['x']), int(float_y)), orb['size'])
-    
-    # Draw torch flames
-    for torch in torches:
-        flame_height = 20 + 10 * math.sin(elapsed_time * 0.01)
-        flame_points = [
-            (torch['x'], torch['y']),
-            (torch['x'] - 10, torch['y'] + flame_height),
-            (torch['x'], torch['y'] + flame_height - 5),
-            (torch['x'] + 10, torch['y'] + flame_height)
-        ]
-        pygame.draw.polygon(screen, ORANGE, flame_points)
-        pygame.draw.polygon(screen, GOLD, [
-            (torch['x'], torch['y']),
-            (torch['x'] - 5, torch['y'] + flame_height // 2),
-            (torch['x'], torch['y'] + flame_height // 2 - 3),
-            (torch['x'] + 5, torch['y'] + flame_height // 2)
-        ])
-        
-        # Glow
-        pygame.draw.circle(screen, (255, 100, 0), (torch['x'], torch['y'] + 10), 25)
-    
-    # Draw timer with magical glow
-    font = pygame.font.Font(None, 48)
-    time_left = (ANIMATION_DURATION - elapsed_time) / 1000
-    
-    # Glow effect
-    for offset in range(4, 0, -1):
-        glow_color = (100, 50, 150)
-        timer_text = font.render(f"{time_left:.1f}s", True, glow_color)
-        screen.blit(timer_text, (WIDTH // 2 - 50 + offset, 20))
-        screen.blit(timer_text, (WIDTH // 2 - 50 - offset, 20))
-    
-    timer_text = font.render(f"{time_left:.1f}s", True, MAGIC_CYAN)
-    screen.blit(timer_text, (WIDTH // 2 - 50, 20))
-    
-    pygame.display.flip()
-    clock.tick(FPS)
+            # Glow, flickering with the flame
+            torch_glows.append((36, (255, 100, 0), 0.5 + (flame_height - 20) / 50, (torch['x'], torch['y'] + 10)))
+        glows.draw(screen, torch_glows)
+    
+        # Draw timer with magical glow
+        profiler.phase("text")
+        time_left = (ANIMATION_DURATION - elapsed_time) / 1000
+        self.timer_glow.draw(screen, f"{time_left:.1f}s", (WIDTH // 2 - 50, 20))
+
+
+def main():
+    scenes.run(sys.modules[__name__])
+
 
-pygame.quit()
-sys.exit()
\ No newline at end of file
+if __name__ == "__main__":
+    main()
\ No newline at end of file
@@ -0,0 +1,65 @@
+"""Fill the on-disk texture cache for the scenes ahead of time.
+
+Run this at deploy time so the scenes load every texture from the cache
+instead of generating it on first launch:
+
+    python bake.py [--force] [--prune] [scene ...]
+"""
+import argparse
+import glob
+import os
+import time
+
+import pygame
+
+import scenes
+import textures
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("scenes", nargs="*", default=scenes.NAMES)
+    parser.add_argument("--force", action="store_true",
+                        help="regenerate textures that are already cached")
+    parser.add_argument("--prune", action="store_true",
+                        help="delete cache entries no baked scene uses any more")
+    parser.add_argument("--workers", type=int, default=textures.WORKERS,
+                        help="worker processes to generate textures in (default: %(default)s)")
+    args = parser.parse_args()
+
+    if not textures.CACHE_DIR:
+        parser.error("the texture cache is turned off (ANIM_TEXTURE_CACHE is empty)")
+
+    # Some generators render text, which needs the font module
+    pygame.font.init()
+
+    wanted = set()
+    for name in args.scenes:
+        start = time.perf_counter()
+        todo = []
+        cached = 0
+        for job in textures.jobs(scenes.load(name).TEXTURES):
+            if job.path is None:
+                continue
+            wanted.add(os.path.abspath(job.path))
+            if not args.force and textures.load_cached(job.path) is not None:
+                cached += 1
+            else:
+                todo.append(job)
+        for job, raw in zip(todo, textures.render(todo, args.workers)):
+            textures.save_cached(job.path, raw)
+        elapsed = (time.perf_counter() - start) * 1000
+        print(f"{name:<12} {len(todo):>3} baked {cached:>3} cached {elapsed:>9.1f} ms")
+
+    if args.prune:
+        pattern = os.path.join(textures.CACHE_DIR, "*" + textures.CACHE_SUFFIX)
+        stale = [path for path in glob.glob(pattern) if os.path.abspath(path) not in wanted]
+        for path in stale:
+            os.remove(path)
+        print(f"pruned {len(stale)} stale entries from {textures.CACHE_DIR}")
+
+    pygame.quit()
+
+
+if __name__ == "__main__":
+    main()
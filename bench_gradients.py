@@ -0,0 +1,87 @@
+"""Per-frame cost of the scene backgrounds: per-row lines vs cached gradients.
+
+For every gradient background the scenes draw, times the old loop of one
+``pygame.draw.line`` per row against a blit of the cached Surface from
+``gradients.vertical`` (or a single fill for the Rockets sky, which is one
+colour per frame), and checks that both paint the same pixels.
+
+    python bench_gradients.py [--frames N]
+"""
+import argparse
+import os
+import time
+
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+
+import pygame
+
+import gradients
+
+SKY_BLUE = (135, 206, 235)
+SPACE_BLACK = (5, 5, 15)
+
+# scene, size, top, bottom, strength
+CASES = [
+    ("Animations", (800, 600), (10, 50, 100), (30, 100, 150), 1.0),
+    ("Temple", (900, 700), (20, 0, 40), (138, 43, 226), 0.3),
+    ("Aesthetic", (200, 200), (189, 224, 254), (162, 155, 254), 1.0),
+]
+
+
+def lines(screen, size, top, bottom, strength):
+    width, height = size
+    for y in range(height):
+        color_factor = y / height
+        color = tuple(int(t + (b - t) * color_factor * strength) for t, b in zip(top, bottom))
+        pygame.draw.line(screen, color, (0, y), (width, y))
+
+
+def sky_lines(screen, transition):
+    width, height = screen.get_size()
+    for y in range(height):
+        sky_color = tuple(int(s * (1 - transition) + b * transition)
+                          for s, b in zip(SKY_BLUE, SPACE_BLACK))
+        pygame.draw.line(screen, sky_color, (0, y), (width, y))
+
+
+def sky_fill(screen, transition):
+    screen.fill(tuple(int(s * (1 - transition) + b * transition)
+                      for s, b in zip(SKY_BLUE, SPACE_BLACK)))
+
+
+def per_frame(draw, frames):
+    start = time.perf_counter()
+    for frame in range(frames):
+        draw(frame)
+    return (time.perf_counter() - start) / frames * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--frames", type=int, default=300)
+    args = parser.parse_args()
+
+    pygame.init()
+    screen = pygame.display.set_mode((900, 700))
+
+    print(f"{'background':<12} {'lines ms':>9} {'cached ms':>10} {'saved ms':>9} {'same':>5}")
+    for name, size, top, bottom, strength in CASES:
+        old = per_frame(lambda _: lines(screen, size, top, bottom, strength), args.frames)
+        expected = pygame.image.tobytes(screen, "RGB")
+        new = per_frame(lambda _: screen.blit(gradients.vertical(size, top, bottom, strength),
+                                              (0, 0)), args.frames)
+        same = pygame.image.tobytes(screen, "RGB") == expected
+        print(f"{name:<12} {old:>9.3f} {new:>10.3f} {old - new:>9.3f} {str(same):>5}")
+
+    # The Rockets sky changes colour every frame but is flat within a frame
+    old = per_frame(lambda frame: sky_lines(screen, frame / args.frames), args.frames)
+    expected = pygame.image.tobytes(screen, "RGB")
+    new = per_frame(lambda frame: sky_fill(screen, frame / args.frames), args.frames)
+    same = pygame.image.tobytes(screen, "RGB") == expected
+    print(f"{'Rockets':<12} {old:>9.3f} {new:>10.3f} {old - new:>9.3f} {str(same):>5}")
+
+    pygame.quit()
+
+
+if __name__ == "__main__":
+    main()
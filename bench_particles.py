@@ -0,0 +1,145 @@
+"""Frame time against particle count: list of dicts vs the NumPy engine.
+
+Runs the Rockets exhaust flames at increasing emission rates, once with the
+original list of dicts (updated field by field, dead particles removed with
+``list.remove``) and once with ``particles.Particles``, and reports the
+average time per frame spent updating the particles and updating plus
+drawing them.
+
+    python bench_particles.py [--frames N] [counts ...]
+"""
+import argparse
+import os
+import random
+import time
+
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+
+import pygame
+
+import particles
+
+FIRE_ORANGE = (255, 140, 0)
+FIRE_YELLOW = (255, 215, 0)
+FIRE_RED = (255, 69, 0)
+FLAME_COLORS = [FIRE_ORANGE, FIRE_YELLOW, FIRE_RED]
+
+# Flames live 20 to 40 frames, so about 30 frames' worth are alive at once
+AVERAGE_LIFE = 30
+
+
+class DictFlames:
+    """The flames as Rockets.py used to keep them"""
+
+    def __init__(self):
+        self.flames = []
+
+    def __len__(self):
+        return len(self.flames)
+
+    def emit(self, x, y, velocity_x, velocity_y, size, life, color=0):
+        self.flames.append({
+            'x': x,
+            'y': y,
+            'velocity_y': velocity_y,
+            'velocity_x': velocity_x,
+            'size': size,
+            'life': life,
+            'color_type': ['orange', 'yellow', 'red'][color]
+        })
+
+    def update_and_draw(self, surface):
+        for flame in self.flames[:]:
+            flame['y'] += flame['velocity_y']
+            flame['x'] += flame['velocity_x']
+            flame['life'] -= 1
+
+            if flame['life'] <= 0:
+                self.flames.remove(flame)
+            elif surface is not None:
+                alpha = flame['life'] / 40
+                if flame['color_type'] == 'orange':
+                    color = tuple(int(FIRE_ORANGE[i] * alpha) for i in range(3))
+                elif flame['color_type'] == 'yellow':
+                    color = tuple(int(FIRE_YELLOW[i] * alpha) for i in range(3))
+                else:
+                    color = tuple(int(FIRE_RED[i] * alpha) for i in range(3))
+
+                pygame.draw.circle(surface, color,
+                                 (int(flame['x']), int(flame['y'])), int(flame['size']))
+
+
+class EngineFlames:
+    """The flames on a ``particles.Particles`` system"""
+
+    def __init__(self, capacity):
+        self.flames = particles.Particles(capacity, FLAME_COLORS, 40)
+
+    def __len__(self):
+        return len(self.flames)
+
+    def emit(self, **particle):
+        self.flames.emit(**particle)
+
+    def update_and_draw(self, surface):
+        self.flames.update()
+        if surface is not None:
+            self.flames.draw(surface)
+
+
+def emit(flames, rate):
+    for _ in range(rate):
+        flames.emit(x=450 + random.randint(-15, 15),
+                    y=200,
+                    velocity_y=random.uniform(2, 5),
+                    velocity_x=random.uniform(-2, 2),
+                    size=random.randint(8, 20),
+                    life=random.randint(20, 40),
+                    color=random.randrange(len(FLAME_COLORS)))
+
+
+def per_frame(make, rate, frames, surface):
+    """Average ms per frame once the particle count has settled"""
+    random.seed(0)
+    flames = make()
+    for _ in range(40):
+        emit(flames, rate)
+        flames.update_and_draw(None)
+    start = time.perf_counter()
+    for _ in range(frames):
+        emit(flames, rate)
+        flames.update_and_draw(surface)
+    return (time.perf_counter() - start) / frames * 1000, len(flames)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("counts", nargs="*", type=int,
+                        default=[240, 500, 1000, 2000, 4000, 8000],
+                        help="particles alive at once (Rockets keeps about 240)")
+    parser.add_argument("--frames", type=int, default=100)
+    args = parser.parse_args()
+
+    if particles.np is None:
+        parser.error("NumPy is required for the particle engine")
+
+    pygame.init()
+    surface = pygame.Surface((900, 700))
+
+    print(f"{'particles':>9} | {'update ms':^20} | {'update + draw ms':^20}")
+    print(f"{'':>9} | {'dicts':>6} {'numpy':>6} {'ratio':>6} | {'dicts':>6} {'numpy':>6} {'ratio':>6}")
+    for count in args.counts:
+        rate = max(1, count // AVERAGE_LIFE)
+        make_engine = lambda: EngineFlames(rate * 40)
+        old_update, alive = per_frame(DictFlames, rate, args.frames, None)
+        new_update, _ = per_frame(make_engine, rate, args.frames, None)
+        old_frame, _ = per_frame(DictFlames, rate, args.frames, surface)
+        new_frame, _ = per_frame(make_engine, rate, args.frames, surface)
+        print(f"{alive:>9} | {old_update:>6.2f} {new_update:>6.2f} {old_update / new_update:>5.1f}x"
+              f" | {old_frame:>6.2f} {new_frame:>6.2f} {old_frame / new_frame:>5.1f}x")
+
+    pygame.quit()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,243 @@
+"""Benchmark every scene: startup, steady-state frame rate and tail latency.
+
+Runs each scene headless in a fresh process with a fixed seed and no frame
+cap, and reports:
+
+* startup, split into pygame init, texture generation (the texture cache
+  is off unless ``--cache`` is given) and the first frame, which includes
+  setting the scene up;
+* mean FPS and the p50, p95 and p99 frame times;
+* the peak RSS of the scene's process, and of the largest of the texture
+  worker processes it started.
+
+Textures are generated the way the scenes generate them, by
+``textures.WORKERS`` worker processes (one per core unless
+ANIM_TEXTURE_WORKERS is set), so startup times cover the real path.  The
+clock is virtual and advances 1/60 s per frame, so every run simulates and
+draws the same frames however fast the machine is.  Each scene is run
+``--repeat`` times and every figure is the median of the runs, which keeps
+the tail latencies from swinging with one noisy run.  With
+ANIM_RENDER_SCALE set the scenes draw at that scale, and every frame is
+scaled to the scene's own size as the playlist does.
+
+    python bench_scenes.py [--frames N] [--repeat 3] [--out results.json] [scene ...]
+    python bench_scenes.py --compare baseline.json [--threshold 10] [--p99-threshold 25]
+
+With ``--compare`` the run fails when a scene's mean frame time or its
+startup time is more than ``--threshold`` percent worse than in the
+baseline file written by an earlier ``--out``, or its p99 frame time more
+than ``--p99-threshold`` percent worse.
+"""
+import argparse
+import json
+import math
+import os
+import platform
+import random
+import statistics
+import subprocess
+import sys
+import time
+
+try:
+    import resource
+except ImportError:
+    resource = None
+
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+os.environ.setdefault("PYGAME_HIDE_SUPPORT_PROMPT", "1")
+
+import pygame
+
+import canvas
+import scenes
+import textures
+import viewport
+
+# Frames per second of the virtual clock
+BENCH_FPS = 60
+
+# Metrics checked by --compare, and the option holding each one's
+# threshold; larger is worse for all of them
+COMPARED = {"startup_ms": "threshold", "mean_ms": "threshold", "p99_ms": "p99_threshold"}
+
+
+def percentile(ordered, p):
+    """The ``p``-th percentile of an ascending list, by nearest rank"""
+    return ordered[max(0, math.ceil(p / 100 * len(ordered)) - 1)]
+
+
+def rss_mb(maxrss):
+    """A ``ru_maxrss`` figure in megabytes: kilobytes on Linux, bytes on macOS"""
+    return maxrss / 1024 if sys.platform != "darwin" else maxrss / 1024 / 1024
+
+
+def measure(name, frames, seed):
+    """Benchmark one scene in this process; returns its results"""
+    module = scenes.load(name)
+    start = time.perf_counter()
+    pygame.init()
+    size = (module.WIDTH, module.HEIGHT)
+    window = screen = pygame.display.set_mode(size)
+    scaler = None
+    if canvas.size(size) != size:
+        screen = canvas.surface(size).convert()
+        scaler = viewport.Scaler(screen, window)
+    init_done = time.perf_counter()
+
+    texture = textures.load(module.TEXTURES, progressive=False)
+    textures_done = time.perf_counter()
+
+    random.seed(seed)
+    scene = module.Scene(screen, texture)
+    present = getattr(scene, 'present', pygame.display.flip)
+    if scaler is not None:
+        present = pygame.display.flip
+        if hasattr(scene, 'frame'):
+            scene.frame.enabled = False
+    step = scenes.fixed_step(module, max_steps=None)
+    if frames is None:
+        frames = int(module.ANIMATION_DURATION * BENCH_FPS / 1000)
+
+    times = []
+    for index in range(frames + 1):
+        frame_start = time.perf_counter()
+        for _ in range(step.advance(index * 1000 / BENCH_FPS)):
+            scene.update(step.step())
+        scene.draw(step.render_time, step.alpha)
+        if scaler is not None:
+            scaler.scale()
+        present()
+        frame_end = time.perf_counter()
+        if index == 0:
+            first_frame_done = frame_end
+        else:
+            times.append((frame_end - frame_start) * 1000)
+    texture.close()
+    pygame.quit()
+
+    ordered = sorted(times)
+    mean = sum(times) / len(times)
+    peak_rss = worker_rss = None
+    if resource is not None:
+        # The texture workers have all exited by now, so the children's
+        # figure is the largest of them
+        peak_rss = rss_mb(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss)
+        worker_rss = rss_mb(resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss) or None
+    return {
+        "init_ms": (init_done - start) * 1000,
+        "textures_ms": (textures_done - init_done) * 1000,
+        "first_frame_ms": (first_frame_done - textures_done) * 1000,
+        "startup_ms": (first_frame_done - start) * 1000,
+        "frames": len(times),
+        "mean_fps": 1000 / mean,
+        "mean_ms": mean,
+        "p50_ms": percentile(ordered, 50),
+        "p95_ms": percentile(ordered, 95),
+        "p99_ms": percentile(ordered, 99),
+        "peak_rss_mb": peak_rss,
+        "worker_rss_mb": worker_rss,
+        "texture_workers": textures.WORKERS,
+    }
+
+
+def run(name, args):
+    """Benchmark one scene ``args.repeat`` times, each in a child process so
+    it starts cold; returns the median of each figure"""
+    env = dict(os.environ)
+    if not args.cache:
+        env["ANIM_TEXTURE_CACHE"] = ""
+    command = [sys.executable, os.path.abspath(__file__), "--child", name,
+               "--seed", str(args.seed)]
+    if args.frames is not None:
+        command += ["--frames", str(args.frames)]
+    runs = []
+    for _ in range(args.repeat):
+        child = subprocess.run(command, env=env, stdout=subprocess.PIPE, check=True)
+        runs.append(json.loads(child.stdout.decode().splitlines()[-1]))
+    return {key: statistics.median(run[key] for run in runs)
+            if all(run[key] is not None for run in runs) else None
+            for key in runs[0]}
+
+
+def compare(results, baseline, thresholds):
+    """Lines describing each regression beyond its threshold, in percent,
+    given as ``{metric: threshold}``"""
+    regressions = []
+    for name, result in results.items():
+        before = baseline.get("scenes", {}).get(name)
+        if before is None:
+            continue
+        for metric, threshold in thresholds.items():
+            if before.get(metric) and result[metric] > before[metric] * (1 + threshold / 100):
+                change = (result[metric] / before[metric] - 1) * 100
+                regressions.append(f"{name} {metric}: {before[metric]:.2f} -> "
+                                   f"{result[metric]:.2f} (+{change:.1f}%)")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("scenes", nargs="*", default=scenes.NAMES)
+    parser.add_argument("--frames", type=int,
+                        help="frames to time after the first (default: the whole animation)")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--repeat", type=int, default=3,
+                        help="runs per scene, reporting the median (default: %(default)s)")
+    parser.add_argument("--cache", action="store_true",
+                        help="load textures from the cache instead of generating them")
+    parser.add_argument("--out", help="write the results to this JSON file")
+    parser.add_argument("--compare", metavar="BASELINE",
+                        help="fail if a scene regressed against this results file")
+    parser.add_argument("--threshold", type=float, default=10,
+                        help="startup and mean frame time regression allowed by --compare, "
+                             "in percent (default: %(default)s)")
+    parser.add_argument("--p99-threshold", type=float, default=25,
+                        help="p99 frame time regression allowed by --compare, "
+                             "in percent (default: %(default)s)")
+    parser.add_argument("--child", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        print(json.dumps(measure(args.child, args.frames, args.seed)))
+        return
+
+    print(f"{'scene':<12} {'init':>6} {'tex':>7} {'first':>6} {'fps':>7} "
+          f"{'p50':>6} {'p95':>6} {'p99':>6} {'rss MB':>7} {'worker':>7}")
+    results = {}
+    for name in args.scenes:
+        result = results[name] = run(name, args)
+        rss, worker = (f"{result[key]:.0f}" if result[key] is not None else "-"
+                       for key in ("peak_rss_mb", "worker_rss_mb"))
+        print(f"{name:<12} {result['init_ms']:>6.0f} {result['textures_ms']:>7.0f} "
+              f"{result['first_frame_ms']:>6.0f} {result['mean_fps']:>7.1f} "
+              f"{result['p50_ms']:>6.2f} {result['p95_ms']:>6.2f} {result['p99_ms']:>6.2f} {rss:>7} {worker:>7}")
+    print("(startup columns in ms, frame times in ms)")
+
+    if args.out:
+        with open(args.out, "w") as f:
+            json.dump({
+                "python": platform.python_version(),
+                "platform": platform.platform(),
+                "seed": args.seed,
+                "repeat": args.repeat,
+                "cache": args.cache,
+                "render_scale": canvas.SCALE,
+                "scenes": results,
+            }, f, indent=2)
+
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)
+        regressions = compare(results, baseline,
+                              {metric: getattr(args, option) for metric, option in COMPARED.items()})
+        for line in regressions:
+            print("REGRESSION", line)
+        if regressions:
+            sys.exit(1)
+        print(f"no regressions beyond {args.threshold:g}% ({args.p99_threshold:g}% for p99) "
+              f"against {args.compare}")
+
+
+if __name__ == "__main__":
+    main()
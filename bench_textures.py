@@ -0,0 +1,71 @@
+"""Startup benchmark: per-pixel vs vectorized texture generation.
+
+Builds every scene's ``TEXTURES`` table once with the original pure-Python
+fills and once with the NumPy fills, and reports the time taken by each
+along with the largest difference in mean colour between the two, as a
+quick check that the outputs still look the same.
+
+    python bench_textures.py [--repeat N] [--workers N] [scene ...]
+"""
+import argparse
+import time
+
+import pygame
+
+import scenes
+import textures
+
+
+def mean_color(surface):
+    pixels = pygame.surfarray.array3d(surface).reshape(-1, 3)
+    return pixels.mean(axis=0)
+
+
+def time_build(specs, vectorized, repeat, workers):
+    textures.VECTORIZED = vectorized
+    best = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        built = textures.build(specs, workers=workers)
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best, built
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("scenes", nargs="*", default=scenes.NAMES)
+    parser.add_argument("--repeat", type=int, default=3,
+                        help="runs per backend; the fastest one is reported")
+    parser.add_argument("--workers", type=int, default=1,
+                        help="worker processes to generate textures in (default: %(default)s)")
+    args = parser.parse_args()
+
+    if textures.np is None:
+        parser.error("NumPy is required to compare the two backends")
+
+    # Time the generators themselves, not the texture cache
+    textures.CACHE_DIR = None
+
+    pygame.init()
+    print(f"{'scene':<12} {'python ms':>10} {'numpy ms':>10} {'speedup':>8} {'max dmean':>10}")
+    total_python = total_numpy = 0.0
+    for name in args.scenes:
+        specs = scenes.load(name).TEXTURES
+        python_time, python_built = time_build(specs, False, args.repeat, args.workers)
+        numpy_time, numpy_built = time_build(specs, True, args.repeat, args.workers)
+        drift = max(
+            float(abs(mean_color(python_built[key]) - mean_color(numpy_built[key])).max())
+            for key in specs
+        )
+        total_python += python_time
+        total_numpy += numpy_time
+        print(f"{name:<12} {python_time * 1000:>10.1f} {numpy_time * 1000:>10.1f} "
+              f"{python_time / numpy_time:>7.1f}x {drift:>10.2f}")
+    print(f"{'total':<12} {total_python * 1000:>10.1f} {total_numpy * 1000:>10.1f} "
+          f"{total_python / total_numpy:>7.1f}x")
+    pygame.quit()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,132 @@
+"""Draw the scenes at a fraction of their resolution.
+
+The scenes are laid out in scene units, the pixels of their own resolution
+(800x600 or 900x700).  Set ANIM_RENDER_SCALE=0.5 (or 0.75, or 2 for extra
+detail at 4K) to have them draw on a canvas that many times the size
+instead: every position, length and texture is scaled as it is drawn, and
+the runner scales the finished frame to the window once per frame with a
+``viewport.Scaler``.  At 0.5 a frame has a quarter of the pixels to fill,
+and the textures are generated at that size too, so their generation cost
+falls with the square of the scale as well.
+
+The scenes draw through this module rather than ``pygame.draw`` and
+``Surface.blit``: the functions here take scene units and draw in pixels.
+Rects they return are in pixels, like the Surfaces they draw on.  At a
+scale of 1 every function passes its arguments through unchanged.
+"""
+import os
+
+import pygame
+
+# Pixels per scene unit; render.py sets it from --scale
+SCALE = float(os.environ.get("ANIM_RENDER_SCALE", "") or 1)
+
+
+def length(value):
+    """A length in scene units, in pixels; a float unless the scale is 1"""
+    if SCALE == 1:
+        return value
+    return value * SCALE
+
+
+def pixels(value):
+    """A length in scene units as a whole number of pixels, at least 1 for a
+    positive length (a radius, a line width or a font size)"""
+    if SCALE == 1:
+        return value
+    scaled = round(value * SCALE)
+    return max(1, scaled) if value > 0 else scaled
+
+
+def unscaled(value):
+    """A length in pixels, in scene units"""
+    if SCALE == 1:
+        return value
+    return value / SCALE
+
+
+def point(position):
+    """A position in scene units, in pixels"""
+    if SCALE == 1:
+        return position
+    x, y = position
+    return x * SCALE, y * SCALE
+
+
+def size(dimensions):
+    """A width and height in scene units, in whole pixels"""
+    if SCALE == 1:
+        return dimensions
+    width, height = dimensions
+    return pixels(width), pixels(height)
+
+
+def area(rect):
+    """A rect in scene units, in pixels; its edges are rounded separately, so
+    rects that meet in scene units still meet in pixels"""
+    if SCALE == 1:
+        return rect
+    x, y, width, height = pygame.Rect(rect)
+    left, top = round(x * SCALE), round(y * SCALE)
+    return pygame.Rect(left, top, round((x + width) * SCALE) - left,
+                       round((y + height) * SCALE) - top)
+
+
+def surface(dimensions, flags=0):
+    """A new Surface of ``dimensions`` in scene units"""
+    return pygame.Surface(size(dimensions), flags)
+
+
+def points(positions):
+    """A list of positions in scene units, in pixels"""
+    if SCALE == 1:
+        return positions
+    return [(x * SCALE, y * SCALE) for x, y in positions]
+
+
+def blit(target, source, dest, area=None, special_flags=0):
+    """``target.blit`` with ``dest`` in scene units; ``area`` is a rect of
+    the (pixel) ``source``"""
+    if SCALE != 1:
+        dest = (round(dest[0] * SCALE), round(dest[1] * SCALE))
+    return target.blit(source, dest, area, special_flags)
+
+
+def fill(target, color, rect=None, special_flags=0):
+    """``target.fill``, with ``rect`` in scene units"""
+    return target.fill(color, rect if rect is None else area(rect), special_flags)
+
+
+def circle(surface, color, center, radius, width=0):
+    """``pygame.draw.circle`` in scene units"""
+    return pygame.draw.circle(surface, color, point(center), pixels(radius), pixels(width))
+
+
+def ellipse(surface, color, rect, width=0):
+    """``pygame.draw.ellipse`` in scene units"""
+    return pygame.draw.ellipse(surface, color, area(rect), pixels(width))
+
+
+def rect(surface, color, rect, width=0):
+    """``pygame.draw.rect`` in scene units"""
+    return pygame.draw.rect(surface, color, area(rect), pixels(width))
+
+
+def arc(surface, color, rect, start_angle, stop_angle, width=1):
+    """``pygame.draw.arc`` in scene units"""
+    return pygame.draw.arc(surface, color, area(rect), start_angle, stop_angle, pixels(width))
+
+
+def line(surface, color, start_pos, end_pos, width=1):
+    """``pygame.draw.line`` in scene units"""
+    return pygame.draw.line(surface, color, point(start_pos), point(end_pos), pixels(width))
+
+
+def lines(surface, color, closed, positions, width=1):
+    """``pygame.draw.lines`` in scene units"""
+    return pygame.draw.lines(surface, color, closed, points(positions), pixels(width))
+
+
+def polygon(surface, color, positions, width=0):
+    """``pygame.draw.polygon`` in scene units"""
+    return pygame.draw.polygon(surface, color, points(positions), pixels(width))
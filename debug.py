@@ -0,0 +1,62 @@
+"""Debug-mode checks for the scenes' main loops.
+
+Set ANIM_DEBUG=1 to count the Surfaces a scene creates with
+``pygame.Surface(...)`` on each frame, and print a summary when the scene
+ends.  A loop that only blits cached sprites should report none.  Surfaces
+made by pygame itself (``Font.render``, ``convert``, ``copy``) are not
+counted.
+"""
+import os
+
+import pygame
+
+ENABLED = os.environ.get("ANIM_DEBUG", "") == "1"
+
+# Surfaces created through pygame.Surface since install()
+created = 0
+
+_Surface = pygame.Surface
+
+
+class _CountingSurface(_Surface):
+    def __init__(self, *args, **kwargs):
+        global created
+        super().__init__(*args, **kwargs)
+        created += 1
+
+
+def install():
+    """Start counting Surface allocations"""
+    pygame.Surface = _CountingSurface
+
+
+class AllocationCounter:
+    """Surface allocations per frame of a main loop; does nothing unless enabled"""
+
+    def __init__(self, name, enabled=None):
+        self.name = name
+        self.enabled = ENABLED if enabled is None else enabled
+        self.frames = 0
+        self.total = 0
+        self.worst = 0
+        self._mark = None
+        if self.enabled:
+            install()
+
+    def frame(self):
+        """Call once at the start of every frame"""
+        if not self.enabled:
+            return
+        if self._mark is not None:
+            allocated = created - self._mark
+            self.frames += 1
+            self.total += allocated
+            self.worst = max(self.worst, allocated)
+        self._mark = created
+
+    def report(self):
+        """Print the per-frame allocation counts"""
+        if not self.enabled or not self.frames:
+            return
+        print(f"{self.name}: {self.total} Surface allocations in {self.frames} frames "
+              f"({self.total / self.frames:.1f} per frame, at most {self.worst})")
@@ -0,0 +1,81 @@
+"""Soft glows: radial-falloff sprites drawn with additive blending.
+
+A glow sprite is a colour at full strength in the middle fading smoothly to
+black at its radius.  Drawn with ``BLEND_ADD`` it brightens whatever is
+underneath, which looks like light instead of a flat disc, and glows that
+overlap simply add up, so a scene can draw all of its glows in one
+``Surface.blits`` call.  Sprites are rendered with NumPy once per colour,
+radius bucket and intensity level and cached.
+"""
+import pygame
+
+import canvas
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+# Radii are rounded to a multiple of this, so similar glows share a sprite
+RADIUS_STEP = 4
+
+# Intensity steps between no glow and full colour
+LEVELS = 32
+
+_cache = {}
+
+
+def render(radius, color, intensity=1.0):
+    """A new glow sprite, ``2 * radius`` pixels across"""
+    size = 2 * radius
+    surface = pygame.Surface((size, size))
+    if np is None:
+        # Approximate the falloff with a circle per pixel of radius
+        for r in range(radius, 0, -1):
+            falloff = (1 - (r / radius) ** 2) ** 2
+            pygame.draw.circle(surface, tuple(int(c * intensity * falloff) for c in color[:3]),
+                               (radius, radius), r)
+        return surface
+
+    offsets = (np.arange(size) - radius + 0.5) / radius
+    distance = offsets[:, None] ** 2 + offsets[None, :] ** 2
+    falloff = np.clip(1 - distance, 0, 1) ** 2
+    pixels = falloff[..., None] * (np.array(color[:3], dtype=float) * intensity)
+    pygame.surfarray.blit_array(surface, pixels.astype(np.uint8))
+    return surface
+
+
+def sprite(radius, color, intensity=1.0):
+    """The cached glow sprite closest to ``radius`` (in scene units) and ``intensity``
+
+    ``color`` must be hashable, such as a tuple.
+    """
+    radius = max(RADIUS_STEP, int(canvas.length(radius) / RADIUS_STEP + 0.5) * RADIUS_STEP)
+    level = min(max(int(intensity * LEVELS + 0.5), 0), LEVELS)
+    key = (radius, color, level)
+    glow = _cache.get(key)
+    if glow is None:
+        glow = render(radius, color, level / LEVELS)
+        if pygame.display.get_surface() is not None:
+            glow = glow.convert()
+        _cache[key] = glow
+    return glow
+
+
+def draw(target, glows):
+    """Add every ``(radius, color, intensity, center)`` glow to ``target`` in one pass
+
+    Returns the rects drawn to.
+    """
+    blits = []
+    for radius, color, intensity, center in glows:
+        glow = sprite(radius, color, intensity)
+        x, y = canvas.point(center)
+        half = glow.get_width() // 2
+        blits.append((glow, (x - half, y - half), None, pygame.BLEND_ADD))
+    return target.blits(blits)
+
+
+def clear():
+    """Drop every cached sprite"""
+    _cache.clear()
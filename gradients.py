@@ -0,0 +1,46 @@
+"""Pre-rendered gradient backgrounds.
+
+The scenes used to repaint their backgrounds every frame with one
+``pygame.draw.line`` per row.  :func:`vertical` renders each distinct
+gradient once, on first use, and hands back the same Surface afterwards, so
+a background costs a single blit per frame.
+"""
+import pygame
+
+import canvas
+
+_cache = {}
+
+
+def vertical(size, top, bottom, strength=1.0):
+    """Return a cached top-to-bottom gradient Surface.
+
+    Row ``y`` is ``int(top + (bottom - top) * y / height * strength)`` per
+    channel, matching the per-row loops it replaces.  ``size`` is in scene
+    units, and the gradient is rendered at the size of the :mod:`canvas`.
+    """
+    size = canvas.size(size)
+    key = (tuple(size), tuple(top), tuple(bottom), strength)
+    surface = _cache.get(key)
+    if surface is None:
+        surface = render_vertical(size, top, bottom, strength)
+        if pygame.display.get_surface() is not None:
+            surface = surface.convert()
+        _cache[key] = surface
+    return surface
+
+
+def render_vertical(size, top, bottom, strength=1.0):
+    """Draw a gradient row by row, uncached"""
+    width, height = size
+    surface = pygame.Surface(size)
+    for y in range(height):
+        color_factor = y / height
+        color = tuple(int(t + (b - t) * color_factor * strength) for t, b in zip(top, bottom))
+        pygame.draw.line(surface, color, (0, y), (width, y))
+    return surface
+
+
+def clear():
+    """Forget every cached gradient, e.g. after the display mode changes"""
+    _cache.clear()
@@ -0,0 +1,182 @@
+"""Static layers: parts of a scene that are drawn once and then blitted.
+
+Most of what a scene draws every frame never changes: textures blitted at
+fixed positions, outlines, fixed glows.  A :class:`StaticLayer` collects
+such elements, paints them into one cached Surface and blits that instead,
+so a run of static draw calls costs a single blit per frame.  A scene keeps
+one layer per run of consecutive static elements, which keeps the original
+drawing order between static and animated elements intact.
+
+:class:`DirtyRects` goes one step further for scenes where only small
+regions move: it restores just the regions animated elements covered last
+frame and pushes only the changed rects to the display.
+"""
+import os
+
+import pygame
+
+import canvas
+
+# Fills the empty parts of transparent layers; nothing the scenes draw uses it
+TRANSPARENT_KEY = (255, 0, 255)
+
+# Set ANIM_DIRTY_RECTS=1 to update only the changed parts of the display in
+# scenes that support it (see DirtyRects)
+DIRTY_RECTS = os.environ.get("ANIM_DIRTY_RECTS", "") == "1"
+
+
+class StaticLayer:
+    """A cached Surface built from static drawing steps.
+
+    Elements are callables taking the Surface to draw on, painted in the
+    order they were added.  The layer is rebaked only when an element is
+    added or removed, :meth:`invalidate` is called, or an element's ``key``
+    callable returns a different value than at the last bake (for example
+    ``Loader.version``, which changes when a texture finishes loading).
+
+    A ``transparent`` layer keeps whatever is underneath visible where its
+    elements do not draw, and is cropped to the area they cover, so it can
+    sit on top of animated elements.
+
+    ``size`` is in scene units; the layer is baked at the size of the
+    :mod:`canvas`, and ``area`` rects are in its pixels.
+    """
+
+    def __init__(self, size, transparent=False):
+        self.size = size
+        self.transparent = transparent
+        self.rebakes = 0
+        self._elements = {}
+        self._keys = None
+        self._surface = None
+        self._rect = pygame.Rect((0, 0), canvas.size(size))
+
+    def add(self, name, draw, key=None):
+        """Add or replace a static element"""
+        self._elements[name] = (draw, key)
+        self.invalidate()
+
+    def remove(self, name):
+        """Drop a static element, if present"""
+        if self._elements.pop(name, None) is not None:
+            self.invalidate()
+
+    def invalidate(self):
+        """Force a rebake before the next draw"""
+        self._surface = None
+
+    def refresh(self):
+        """Rebake the layer if it changed; returns the bake count
+
+        The count changes exactly when the layer is rebaked, so it can serve
+        as the ``key`` of an element that draws this layer into another one.
+        """
+        keys = [key() if key else None for _, key in self._elements.values()]
+        if self._surface is None or keys != self._keys:
+            self._bake(keys)
+        return self.rebakes
+
+    def draw(self, target, area=None):
+        """Blit the baked layer onto ``target``, rebaking first if it changed
+
+        With ``area`` only the part of the layer inside that rect is blitted.
+        """
+        self.refresh()
+        if area is None:
+            return target.blit(self._surface, self._rect)
+        clip = self._rect.clip(area)
+        return target.blit(self._surface, clip, clip.move(-self._rect.x, -self._rect.y))
+
+    def _bake(self, keys):
+        surface = canvas.surface(self.size)
+        if self.transparent:
+            surface.fill(TRANSPARENT_KEY)
+        for draw, _ in self._elements.values():
+            draw(surface)
+        if pygame.display.get_surface() is not None:
+            surface = surface.convert()
+        if self.transparent:
+            surface.set_colorkey(TRANSPARENT_KEY, pygame.RLEACCEL)
+            self._rect = surface.get_bounding_rect()
+            surface = surface.subsurface(self._rect).copy()
+            surface.set_colorkey(TRANSPARENT_KEY, pygame.RLEACCEL)
+        self._surface = surface
+        self._keys = keys
+        self.rebakes += 1
+
+
+class DirtyRects:
+    """Draws a scene's static layers and presents only what changed.
+
+    ``layers`` are the scene's static layers in drawing order.  A frame
+    starts with :meth:`clear`, which draws the first layer; each later layer
+    is drawn with :meth:`cover` at its place in the drawing order, and every
+    animated element reports the rect it drew to with :meth:`add`.  The
+    frame ends with :meth:`present`.
+
+    With dirty-rect mode off (the default) this is a full redraw and a
+    ``display.flip()`` every frame.  With it on, the layers are combined into
+    one background: :meth:`clear` only restores the regions animated
+    elements covered last frame, :meth:`cover` only redraws a layer over
+    the elements drawn below it this frame, and :meth:`present` updates just
+    the rects drawn last frame and this one.  A full frame is pushed whenever
+    the background is rebaked.
+    """
+
+    def __init__(self, screen, layers, enabled=None):
+        self.screen = screen
+        self.layers = list(layers)
+        self.enabled = DIRTY_RECTS if enabled is None else enabled
+        self.full_frames = 0
+        # The layers cover the whole screen
+        self._background = StaticLayer(self.layers[0].size)
+        for i, layer in enumerate(self.layers):
+            self._background.add(i, layer.draw, key=layer.refresh)
+        self._bakes = None
+        self._full = True
+        self._previous = []
+        self._rects = []
+
+    def clear(self):
+        """Start a frame by drawing or restoring the background"""
+        self._rects = []
+        if not self.enabled:
+            self.layers[0].draw(self.screen)
+            return
+        bakes = self._background.refresh()
+        self._full = bakes != self._bakes
+        self._bakes = bakes
+        if self._full:
+            self._background.draw(self.screen)
+        else:
+            for rect in self._previous:
+                self._background.draw(self.screen, rect)
+
+    def cover(self, layer):
+        """Draw a later static layer over the elements drawn so far"""
+        if not self.enabled:
+            layer.draw(self.screen)
+            return
+        for rect in self._rects:
+            layer.draw(self.screen, rect)
+
+    def add(self, rect):
+        """Record a rect an animated element drew to; returns it unchanged"""
+        if self.enabled and rect:
+            self._rects.append(pygame.Rect(rect))
+        return rect
+
+    def invalidate(self):
+        """Redraw and present the whole frame next time, as after a rebake"""
+        self._bakes = None
+
+    def present(self):
+        """Push the frame to the display"""
+        if not self.enabled or self._full:
+            pygame.display.flip()
+            self.full_frames += 1
+        else:
+            # The screen may be a subsurface of the display
+            offset = self.screen.get_abs_offset()
+            pygame.display.update([rect.move(offset) for rect in self._previous + self._rects])
+        self._previous = self._rects
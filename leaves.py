@@ -0,0 +1,240 @@
+"""Falling leaves, thousands at a time, blown about by a shared wind field.
+
+The Forest's leaves were 4-point polygons with the corners worked out with
+``math.cos``/``math.sin`` every frame, one leaf at a time.  Here a leaf is a
+blit of a region of a :class:`sprites.SpriteSheet` that holds the leaf at
+every size and at every :data:`ROTATION_STEP` degrees of rotation, and
+:class:`Leaves` keeps the leaves in NumPy arrays (one per field) so a step
+is a handful of whole-array operations.  Every leaf drifts with the same
+:func:`wind`, which varies across the scene and over time, and spins
+faster in a gust.
+
+Set ANIM_AUTUMN=1 for autumn: :data:`AUTUMN_LEAVES` leaves instead of a
+handful.
+
+Use :func:`system` to get the NumPy engine, or a pure-Python one with the
+same interface when NumPy is not installed.
+"""
+import itertools
+import math
+import os
+import random
+
+import pygame
+
+import canvas
+import sprites
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+AUTUMN = os.environ.get("ANIM_AUTUMN", "") == "1"
+AUTUMN_LEAVES = 5000
+
+FILL = (255, 200, 0)
+OUTLINE = (200, 150, 0)
+
+# Leaf sizes (the half-length of a leaf), and the rotation step of the
+# sprites; a leaf looks the same turned half way round
+SIZES = (4, 5, 6, 7, 8)
+ROTATION_STEP = 5
+ROTATIONS = 180 // ROTATION_STEP
+
+# How quickly a leaf picks up the wind's speed, and how much faster it
+# spins per pixel per step of sideways speed
+DRAG = 0.05
+SPIN = 4
+
+# Leaves this far off either side of the scene come back in on the other
+MARGIN = 20
+
+
+def draw_leaf(surface, x, y, rotation, size):
+    """Draw a leaf turned ``rotation`` degrees; returns the rect it covers"""
+    points = []
+    for angle in range(0, 360, 90):
+        rad = math.radians(angle + rotation)
+        points.append((int(x + math.cos(rad) * size), int(y + math.sin(rad) * size * 0.6)))
+    pygame.draw.polygon(surface, FILL, points)
+    return pygame.draw.polygon(surface, OUTLINE, points, 1)
+
+
+_sheet = None
+
+
+def sheet():
+    """The leaf at every rotation step and every size, rendered once"""
+    global _sheet
+    if _sheet is None:
+        _sheet = sprites.SpriteSheet(
+            lambda surface, x, y, frame, size: draw_leaf(surface, x, y, frame * ROTATION_STEP, size),
+            ROTATIONS, SIZES, (2, 1.2))
+    return _sheet
+
+
+def wind(x, y, time, sin=math.sin):
+    """Sideways wind at ``(x, y)`` at ``time`` seconds, in pixels per step.
+
+    Slow gusts blow over the whole scene, now left, mostly right, with
+    eddies that drift across it.  Pass ``sin=numpy.sin`` to evaluate it for
+    arrays of positions.
+    """
+    gust = 0.3 + 0.5 * sin(time * 0.31) * sin(time * 0.13 + 1)
+    return gust + 0.25 * sin(x * 0.011 + time * 1.3) + 0.15 * sin(y * 0.017 - time * 0.9)
+
+
+def system(count, width, height, rng=None):
+    """``count`` leaves falling through a ``width`` by ``height`` scene,
+    vectorized when NumPy is available"""
+    if np is None:
+        return LeafList(count, width, height, rng)
+    return Leaves(count, width, height, rng)
+
+
+class Leaves:
+    """Leaves that fall at their own speed and drift and spin with the wind.
+
+    The leaves start scattered above the scene, and a leaf that falls out
+    of the bottom starts again at the top at a random place.  ``rng`` (a
+    ``random.Random``) seeds their randomness.
+    """
+
+    def __init__(self, count, width, height, rng=None):
+        self.count = count
+        self.width = width
+        self.height = height
+        self.sheet = sheet()
+        self._rng = np.random.default_rng((rng or random).getrandbits(64))
+        self.x = self._rng.uniform(0, width, count)
+        self.y = self._rng.uniform(-height, 0, count)
+        self.speed = self._rng.uniform(0.5, 1.5, count)
+        self.drift = np.zeros(count)
+        self.rotation = self._rng.uniform(0, 360, count)
+        self.rotation_speed = self._rng.uniform(-5, 5, count)
+        self.size = self._rng.integers(0, len(SIZES), count)
+        self._previous = (self.x.copy(), self.y.copy(), self.rotation.copy())
+
+        # Offset from a leaf's centre to the corner of its sprite, by size
+        areas = self.sheet.areas
+        self._half_width = np.array([row[0].width // 2 for row in areas])
+        self._half_height = np.array([row[0].height // 2 for row in areas])
+        self._areas = [area for row in areas for area in row]
+
+    def __len__(self):
+        return self.count
+
+    def update(self, time):
+        """Advance every leaf by one step of the wind at ``time`` seconds"""
+        previous_x, previous_y, previous_rotation = self._previous
+        previous_x[:] = self.x
+        previous_y[:] = self.y
+        previous_rotation[:] = self.rotation
+
+        self.drift += (wind(self.x, self.y, time, np.sin) - self.drift) * DRAG
+        self.x += self.drift
+        self.y += self.speed
+        self.rotation += self.rotation_speed + self.drift * SPIN
+        self.rotation %= 360
+
+        # Blown out of one side, back in at the other
+        span = self.width + 2 * MARGIN
+        wrapped = (self.x < -MARGIN) | (self.x > self.width + MARGIN)
+        self.x[wrapped] = (self.x[wrapped] + MARGIN) % span - MARGIN
+
+        # Fallen off the bottom, back to the top
+        fallen = self.y > self.height
+        count = int(np.count_nonzero(fallen))
+        if count:
+            self.y[fallen] = -20
+            self.x[fallen] = self._rng.uniform(0, self.width, count)
+            self.drift[fallen] = 0
+
+        moved = wrapped | fallen
+        previous_x[moved] = self.x[moved]
+        previous_y[moved] = self.y[moved]
+        previous_rotation[moved] = self.rotation[moved]
+
+    def blits(self, alpha=1.0, count=None):
+        """``(sheet, position, area)`` for the first ``count`` leaves (all of
+        them by default), ``alpha`` of the way through the last step, for
+        ``Surface.blits``
+
+        The triples are made one at a time as they are blitted: thousands
+        of them alive at once would set off the garbage collector.
+        """
+        live = slice(0, self.count if count is None else count)
+        previous_x, previous_y, previous_rotation = self._previous
+        x = previous_x[live] + (self.x[live] - previous_x[live]) * alpha
+        y = previous_y[live] + (self.y[live] - previous_y[live]) * alpha
+        # Interpolate the short way round through a wrap at 360 degrees
+        turn = (self.rotation[live] - previous_rotation[live] + 180) % 360 - 180
+        rotation = previous_rotation[live] + turn * alpha
+        frame = np.rint(rotation / ROTATION_STEP).astype(int) % ROTATIONS
+        size = self.size[live]
+
+        lefts = (canvas.length(x).astype(int) - self._half_width[size]).tolist()
+        tops = (canvas.length(y).astype(int) - self._half_height[size]).tolist()
+        areas = map(self._areas.__getitem__, (size * ROTATIONS + frame).tolist())
+        return zip(itertools.repeat(self.sheet.surface), zip(lefts, tops), areas)
+
+
+class LeafList:
+    """The :class:`Leaves` interface on plain lists, for when NumPy is missing"""
+
+    def __init__(self, count, width, height, rng=None):
+        self.width = width
+        self.height = height
+        self.sheet = sheet()
+        self._random = random.Random((rng or random).getrandbits(64))
+        self._leaves = []
+        for _ in range(count):
+            x = self._random.uniform(0, width)
+            y = self._random.uniform(-height, 0)
+            rotation = self._random.uniform(0, 360)
+            self._leaves.append({
+                'x': x, 'y': y, 'rotation': rotation,
+                'speed': self._random.uniform(0.5, 1.5),
+                'drift': 0.0,
+                'rotation_speed': self._random.uniform(-5, 5),
+                'size': self._random.randrange(len(SIZES)),
+                'previous': (x, y, rotation),
+            })
+
+    def __len__(self):
+        return len(self._leaves)
+
+    def update(self, time):
+        """Advance every leaf by one step of the wind at ``time`` seconds"""
+        span = self.width + 2 * MARGIN
+        for leaf in self._leaves:
+            leaf['previous'] = (leaf['x'], leaf['y'], leaf['rotation'])
+            leaf['drift'] += (wind(leaf['x'], leaf['y'], time) - leaf['drift']) * DRAG
+            leaf['x'] += leaf['drift']
+            leaf['y'] += leaf['speed']
+            leaf['rotation'] = (leaf['rotation'] + leaf['rotation_speed'] + leaf['drift'] * SPIN) % 360
+
+            moved = False
+            if not -MARGIN <= leaf['x'] <= self.width + MARGIN:
+                leaf['x'] = (leaf['x'] + MARGIN) % span - MARGIN
+                moved = True
+            if leaf['y'] > self.height:
+                leaf['y'] = -20
+                leaf['x'] = self._random.uniform(0, self.width)
+                leaf['drift'] = 0.0
+                moved = True
+            if moved:
+                leaf['previous'] = (leaf['x'], leaf['y'], leaf['rotation'])
+
+    def blits(self, alpha=1.0, count=None):
+        """``(sheet, position, area)`` for the first ``count`` leaves, for ``Surface.blits``"""
+        blits = []
+        for leaf in self._leaves[:count]:
+            previous_x, previous_y, previous_rotation = leaf['previous']
+            x = previous_x + (leaf['x'] - previous_x) * alpha
+            y = previous_y + (leaf['y'] - previous_y) * alpha
+            turn = (leaf['rotation'] - previous_rotation + 180) % 360 - 180
+            frame = round((previous_rotation + turn * alpha) / ROTATION_STEP)
+            blits.append(self.sheet.at((int(x), int(y)), frame, leaf['size']))
+        return blits
@@ -0,0 +1,27 @@
+"""Play scenes one after another in a single window, as on the kiosk.
+
+    python playlist.py                   # every scene once
+    python playlist.py --loop            # every scene, round and round
+    python playlist.py Forest Temple     # just these, in this order
+
+Unlike running the scene scripts one by one, pygame, the window and each
+scene's textures are set up once for the whole playlist (see
+:class:`scenes.Host`).
+"""
+import argparse
+
+import scenes
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("scenes", nargs="*", default=scenes.NAMES)
+    parser.add_argument("--loop", action="store_true",
+                        help="start over after the last scene until the window is closed")
+    args = parser.parse_args()
+
+    scenes.Host([scenes.load(name) for name in args.scenes], loop=args.loop).run()
+
+
+if __name__ == "__main__":
+    main()
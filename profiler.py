@@ -0,0 +1,211 @@
+"""Per-phase frame timing for the scenes' main loops.
+
+Set ANIM_PROFILE=1 to time the named phases of every frame.  The runner
+marks the phases it owns (textures, events, update, present, wait) and the
+scenes split their drawing with ``profiler.phase("sky")`` and so on; a
+phase lasts until the next one starts.  A HUD in the bottom left corner
+shows each phase's average milliseconds and a graph of recent frame times,
+and a summary is printed when the scene ends.
+
+Set ANIM_PROFILE_OUT=<prefix> as well to write every phase of every frame
+to <prefix>.json, a Chrome trace for chrome://tracing or Perfetto, and to
+<prefix>.csv.
+
+When profiling is off, :func:`phase` and the other module functions
+return straight away.
+"""
+import collections
+import csv
+import json
+import os
+import time
+
+import pygame
+
+import text
+
+ENABLED = os.environ.get("ANIM_PROFILE", "") == "1"
+OUTPUT = os.environ.get("ANIM_PROFILE_OUT", "")
+
+# Frames the HUD averages over and plots
+WINDOW = 120
+
+# Frames between refreshes of the HUD's text
+HUD_REFRESH = 15
+
+# Frame time at the top of the HUD's graph, in ms
+GRAPH_MS = 50
+
+HUD_COLOR = (255, 255, 255)
+GRAPH_COLOR = (0, 255, 128)
+BUDGET_COLOR = (255, 80, 80)
+PANEL_COLOR = (0, 0, 0)
+
+
+class Profiler:
+    """Named phases of each frame: when they ran and how long they took"""
+
+    def __init__(self, name, budget_ms=1000 / 60):
+        self.name = name
+        # Target frame time, drawn as a line across the HUD's graph
+        self.budget_ms = budget_ms
+        self.frames = 0
+        # (frame, phase, start, end) in perf_counter seconds
+        self.events = []
+        # Frame times and per-phase times, in ms, of the last WINDOW frames
+        self.frame_times = collections.deque(maxlen=WINDOW)
+        self.phase_times = collections.deque(maxlen=WINDOW)
+        self._origin = time.perf_counter()
+        self._frame_start = None
+        self._current = {}
+        self._phase = None
+        self._phase_start = None
+        self._panel = None
+
+    def frame(self):
+        """End the current frame and start the next one"""
+        now = time.perf_counter()
+        self._end_phase(now)
+        if self._frame_start is not None:
+            self.events.append((self.frames, "frame", self._frame_start, now))
+            self.frame_times.append((now - self._frame_start) * 1000)
+            self.phase_times.append(self._current)
+            self.frames += 1
+        self._frame_start = now
+        self._current = {}
+
+    def phase(self, name):
+        """End the current phase and start ``name``"""
+        now = time.perf_counter()
+        self._end_phase(now)
+        self._phase = name
+        self._phase_start = now
+
+    def averages(self):
+        """Average ms per frame of each phase over the last WINDOW frames"""
+        totals = {}
+        for frame in self.phase_times:
+            for name, ms in frame.items():
+                totals[name] = totals.get(name, 0) + ms
+        count = max(1, len(self.phase_times))
+        return {name: total / count for name, total in totals.items()}
+
+    def overlay(self, surface):
+        """Draw the HUD on ``surface``; returns the rect it covers"""
+        self.phase("profiler")
+        if self._panel is None or self.frames % HUD_REFRESH == 0:
+            self._panel = self._render_panel()
+        panel = self._panel
+        x, y = 10, surface.get_height() - panel.get_height() - 10
+        rect = surface.blit(panel, (x, y))
+
+        # Frame-time graph along the bottom of the panel, newest on the right
+        graph_height = 40
+        bottom = rect.bottom - 6
+        budget_y = bottom - graph_height * min(self.budget_ms, GRAPH_MS) / GRAPH_MS
+        pygame.draw.line(surface, BUDGET_COLOR, (x + 6, budget_y), (x + 6 + WINDOW, budget_y))
+        if len(self.frame_times) > 1:
+            points = [(x + 6 + WINDOW - len(self.frame_times) + i,
+                       bottom - graph_height * min(ms, GRAPH_MS) / GRAPH_MS)
+                      for i, ms in enumerate(self.frame_times)]
+            pygame.draw.lines(surface, GRAPH_COLOR, False, points)
+        return rect
+
+    def report(self):
+        """Print each phase's average time per frame"""
+        if not self.phase_times:
+            return
+        print(f"{self.name}: {self.frames} frames, "
+              f"{sum(self.frame_times) / len(self.frame_times):.2f} ms per frame "
+              f"over the last {len(self.frame_times)}")
+        for name, ms in self.averages().items():
+            print(f"  {name:<16} {ms:>7.3f} ms")
+
+    def export(self, prefix):
+        """Write every phase of every frame to ``prefix``.json (Chrome trace) and .csv"""
+        trace = [{
+            "name": name, "ph": "X", "pid": 1, "tid": 1,
+            "ts": (start - self._origin) * 1e6, "dur": (end - start) * 1e6,
+            "args": {"frame": frame},
+        } for frame, name, start, end in self.events]
+        with open(prefix + ".json", "w") as f:
+            json.dump({"traceEvents": trace, "displayTimeUnit": "ms",
+                       "otherData": {"scene": self.name}}, f)
+
+        with open(prefix + ".csv", "w", newline="") as f:
+            writer = csv.writer(f)
+            writer.writerow(["frame", "phase", "start_ms", "duration_ms"])
+            for frame, name, start, end in self.events:
+                writer.writerow([frame, name, f"{(start - self._origin) * 1000:.3f}",
+                                 f"{(end - start) * 1000:.3f}"])
+
+    def _end_phase(self, now):
+        if self._phase is None:
+            return
+        ms = (now - self._phase_start) * 1000
+        self._current[self._phase] = self._current.get(self._phase, 0) + ms
+        self.events.append((self.frames, self._phase, self._phase_start, now))
+        self._phase = None
+
+    def _render_panel(self):
+        font = text.font(18)
+        frame_ms = sum(self.frame_times) / len(self.frame_times) if self.frame_times else 0
+        rows = [(f"frame ({1000 / frame_ms if frame_ms else 0:.0f} fps)", frame_ms)]
+        rows += self.averages().items()
+        rendered = [(font.render(name, True, HUD_COLOR), font.render(f"{ms:.2f}", True, HUD_COLOR))
+                    for name, ms in rows]
+        names = max(label.get_width() for label, _ in rendered)
+        values = max(value.get_width() for _, value in rendered)
+        width = max(WINDOW, names + 12 + values) + 12
+        line_height = font.get_linesize()
+        panel = pygame.Surface((width, len(rendered) * line_height + 58))
+        panel.fill(PANEL_COLOR)
+        panel.set_alpha(190)
+        for row, (label, value) in enumerate(rendered):
+            y = 6 + row * line_height
+            panel.blit(label, (6, y))
+            panel.blit(value, (width - 6 - value.get_width(), y))
+        return panel
+
+
+# The profiler of the running scene, when profiling is on
+_active = None
+
+
+def start(name, budget_ms=1000 / 60):
+    """Start profiling a scene if ANIM_PROFILE is set; ``budget_ms`` is the
+    frame time it aims for"""
+    global _active
+    _active = Profiler(name, budget_ms) if ENABLED else None
+    return _active
+
+
+def frame():
+    """Mark the start of a frame"""
+    if _active is not None:
+        _active.frame()
+
+
+def phase(name):
+    """Mark the start of a phase of the current frame"""
+    if _active is not None:
+        _active.phase(name)
+
+
+def overlay(surface):
+    """Draw the HUD; returns its rect, or None when profiling is off"""
+    if _active is not None:
+        return _active.overlay(surface)
+    return None
+
+
+def finish():
+    """Stop profiling, print the summary and write the trace if ANIM_PROFILE_OUT is set"""
+    global _active
+    if _active is None:
+        return
+    _active.frame()
+    _active.report()
+    if OUTPUT:
+        _active.export(OUTPUT)
+    _active = None
@@ -0,0 +1,94 @@
+"""Adaptive quality: scale the scenes' element counts to hold a frame budget.
+
+Scenes ask for the number of particles, trail segments, glow rings, stars
+and so on through :func:`scale`: ``quality.scale(100)`` is 100 at level 1,
+the scenes as designed, and proportionally fewer below it.
+
+Set ANIM_QUALITY=auto to have a :class:`Governor` watch how long each frame
+takes to simulate, draw and present, step the level down when frames run
+over their budget and back up once there is time to spare.  Every change is
+logged.  ANIM_QUALITY=0.5 (or any other level) fixes the level instead.
+
+The governor does not oscillate between two levels: it lowers the level
+above :data:`HIGH_WATER` of the budget but only raises it below
+:data:`LOW_WATER`, it needs a much longer calm spell to raise the level
+than an overrun to lower it, and it forgets the frames measured at the old
+level after every change.
+"""
+import collections
+import itertools
+import os
+
+MODE = os.environ.get("ANIM_QUALITY", "1")
+AUTO = MODE == "auto"
+
+# Levels the governor steps through, lowest first
+LEVELS = (0.25, 0.4, 0.55, 0.7, 0.85, 1.0)
+
+# Fractions of the frame budget: above HIGH_WATER on average the level
+# drops, below LOW_WATER it rises
+HIGH_WATER = 0.9
+LOW_WATER = 0.6
+
+# Frames averaged before lowering the level, and before raising it
+DOWN_FRAMES = 30
+UP_FRAMES = 180
+
+# The current level; fixed unless a governor is running
+level = 1.0 if AUTO else float(MODE)
+
+
+def scale(count, minimum=1):
+    """``count`` scaled to the current level, and at least ``minimum``"""
+    return max(minimum, round(count * level))
+
+
+class Governor:
+    """Steps the quality level to keep a scene's frames within ``budget_ms``"""
+
+    def __init__(self, name, budget_ms, start=1.0):
+        self.name = name
+        self.budget_ms = budget_ms
+        # (frame, old level, new level, average ms) of every change
+        self.changes = []
+        self.frames = 0
+        self._times = collections.deque(maxlen=UP_FRAMES)
+        self._index = min(range(len(LEVELS)), key=lambda i: abs(LEVELS[i] - start))
+        self._apply()
+
+    @property
+    def level(self):
+        return LEVELS[self._index]
+
+    def frame(self, busy_ms):
+        """Record how long a frame took, without the wait for the next one"""
+        self.frames += 1
+        times = self._times
+        times.append(busy_ms)
+        if len(times) >= DOWN_FRAMES and self._index > 0:
+            recent = sum(itertools.islice(times, len(times) - DOWN_FRAMES, None)) / DOWN_FRAMES
+            if recent > self.budget_ms * HIGH_WATER:
+                self._step(-1, recent)
+                return
+        if len(times) == UP_FRAMES and self._index < len(LEVELS) - 1:
+            average = sum(times) / UP_FRAMES
+            if average < self.budget_ms * LOW_WATER:
+                self._step(1, average)
+
+    def _step(self, direction, average):
+        old = self.level
+        self._index += direction
+        self._times.clear()
+        self._apply()
+        self.changes.append((self.frames, old, self.level, average))
+        print(f"{self.name}: quality {old:.2f} -> {self.level:.2f} at frame {self.frames} "
+              f"({average:.1f} ms per frame against a {self.budget_ms:.1f} ms budget)")
+
+    def _apply(self):
+        global level
+        level = self.level
+
+
+def governor(name, budget_ms, start=1.0):
+    """A :class:`Governor` for a scene if ANIM_QUALITY=auto, else None"""
+    return Governor(name, budget_ms, start) if AUTO else None
@@ -0,0 +1,334 @@
+"""Render a scene offline, as fast as the CPU allows.
+
+Runs a scene on the SDL dummy video driver with a virtual clock that
+advances exactly ``1 / fps`` seconds per frame, and writes every frame as
+a PNG sequence or a raw RGB24 stream, without sleeping or opening a window:
+
+    python render.py Temple --png frames/
+    python render.py Temple --fps 30 --raw - | ffmpeg -f rawvideo -pix_fmt rgb24 \\
+        -video_size 900x700 -framerate 30 -i - temple.mp4
+
+``--size 3840x2160`` scales every frame to that size, and ``--scale 0.5``
+draws the scene at half its resolution and scales each frame up to the
+output size (see :mod:`canvas` and :mod:`viewport`).
+
+With ``--workers N`` the timeline is split into chunks of frames rendered
+by N processes.  The output is the same, byte for byte, as a serial
+render with the same ``--seed``: a scene's simulation draws on its own
+seeded random stream, and ``random`` is reseeded from the frame number
+before each frame is drawn.  The main process runs the simulation once,
+without drawing, and at the start of each chunk forks a process that
+inherits the scene's state as a copy-on-write snapshot and draws the
+chunk, so the simulation costs the same however many workers there are.
+Where ``os.fork`` is missing (Windows), a pool of workers reaches the
+start of each chunk by replaying the simulation from where it last
+stopped instead, and every worker ends up simulating most of the
+timeline.
+"""
+import argparse
+import collections
+import concurrent.futures
+import os
+import random
+import signal
+import sys
+import tempfile
+import time
+import traceback
+
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+# pygame greets on stdout, which may be carrying the raw frames
+os.environ.setdefault("PYGAME_HIDE_SUPPORT_PROMPT", "1")
+
+import pygame
+
+import canvas
+import scenes
+import textures
+import viewport
+
+# Frames per chunk handed to a worker; small enough for raw chunks to be
+# cheap to send back, large enough to keep the workers busy
+CHUNK_FRAMES = 16
+
+# Chunks are drawn by processes forked from a snapshot of the simulation
+# where the platform can fork
+SNAPSHOTS = hasattr(os, "fork")
+
+
+class Renderer:
+    """A scene being rendered offline, one frame at a time in order"""
+
+    def __init__(self, module, fps, seed=0, size=None):
+        self.module = module
+        self.fps = fps
+        self.seed = seed
+
+        pygame.init()
+        self.screen = pygame.display.set_mode(canvas.size((module.WIDTH, module.HEIGHT)))
+        # Frames scaled to another size are drawn on the screen and scaled
+        # into this Surface
+        self.output = self.screen
+        self.scaler = None
+        size = size or (module.WIDTH, module.HEIGHT)
+        if size != self.screen.get_size():
+            self.output = pygame.Surface(size).convert()
+            self.scaler = viewport.Scaler(self.screen, self.output, smooth=True)
+
+        # Every texture is ready before the first frame; placeholders would
+        # end up in the output
+        self.texture = textures.load(module.TEXTURES, progressive=False)
+        random.seed(seed)
+        self.scene = module.Scene(self.screen, self.texture)
+        # Frames are never presented, and a chunk may start anywhere, so
+        # every frame is drawn in full
+        if hasattr(self.scene, 'frame'):
+            self.scene.frame.enabled = False
+
+        # A virtual clock never falls behind, so no time is dropped
+        self.step = scenes.fixed_step(module, max_steps=None)
+        # The next frame to simulate
+        self.index = 0
+
+    def skip_to(self, index):
+        """Simulate up to frame ``index`` without drawing the frames before it"""
+        if index < self.index:
+            raise ValueError(f"frame {index} is already behind frame {self.index}")
+        while self.index < index:
+            self._simulate()
+
+    def frame(self, index):
+        """Draw frame ``index`` and return the Surface it ended up on"""
+        self.skip_to(index)
+        self._simulate()
+        random.seed(f"{self.seed}/{index}")
+        self.scene.draw(self.step.render_time, self.step.alpha)
+        if self.scaler is not None:
+            self.scaler.scale()
+        return self.output
+
+    def close(self):
+        self.texture.close()
+
+    def _simulate(self):
+        for _ in range(self.step.advance(self.index * 1000 / self.fps)):
+            self.scene.update(self.step.step())
+        self.index += 1
+
+
+def frames(module, fps, stop=None, seed=0, size=None):
+    """Yield ``(index, screen)`` for each frame of a scene module up to ``stop``
+
+    Frame ``n`` shows the scene ``n / fps`` seconds in; ``stop`` defaults to
+    the end of the animation.  ``screen`` is redrawn in place for each frame,
+    scaled to ``size`` if given, or else to the scene's own size when the
+    canvas is drawn at another scale.
+    """
+    if stop is None:
+        stop = frame_count(module, fps)
+    renderer = Renderer(module, fps, seed, size)
+    try:
+        for index in range(stop):
+            yield index, renderer.frame(index)
+    finally:
+        renderer.close()
+
+
+def frame_count(module, fps):
+    """How many frames the scene's animation lasts at ``fps``"""
+    return int(module.ANIMATION_DURATION * fps / 1000)
+
+
+def render_forked(module, fps, seed, size, workers, png_dir=None, raw=None):
+    """Render every frame of a scene in chunks, each drawn by a process
+    forked from this one once it has simulated up to the chunk's start
+
+    Up to ``workers`` chunks are drawn at once while this process carries
+    on simulating.  Frames go to PNG files in ``png_dir``, or into the raw
+    file object ``raw`` at their own offsets.  Yields ``(start, stop)``
+    for each chunk in order, once its frames are written.
+    """
+    renderer = Renderer(module, fps, seed, size)
+    running = collections.deque()
+    try:
+        count = frame_count(module, fps)
+        for start in range(0, count, CHUNK_FRAMES):
+            stop = min(start + CHUNK_FRAMES, count)
+            renderer.skip_to(start)
+            if len(running) == workers:
+                yield _wait(*running.popleft())
+            fd = raw.fileno() if raw is not None else None
+            pid = os.fork()
+            if pid == 0:
+                # Leave without flushing or cleaning up anything that
+                # belongs to the parent
+                status = 1
+                try:
+                    _write_frames(renderer, start, stop, png_dir, fd)
+                    status = 0
+                except BaseException:
+                    traceback.print_exc()
+                finally:
+                    os._exit(status)
+            running.append((pid, start, stop))
+        while running:
+            yield _wait(*running.popleft())
+    finally:
+        for pid, _, _ in running:
+            os.kill(pid, signal.SIGKILL)
+            os.waitpid(pid, 0)
+        renderer.close()
+
+
+def _wait(pid, start, stop):
+    _, status = os.waitpid(pid, 0)
+    if os.waitstatus_to_exitcode(status) != 0:
+        raise RuntimeError(f"the process drawing frames {start} to {stop - 1} failed")
+    return start, stop
+
+
+# The renderer a worker process keeps between chunks, so a later chunk
+# carries on from where the last one stopped instead of replaying from 0
+_renderer = None
+_renderer_key = None
+
+
+def _init_worker(render_scale):
+    # The chunk workers already use every core
+    textures.WORKERS = 1
+    canvas.SCALE = render_scale
+
+
+def _render_chunk(job):
+    """Render one chunk of frames in a worker process, replaying the
+    simulation up to its start
+
+    Frames go to PNG files in ``png_dir``, or into the raw file at
+    ``raw_path`` at their own offsets; with neither, the chunk's raw bytes
+    are returned for the parent to write.  Returns the frame count
+    otherwise.
+    """
+    global _renderer, _renderer_key
+    name, fps, seed, size, start, stop, png_dir, raw_path = job
+    key = (name, fps, seed, size)
+    if _renderer is None or _renderer_key != key or _renderer.index > start:
+        if _renderer is not None:
+            _renderer.close()
+        _renderer = Renderer(scenes.load(name), fps, seed, size)
+        _renderer_key = key
+
+    if not raw_path:
+        return _write_frames(_renderer, start, stop, png_dir, None)
+    fd = os.open(raw_path, os.O_WRONLY)
+    try:
+        return _write_frames(_renderer, start, stop, png_dir, fd)
+    finally:
+        os.close(fd)
+
+
+def _write_frames(renderer, start, stop, png_dir, fd):
+    """Draw frames ``start`` to ``stop`` and save them as PNG files in
+    ``png_dir`` or write them at their own offsets to the raw file open as
+    ``fd``, returning the frame count; with neither, return their raw bytes"""
+    rendered = []
+    for index in range(start, stop):
+        screen = renderer.frame(index)
+        if png_dir:
+            save_png(screen, png_dir, index)
+        else:
+            rendered.append(pygame.image.tobytes(screen, "RGB"))
+    if png_dir:
+        return stop - start
+    data = b"".join(rendered)
+    if fd is None:
+        return data
+    os.pwrite(fd, data, start * (len(data) // (stop - start)))
+    return stop - start
+
+
+def save_png(screen, png_dir, index):
+    pygame.image.save(screen, os.path.join(png_dir, f"frame_{index:05d}.png"))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("scene", choices=scenes.NAMES)
+    parser.add_argument("--fps", type=float, default=30,
+                        help="frames per second of animation (default: %(default)s)")
+    parser.add_argument("--seed", type=int, default=0,
+                        help="seed for the scene's randomness (default: %(default)s)")
+    parser.add_argument("--size", type=viewport.parse_size, metavar="WxH",
+                        help="scale the frames to this size, e.g. 3840x2160 (default: the scene's)")
+    parser.add_argument("--scale", type=float, default=canvas.SCALE,
+                        help="draw the scene at this fraction of its resolution, e.g. 0.5 "
+                             "(default: ANIM_RENDER_SCALE or 1)")
+    parser.add_argument("--workers", type=int, default=1,
+                        help="processes to render in, 0 for one per core (default: %(default)s)")
+    output = parser.add_mutually_exclusive_group(required=True)
+    output.add_argument("--png", metavar="DIR",
+                        help="write DIR/frame_00000.png, DIR/frame_00001.png, ...")
+    output.add_argument("--raw", metavar="FILE",
+                        help="write RGB24 frames back to back to FILE, or - for stdout")
+    args = parser.parse_args()
+    workers = args.workers or os.cpu_count() or 1
+    canvas.SCALE = args.scale
+
+    module = scenes.load(args.scene)
+    if args.png:
+        os.makedirs(args.png, exist_ok=True)
+        raw = None
+    elif args.raw == "-":
+        raw = sys.stdout.buffer
+    else:
+        raw = open(args.raw, "wb")
+
+    start = time.perf_counter()
+    count = frame_count(module, args.fps)
+    width, height = args.size or (module.WIDTH, module.HEIGHT)
+    if workers == 1:
+        for index, screen in frames(module, args.fps, seed=args.seed, size=args.size):
+            if raw is None:
+                save_png(screen, args.png, index)
+            else:
+                raw.write(pygame.image.tobytes(screen, "RGB"))
+    elif SNAPSHOTS:
+        # The chunks are written straight into a raw output file; a pipe
+        # is fed from a spool file as each chunk is finished
+        out = tempfile.TemporaryFile() if raw is sys.stdout.buffer else raw
+        frame_size = width * height * 3
+        for first, stop in render_forked(module, args.fps, args.seed, args.size, workers,
+                                         args.png, out):
+            if out is not raw:
+                raw.write(os.pread(out.fileno(), (stop - first) * frame_size, first * frame_size))
+    else:
+        if textures.CACHE_DIR:
+            # Generate the textures once here rather than in every worker
+            pygame.font.init()
+            textures.build(module.TEXTURES)
+        # Workers write straight into a raw output file; only a pipe needs
+        # the frames sent back
+        raw_path = args.raw if raw is not None and raw is not sys.stdout.buffer else None
+        if raw_path:
+            raw.truncate(count * width * height * 3)
+            raw.flush()
+        jobs = [(args.scene, args.fps, args.seed, args.size,
+                 first, min(first + CHUNK_FRAMES, count), args.png, raw_path)
+                for first in range(0, count, CHUNK_FRAMES)]
+        with concurrent.futures.ProcessPoolExecutor(workers, initializer=_init_worker,
+                                                    initargs=(args.scale,)) as pool:
+            for result in pool.map(_render_chunk, jobs):
+                if isinstance(result, bytes):
+                    raw.write(result)
+    elapsed = time.perf_counter() - start
+    if raw is not None and raw is not sys.stdout.buffer:
+        raw.close()
+
+    length = count / args.fps
+    print(f"{args.scene}: {count} frames ({width}x{height}, {length:.1f} s at "
+          f"{args.fps:g} fps) in {elapsed:.1f} s with {workers} worker(s), "
+          f"{length / elapsed:.1f}x real time", file=sys.stderr)
+    pygame.quit()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,286 @@
+"""Registry of the scene scripts that make up the playlist, and their main loop.
+
+Each scene module defines its window size, ``FPS``, ``CAPTION``,
+``ANIMATION_DURATION`` and ``TEXTURES``, and a ``Scene`` class:
+
+* ``Scene(screen, texture)`` sets the scene up to draw on ``screen``, which
+  it keeps as ``self.screen``;
+* ``update(elapsed_time)`` advances the simulation by one fixed step;
+* ``draw(elapsed_time, alpha)`` draws the state ``alpha`` of the way from the
+  previous step to the last one;
+* an optional ``present()`` puts the frame on the display, instead of
+  ``pygame.display.flip()``;
+* an optional ``frame``, the scene's ``layers.DirtyRects``, which overlays
+  drawn by the runner are added to.
+
+``draw()`` may split its work into phases with ``profiler.phase()``, and
+may be called before the first ``update()``.
+
+:class:`Host` plays several scenes in one window; :func:`run` shows one.
+"""
+import importlib
+import sys
+import time
+
+import pygame
+
+import canvas
+import debug
+import profiler
+import quality
+import textures
+import timing
+import viewport
+
+NAMES = ("Animations", "Rockets", "Forest", "Building", "Aesthetic", "Temple")
+
+# Processes generating the next scene's textures while the current one
+# plays; the other cores are left to the scene itself
+PRELOAD_WORKERS = 1
+
+
+def load(name):
+    """Import a scene module by name without starting it"""
+    return importlib.import_module(name)
+
+
+def fixed_step(module, max_steps=timing.MAX_STEPS):
+    """A fixed-timestep clock at the scene's ``SIM_RATE``, or the default rate"""
+    return timing.FixedStep(getattr(module, 'SIM_RATE', timing.SIM_RATE), max_steps)
+
+
+class Host:
+    """Shows scene modules one after another in a single pygame session.
+
+    The display is opened once, at the size of the largest scene, and a
+    smaller scene draws on a centred subsurface of it.  Each scene's
+    textures are loaded the first time it is set up and kept for the rest
+    of the session, and fonts, glyph atlases and sprites are shared through
+    their modules' caches, so showing a scene again costs neither.
+
+    While a scene plays, the next one's textures are generated by a
+    background worker and collected in whatever is left of each frame's
+    budget after it is presented.  The next scene is then set up, and its
+    first frame drawn without being presented, during the second the last
+    frame of the current one is held; switching is only a matter of
+    starting the new scene's clock.  Each switch prints how long before it
+    the textures were ready, or how long the hold had to wait for them, and
+    how long the setup took.
+
+    With ANIM_QUALITY=auto each scene runs under a ``quality.Governor``,
+    which starts from the level the scene ended on last time round.  With
+    ANIM_RENDER_SCALE or ANIM_WINDOW_SIZE set, the scenes draw on an
+    offscreen canvas of the render scale's size, which a
+    ``viewport.Scaler`` scales into the window once per frame before the
+    profiler HUD is drawn over it at the window's resolution.
+    """
+
+    def __init__(self, modules, loop=False):
+        self.modules = list(modules)
+        self.loop = loop
+        pygame.init()
+        size = (max(module.WIDTH for module in self.modules),
+                max(module.HEIGHT for module in self.modules))
+        self.window = pygame.display.set_mode(viewport.WINDOW_SIZE or size)
+        if self.window.get_size() == canvas.size(size):
+            self.screen = self.window
+            self.scaler = None
+        else:
+            self.screen = canvas.surface(size).convert()
+            self.scaler = viewport.Scaler(self.screen, self.window)
+        self.clock = pygame.time.Clock()
+        # Textures of every scene set up so far, by module name
+        self.textures = {}
+        # Quality level each scene ended on, to start from next time round
+        self.levels = {}
+
+    def preload(self, module):
+        """Start generating a scene's textures in the background, unless they
+        are loaded already; returns its texture table"""
+        if module.__name__ not in self.textures:
+            self.textures[module.__name__] = textures.Loader(
+                module.TEXTURES, progressive=True, workers=PRELOAD_WORKERS)
+        return self.textures[module.__name__]
+
+    def setup(self, module):
+        """Create a scene ready to show its first frame without delay"""
+        texture = self.textures.get(module.__name__)
+        if texture is None:
+            texture = self.textures[module.__name__] = textures.load(module.TEXTURES)
+        view = pygame.Rect((0, 0), canvas.size((module.WIDTH, module.HEIGHT)))
+        view.center = self.screen.get_rect().center
+        scene = module.Scene(self.screen.subsurface(view), texture)
+        if self.scaler is not None and hasattr(scene, 'frame'):
+            # The whole canvas is scaled to the window every frame anyway
+            scene.frame.enabled = False
+
+        # A first draw bakes the static layers and fills the sprite caches;
+        # nothing is presented until the scene starts
+        scene.draw(0, 1.0)
+        return scene
+
+    def run(self):
+        """Show the scenes in order, over and over with ``loop``, until the
+        last one ends or the window is closed"""
+        index = 0
+        scene = self.setup(self.modules[0])
+        while scene is not None:
+            module = self.modules[index]
+            index = self._next(index)
+            upcoming = later = None
+            if index is not None:
+                upcoming = self.modules[index]
+                after = self._next(index)
+                later = self.modules[after] if after is not None else None
+            scene = self.play(module, scene, upcoming, later)
+
+        for texture in self.textures.values():
+            texture.close()
+        pygame.quit()
+
+    def play(self, module, scene, upcoming=None, later=None):
+        """Show a scene until it ends
+
+        Returns the ``upcoming`` module's scene, set up while the last frame
+        is held, or None when there is none or the window was closed.  The
+        textures of the scene ``later`` than that start loading during the
+        hold as well.
+        """
+        pygame.display.set_caption(module.CAPTION)
+        fps = timing.render_fps(module.FPS)
+        texture = self.textures[module.__name__]
+        present = getattr(scene, 'present', pygame.display.flip)
+        hud_surface = scene.screen
+        if self.scaler is not None:
+            present = pygame.display.flip
+            hud_surface = self.window
+
+        # The whole display is redrawn and presented on the first frame
+        self.screen.fill((0, 0, 0))
+        if hasattr(scene, 'frame'):
+            scene.frame.invalidate()
+
+        step = fixed_step(module)
+        frame_budget = 1000 / (fps or module.FPS)
+        allocations = debug.AllocationCounter(module.CAPTION)
+        profiler.start(module.CAPTION, frame_budget)
+        start_time = pygame.time.get_ticks()
+
+        # The next scene's textures load in the background; usually they
+        # were started during the last hold
+        preload = self.preload(upcoming) if upcoming is not None else None
+        ready_time = start_time if preload is None or preload.ready else None
+
+        # Element counts follow the frame time with ANIM_QUALITY=auto
+        governor = quality.governor(module.CAPTION, frame_budget,
+                                    self.levels.get(module.__name__, 1.0))
+
+        closed = False
+        running = True
+        while running:
+            frame_start = time.perf_counter()
+            profiler.frame()
+            allocations.frame()
+
+            # Swap in textures that finished loading in the background
+            profiler.phase("textures")
+            texture.pump()
+
+            elapsed_time = pygame.time.get_ticks() - start_time
+
+            # Check if animation is complete
+            if elapsed_time > module.ANIMATION_DURATION:
+                running = False
+
+            # Handle events
+            profiler.phase("events")
+            for event in pygame.event.get():
+                if event.type == pygame.QUIT:
+                    running = False
+                    closed = True
+                if event.type == pygame.KEYDOWN:
+                    if event.key == pygame.K_ESCAPE:
+                        running = False
+                        closed = True
+
+            profiler.phase("update")
+            for _ in range(step.advance(elapsed_time)):
+                scene.update(step.step())
+            profiler.phase("draw")
+            scene.draw(step.render_time, step.alpha)
+
+            # Scale the canvas to the window, once per frame
+            if self.scaler is not None:
+                profiler.phase("scale")
+                self.scaler.scale()
+
+            # Profiler HUD (ANIM_PROFILE=1)
+            hud = profiler.overlay(hud_surface)
+            if hud is not None and hasattr(scene, 'frame'):
+                scene.frame.add(hud)
+
+            # Update display
+            profiler.phase("present")
+            present()
+            busy_ms = (time.perf_counter() - frame_start) * 1000
+            if governor is not None:
+                governor.frame(busy_ms)
+
+            # Spend what is left of the frame budget on the next scene's textures
+            if ready_time is None:
+                profiler.phase("preload")
+                if busy_ms < frame_budget:
+                    preload.pump(frame_budget - busy_ms)
+                if preload.ready:
+                    ready_time = pygame.time.get_ticks()
+
+            profiler.phase("wait")
+            self.clock.tick(fps)
+
+        # The hold is not a frame, so it stays out of the frame times
+        profiler.finish()
+
+        # Hold the last frame for a second, setting the next scene up meanwhile
+        following = None
+        if not closed:
+            hold_start = pygame.time.get_ticks()
+            if upcoming is not None:
+                if ready_time is None:
+                    preload.finish()
+                    ready_time = pygame.time.get_ticks()
+                setup_start = pygame.time.get_ticks()
+                following = self.setup(upcoming)
+                report_switch(upcoming, hold_start - ready_time,
+                              pygame.time.get_ticks() - setup_start)
+                if later is not None:
+                    self.preload(later)
+            pygame.time.wait(max(0, 1000 - (pygame.time.get_ticks() - hold_start)))
+
+        if governor is not None:
+            self.levels[module.__name__] = governor.level
+        allocations.report()
+        return following
+
+    def _next(self, index):
+        """Index of the scene after ``index``, or None after the last one"""
+        index += 1
+        if index == len(self.modules):
+            return 0 if self.loop else None
+        return index
+
+
+def report_switch(module, headroom, setup_ms):
+    """Print how a switch to ``module`` went: ``headroom`` ms between its
+    textures being ready and the current scene ending (negative when the
+    hold waited for them), and how long setting it up took"""
+    if headroom >= 0:
+        textures_state = f"textures ready {headroom / 1000:.1f} s before the switch"
+    else:
+        textures_state = f"textures {-headroom} ms late"
+    print(f"{module.CAPTION}: {textures_state}, set up in {setup_ms} ms")
+
+
+def run(module):
+    """Show a scene module in its own window until it ends or is closed, then exit"""
+    Host([module]).run()
+    sys.exit()
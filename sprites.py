@@ -0,0 +1,70 @@
+"""Sprite sheets: animated shapes pre-rendered at quantized frames and scales.
+
+Some shapes were drawn from polygons, ellipses and lines every frame, with
+the geometry worked out from the time on the spot (the Forest's butterfly
+flapping its wings).  A :class:`SpriteSheet` draws such a shape once per
+animation frame and scale into one Surface, so a sprite costs a single
+blit of a region of the sheet however many draw calls it is made of, and
+all of a frame's sprites can go to the screen in one ``Surface.blits``
+call.
+"""
+import math
+
+import pygame
+
+import canvas
+
+# Transparent colour of the sheets; nothing the scenes draw uses it
+COLORKEY = (255, 0, 255)
+
+
+class SpriteSheet:
+    """``frames`` frames of a sprite at each of ``scales``, in one Surface.
+
+    ``draw(surface, x, y, frame, scale)`` draws frame ``frame`` (``0`` to
+    ``frames - 1``) of the sprite centred on ``(x, y)``, and ``size`` is the
+    sprite's bounding box at scale 1, centred on that point.  A sprite drawn
+    from the sheet has exactly the pixels ``draw`` gives at an integer
+    position.  ``draw`` works in pixels of the sheet, which is rendered at
+    the size of the :mod:`canvas`: the ``scale`` it is given includes the
+    canvas's.
+    """
+
+    def __init__(self, draw, frames, scales, size):
+        self.frames = frames
+        self.scales = tuple(scales)
+        pixel_scales = [canvas.length(scale) for scale in self.scales]
+        cells = [(math.ceil(size[0] * scale) + 1, math.ceil(size[1] * scale) + 1)
+                 for scale in pixel_scales]
+        self.surface = pygame.Surface((frames * max(width for width, _ in cells),
+                                       sum(height for _, height in cells)))
+        self.surface.fill(COLORKEY)
+
+        # Region of the sheet holding each frame, by scale
+        self.areas = []
+        top = 0
+        for scale, (width, height) in zip(pixel_scales, cells):
+            row = []
+            for frame in range(frames):
+                area = pygame.Rect(frame * width, top, width, height)
+                draw(self.surface.subsurface(area), width // 2, height // 2, frame, scale)
+                row.append(area)
+            self.areas.append(row)
+            top += height
+
+        if pygame.display.get_surface() is not None:
+            self.surface = self.surface.convert()
+        # Not RLEACCEL: an RLE surface is decoded from the top for a blit of
+        # any region of it, which makes blitting from a tall sheet slow
+        self.surface.set_colorkey(COLORKEY)
+
+    def scale_index(self, scale):
+        """Index of the sheet's scale closest to ``scale``"""
+        return min(range(len(self.scales)), key=lambda i: abs(self.scales[i] - scale))
+
+    def at(self, center, frame, scale_index=0):
+        """The ``(sheet, position, area)`` triple that draws a frame centred
+        on ``center``, for ``Surface.blits``"""
+        area = self.areas[scale_index][frame % self.frames]
+        x, y = canvas.point(center)
+        return self.surface, (x - area.width // 2, y - area.height // 2), area
@@ -0,0 +1,97 @@
+"""Pre-rendered circle stamps for the scenes' particles and glows.
+
+The scenes draw thousands of small circles per frame, each with a colour
+computed on the spot (a base colour faded by a pulse or a trail).  A stamp
+is such a circle rendered once onto its own small Surface, keyed by radius,
+outline width, base colour and fade quantized to :data:`LEVELS` steps, so a
+frame's circles can be collected into one list and drawn with a single
+``Surface.blits`` call.  Stamps are kept in an LRU cache limited by the
+memory their pixels take up.
+"""
+from collections import OrderedDict
+
+import pygame
+
+import canvas
+
+# Fade steps between invisible and full colour
+LEVELS = 64
+
+# Pixel memory the shared cache may hold before it drops old stamps
+BUDGET = 8 * 1024 * 1024
+
+# Transparent colour of a stamp, and the one used when a stamp is this colour
+_KEYS = ((255, 0, 255), (0, 0, 0))
+
+
+class StampCache:
+    """Circle stamps, least recently used first out once over ``budget`` bytes"""
+
+    def __init__(self, budget=BUDGET, levels=LEVELS):
+        self.budget = budget
+        self.levels = levels
+        self.used = 0
+        self.hits = 0
+        self.misses = 0
+        self._stamps = OrderedDict()
+
+    def __len__(self):
+        return len(self._stamps)
+
+    def circle(self, radius, color, fade=1.0, width=0):
+        """A stamp of ``canvas.circle(.., radius, width)`` in ``color`` faded by ``fade``
+
+        ``color`` must be hashable, such as a tuple.  Blit the stamp with
+        :func:`at`, which centers it on the circle's center.
+        """
+        radius, width = canvas.pixels(radius), canvas.pixels(width)
+        level = int(fade * self.levels + 0.5)
+        key = (radius, width, color, level)
+        stamp = self._stamps.get(key)
+        if stamp is not None:
+            self._stamps.move_to_end(key)
+            self.hits += 1
+            return stamp
+
+        self.misses += 1
+        fade = min(max(level, 0), self.levels) / self.levels
+        faded = tuple(int(channel * fade) for channel in color[:3])
+        colorkey = _KEYS[faded == _KEYS[0]]
+        stamp = pygame.Surface((2 * radius, 2 * radius) if radius > 0 else (0, 0))
+        stamp.fill(colorkey)
+        if radius > 0:
+            pygame.draw.circle(stamp, faded, (radius, radius), radius, width)
+        if pygame.display.get_surface() is not None:
+            stamp = stamp.convert()
+        stamp.set_colorkey(colorkey, pygame.RLEACCEL)
+
+        self._stamps[key] = stamp
+        self.used += _footprint(stamp)
+        while self.used > self.budget and len(self._stamps) > 1:
+            _, dropped = self._stamps.popitem(last=False)
+            self.used -= _footprint(dropped)
+        return stamp
+
+    def clear(self):
+        """Drop every stamp"""
+        self._stamps.clear()
+        self.used = 0
+
+
+def _footprint(surface):
+    return surface.get_width() * surface.get_height() * surface.get_bytesize()
+
+
+# Shared by every scene
+cache = StampCache()
+
+
+def circle(radius, color, fade=1.0, width=0):
+    """A stamp from the shared cache; see :meth:`StampCache.circle`"""
+    return cache.circle(radius, color, fade, width)
+
+
+def at(stamp, center):
+    """The ``(stamp, position)`` pair that centers ``stamp`` on ``center``, for ``Surface.blits``"""
+    x, y = canvas.point(center)
+    return stamp, (x - stamp.get_width() // 2, y - stamp.get_height() // 2)
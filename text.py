@@ -0,0 +1,229 @@
+"""Shared fonts and pre-rendered glyphs for the scenes' text.
+
+Creating a ``pygame.font.Font`` loads and parses the font file, and
+rendering a string rasterizes every glyph in it; the scenes used to do both
+for their timers on every frame.  :func:`font` creates each font once, and
+a :class:`GlyphAtlas` rasterizes each character once so that a changing
+string such as ``"12.3s"`` is drawn as a handful of glyph blits.
+:class:`GlowText` goes further for text drawn with a fake glow (the same
+string blitted several times at small offsets): it composes the whole
+effect into one Surface per distinct string and keeps the last few.
+Atlases and glowing text take their font sizes and positions in scene
+units and render at the size of the :mod:`canvas`; :func:`font` takes
+pixels.
+"""
+from collections import OrderedDict
+
+import pygame
+
+import canvas
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+# Characters of the countdown timers, rendered when an atlas is created
+TIMER_CHARS = "0123456789.s"
+
+_fonts = {}
+_atlases = {}
+
+
+def font(size, name=None):
+    """A shared ``pygame.font.Font`` of ``size`` pixels, created on first use"""
+    key = (name, size)
+    if key not in _fonts:
+        _fonts[key] = pygame.font.Font(name, size)
+    return _fonts[key]
+
+
+def atlas(size, color, alpha=None, name=None):
+    """A shared :class:`GlyphAtlas` for the given font and colour, ``size``
+    in scene units"""
+    key = (name, size, tuple(color), alpha)
+    if key not in _atlases:
+        _atlases[key] = GlyphAtlas(font(canvas.pixels(size), name), color, alpha)
+    return _atlases[key]
+
+
+def clear():
+    """Drop every cached font and atlas"""
+    _fonts.clear()
+    _atlases.clear()
+
+
+class GlyphAtlas:
+    """Antialiased glyphs of one font and colour, rendered once each.
+
+    The characters in ``chars`` are rendered up front; any other character
+    is rendered the first time it is drawn.  Glyphs are placed using the
+    font's advance for each pair of characters, so kerning matches what
+    ``Font.render`` produces for the whole string.  Glyphs are rendered at
+    the font's pixel size; positions and sizes are in scene units (see
+    :mod:`canvas`).
+    """
+
+    def __init__(self, font, color, alpha=None, chars=TIMER_CHARS):
+        self.font = font
+        self.color = color
+        self.alpha = alpha
+        self._glyphs = {}
+        self._advances = {}
+        for char in chars:
+            self.glyph(char)
+
+    def glyph(self, char):
+        """The rendered Surface for a single character"""
+        glyph = self._glyphs.get(char)
+        if glyph is None:
+            glyph = self.font.render(char, True, self.color)
+            if self.alpha is not None:
+                glyph.set_alpha(self.alpha)
+            self._glyphs[char] = glyph
+        return glyph
+
+    def advance(self, char, following):
+        """How far ``following`` starts to the right of ``char``"""
+        pair = char + following
+        advance = self._advances.get(pair)
+        if advance is None:
+            advance = self.font.size(pair)[0] - self.font.size(following)[0]
+            self._advances[pair] = advance
+        return advance
+
+    def size(self, text):
+        """Width and height of ``text``, like ``Font.size``"""
+        width, height = self._size(text)
+        return canvas.unscaled(width), canvas.unscaled(height)
+
+    def draw(self, target, text, pos):
+        """Blit ``text`` with its top-left corner at ``pos``; returns the rect drawn to"""
+        return self._draw(target, text, canvas.point(pos))
+
+    def _size(self, text):
+        # Size of ``text`` in pixels
+        width = sum(self.advance(char, following) for char, following in zip(text, text[1:]))
+        if text:
+            width += self.glyph(text[-1]).get_width()
+        return width, self.font.get_height()
+
+    def _draw(self, target, text, pos):
+        # Draw ``text`` at ``pos`` in pixels
+        x, y = pos
+        blits = []
+        for char, following in zip(text, text[1:] + " "):
+            blits.append((self.glyph(char), (x, y)))
+            x += self.advance(char, following)
+        rects = target.blits(blits)
+        if not rects:
+            return pygame.Rect(pos, (0, 0))
+        return rects[0].unionall(rects[1:])
+
+
+class GlowText:
+    """Text with a glow made of offset copies, composed once per string.
+
+    The glow is the string in ``glow_color`` drawn ``offset`` scene units to
+    the left and right for each of ``offsets`` (in that order), optionally with
+    ``glow_alpha(offset)`` as its alpha, under the string itself in
+    ``color``.  Each distinct string is composed into one Surface, and the
+    ``cache_size`` most recently drawn ones are kept, which covers a timer
+    whose text changes every tenth of a second.
+
+    The copies are composed glyph by glyph with NumPy, in the order they
+    used to be drawn straight onto the scene, with premultiplied alpha in
+    floating point.  Blending premultiplied colours is associative, so
+    blitting the composed Surface gives the pixels of drawing every copy
+    onto the scene in turn, to within a level or two of rounding.  Without
+    NumPy nothing is composed: :meth:`draw` blits every copy from the glyph
+    atlases, as the scenes used to.
+    """
+
+    def __init__(self, size, color, glow_color, offsets, glow_alpha=None,
+                 cache_size=4, name=None):
+        self.font = font(canvas.pixels(size), name)
+        self.color = color
+        self.glow_color = glow_color
+        self.offsets = tuple(offsets)
+        self.glow_alpha = glow_alpha
+        self.cache_size = cache_size
+        shifts = [canvas.pixels(offset) for offset in self.offsets]
+        self.margin = max(shifts, default=0)
+        self._text = atlas(size, color, name=name)
+        self._glows = [atlas(size, glow_color, glow_alpha(offset) if glow_alpha else None, name)
+                       for offset in self.offsets]
+        # Every copy of the string, bottom first: its atlas and how far
+        # right of the sprite's left edge it starts
+        self._layers = [(glow, self.margin + sign * shift)
+                        for shift, glow in zip(shifts, self._glows) for sign in (1, -1)]
+        self._layers.append((self._text, self.margin))
+        # Premultiplied glyph arrays, by atlas and character
+        self._glyphs = {}
+        self._sprites = OrderedDict()
+
+    def render(self, text):
+        """The composed Surface for ``text``, with premultiplied alpha; the
+        text itself starts ``margin`` pixels in.  Needs NumPy."""
+        sprite = self._sprites.get(text)
+        if sprite is not None:
+            self._sprites.move_to_end(text)
+            return sprite
+
+        width, height = self._text._size(text)
+        sprite = pygame.Surface((width + 2 * self.margin, height), pygame.SRCALPHA)
+        self._compose(sprite, text)
+        if pygame.display.get_surface() is not None:
+            sprite = sprite.convert_alpha()
+
+        self._sprites[text] = sprite
+        if len(self._sprites) > self.cache_size:
+            self._sprites.popitem(last=False)
+        return sprite
+
+    def size(self, text):
+        """Width and height of the text itself, without the glow"""
+        return self._text.size(text)
+
+    def draw(self, target, text, pos):
+        """Blit the glowing ``text`` with the text's top-left corner at ``pos``; returns the rect drawn to"""
+        x, y = canvas.point(pos)
+        if np is None:
+            rects = [glyphs._draw(target, text, (x - self.margin + left, y))
+                     for glyphs, left in self._layers]
+            return rects[0].unionall(rects[1:])
+        return target.blit(self.render(text), (x - self.margin, y),
+                           special_flags=pygame.BLEND_PREMULTIPLIED)
+
+    def _compose(self, sprite, text):
+        # Lay every copy of ``text`` over the sprite glyph by glyph, as
+        # GlyphAtlas.draw would on the scene, and round once at the end
+        width, height = sprite.get_size()
+        color = np.zeros((width, height, 3))
+        alpha = np.zeros((width, height))
+        for glyphs, x in self._layers:
+            for char, following in zip(text, text[1:] + " "):
+                glyph_color, glyph_alpha = self._glyph_arrays(glyphs, char)
+                right = min(width, x + glyph_alpha.shape[0])
+                area = slice(x, right), slice(0, glyph_alpha.shape[1])
+                cover = glyph_alpha[:right - x]
+                color[area] = glyph_color[:right - x] + color[area] * (1 - cover[..., None])
+                alpha[area] = cover + alpha[area] * (1 - cover)
+                x += glyphs.advance(char, following)
+        pixels = pygame.surfarray.pixels3d(sprite)
+        pixels[...] = np.rint(color)
+        del pixels
+        pixels = pygame.surfarray.pixels_alpha(sprite)
+        pixels[...] = np.rint(alpha * 255)
+        del pixels
+
+    def _glyph_arrays(self, glyphs, char):
+        # Premultiplied colour and alpha (0 to 1) of a glyph, as floats
+        key = (id(glyphs), char)
+        arrays = self._glyphs.get(key)
+        if arrays is None:
+            glyph = glyphs.glyph(char)
+            alpha = pygame.surfarray.array_alpha(glyph) / 255 * ((glyph.get_alpha() or 255) / 255)
+            color = pygame.surfarray.array3d(glyph) * alpha[..., None]
+            arrays = self._glyphs[key] = (color, alpha)
+        return arrays
@@ -0,0 +1,496 @@
+"""Shared helpers for the procedural texture generators used by the scenes.
+
+Every scene describes its textures as a ``TEXTURES`` table mapping a name to
+``(generator, args)``; :func:`build` turns that table into Surfaces.  Each
+texture is generated with its own seed derived from :data:`SEED` and its
+name, so a given table always produces the same pixels, and finished
+textures are kept in an on-disk cache (see :func:`cache_path`) that
+``bake.py`` can fill ahead of time.  Textures that still have to be generated
+are spread over a pool of worker processes (see :func:`render`), or, in
+progressive mode, filled in behind placeholders while the scene runs (see
+:class:`Loader`).
+
+The per-pixel base fills that used to live inside each generator are
+implemented here twice: a NumPy path that builds the whole noise/sinusoid
+field as an array and writes it with ``pygame.surfarray`` in one go, and the
+original pure-Python ``random.randint`` + ``Surface.set_at`` loops, kept as
+the reference and as the fallback when NumPy is not installed.  Set
+``ANIM_TEXTURES=python`` to force the reference path.
+
+Generators take their sizes in scene units and draw through :mod:`canvas`,
+so every texture is generated at the size it is drawn at: with
+ANIM_RENDER_SCALE=0.5 a texture has a quarter of the pixels to fill.
+"""
+import collections
+import concurrent.futures
+import hashlib
+import inspect
+import math
+import os
+import random
+import struct
+import time
+import zlib
+
+import pygame
+
+import canvas
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+VECTORIZED = np is not None and os.environ.get("ANIM_TEXTURES", "numpy") != "python"
+
+# Base seed for every texture; change it to get a different set of textures
+SEED = int(os.environ.get("ANIM_SEED", "0"))
+
+# Where finished textures are stored; set ANIM_TEXTURE_CACHE to an empty
+# string to turn the cache off
+CACHE_DIR = os.environ.get(
+    "ANIM_TEXTURE_CACHE",
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), ".texture_cache"))
+
+# Cache file layout: magic, width, height, colorkey flag + RGB, then raw RGB rows
+CACHE_SUFFIX = ".tex"
+_HEADER = struct.Struct("<4sIIB3B")
+_MAGIC = b"ATX1"
+
+# Worker processes used to generate textures that are not cached yet; 1
+# generates them in the calling process
+WORKERS = int(os.environ.get("ANIM_TEXTURE_WORKERS", "0")) or os.cpu_count() or 1
+
+# Set ANIM_TEXTURE_SCALE to e.g. 0.5 to generate textures at that fraction of
+# their size and scale them up, for a fraction of the generation cost.  Only
+# table entries marked SCALABLE are scaled: noise fills, which look the same
+# scaled up, not textures with fixed geometry such as text or windows
+SCALE = float(os.environ.get("ANIM_TEXTURE_SCALE", "1"))
+SCALABLE = "scalable"
+
+# Set ANIM_PROGRESSIVE_TEXTURES=1 to start scenes on flat-colour placeholders
+# and fill textures in while they run (see Loader)
+PROGRESSIVE = os.environ.get("ANIM_PROGRESSIVE_TEXTURES", "") == "1"
+
+# Placeholder colour for table entries that do not name one
+PLACEHOLDER_COLOR = (128, 128, 128)
+
+Job = collections.namedtuple("Job", "name generator args seed path placeholder scale")
+
+# SHA-1 of each source file read for a cache key, by path
+_file_digests = {}
+
+
+def build(specs, seed=None, workers=None):
+    """Generate every texture in a ``{name: (generator, args)}`` table.
+
+    Cached textures are loaded straight from disk; the rest are generated,
+    in parallel when there is more than one of them, and written back.
+    Blocks until every texture is ready; see :func:`load` for the
+    progressive alternative.
+    """
+    built = {}
+    missing = []
+    for job in jobs(specs, seed):
+        surface = load_cached(job.path) if job.path else None
+        if surface is None:
+            missing.append(job)
+        else:
+            built[job.name] = surface
+    for job, raw in zip(missing, render(missing, workers)):
+        if job.path:
+            save_cached(job.path, raw)
+        built[job.name] = from_raw(raw)
+    return {name: built[name] for name in specs}
+
+
+def load(specs, seed=None, progressive=None):
+    """Load a texture table for a scene, progressively if ANIM_PROGRESSIVE_TEXTURES is set"""
+    return Loader(specs, seed, PROGRESSIVE if progressive is None else progressive)
+
+
+class Loader(dict):
+    """Textures for a scene, keyed by name, that can fill themselves in later.
+
+    In progressive mode every entry starts out as a flat-colour placeholder of
+    the right size, so the scene can draw its first frame straight away.
+    Calling :meth:`pump` once per frame loads cached textures and collects
+    finished ones from a background pool of worker processes within a small
+    time budget, copying their pixels into the placeholder Surfaces in place,
+    so references the scene already holds pick up the real texture.
+
+    Placeholder sizes come from the table: generators take ``(width,
+    height, ...)`` or a single ``size``, in scene units.  An entry may add a third item, the
+    placeholder colour, or None to keep the texture invisible until it is
+    ready.
+    """
+
+    def __init__(self, specs, seed=None, progressive=False, workers=None):
+        super().__init__()
+        self._queue = collections.deque()
+        self._running = {}
+        self._pool = None
+        self._workers = workers or WORKERS
+        # Bumped whenever a texture is swapped in, for caches built from them
+        self.version = 0
+        if not progressive:
+            self.update(build(specs, seed, workers))
+            return
+        for job in jobs(specs, seed):
+            self[job.name] = _placeholder(job)
+            self._queue.append(job)
+
+    @property
+    def ready(self):
+        """True once every texture has its real pixels"""
+        return not self._queue and not self._running
+
+    def pump(self, budget_ms=4):
+        """Swap in whatever finished since the last frame, within a time budget"""
+        if self.ready:
+            return
+        deadline = time.perf_counter() + budget_ms / 1000
+
+        for future in [f for f in self._running if f.done()]:
+            job = self._running.pop(future)
+            raw = future.result()
+            if job.path:
+                save_cached(job.path, raw)
+            self._fill(job, raw)
+            if time.perf_counter() > deadline:
+                return
+
+        while self._queue and time.perf_counter() < deadline:
+            job = self._queue.popleft()
+            raw = read_cached(job.path) if job.path else None
+            if raw is not None:
+                self._fill(job, raw)
+                continue
+            if self._pool is None:
+                self._pool = concurrent.futures.ProcessPoolExecutor(
+                    self._workers, initializer=_init_worker, initargs=(VECTORIZED, canvas.SCALE))
+            future = self._pool.submit(_render_job, (job.generator, job.args, job.seed, job.scale))
+            self._running[future] = job
+
+        if self.ready:
+            self.close()
+
+    def finish(self):
+        """Block until every texture is ready"""
+        while not self.ready:
+            self.pump(budget_ms=50)
+            if self._running and not self._queue:
+                concurrent.futures.wait(self._running,
+                                        return_when=concurrent.futures.FIRST_COMPLETED)
+
+    def close(self):
+        """Stop the background workers, dropping any textures still queued"""
+        if self._pool is not None:
+            self._pool.shutdown(wait=False, cancel_futures=True)
+            self._pool = None
+
+    def _fill(self, job, raw):
+        size, pixels, colorkey = raw
+        surface = self[job.name]
+        if size != surface.get_size():
+            raise ValueError(f"texture {job.name!r} is {size[0]}x{size[1]}, expected "
+                             f"{surface.get_width()}x{surface.get_height()} from its arguments")
+        surface.blit(pygame.image.frombytes(pixels, size, "RGB"), (0, 0))
+        surface.set_colorkey(colorkey)
+        self.version += 1
+
+
+def texture_size(args):
+    """The size in scene units of the texture a generator makes from
+    ``args``: generators take ``(width, height, ...)`` or a single ``size``"""
+    if len(args) > 1 and isinstance(args[1], int):
+        return tuple(args[:2])
+    return (args[0], args[0])
+
+
+def scaled_args(args, scale):
+    """Generator arguments for a texture ``scale`` times the size"""
+    if len(args) > 1 and isinstance(args[1], int):
+        return (max(1, round(args[0] * scale)), max(1, round(args[1] * scale))) + tuple(args[2:])
+    return (max(1, round(args[0] * scale)),) + tuple(args[1:])
+
+
+def _placeholder(job):
+    surface = canvas.surface(texture_size(job.args))
+    if job.placeholder is None:
+        surface.set_colorkey((0, 0, 0))
+    else:
+        surface.fill(job.placeholder)
+    return surface
+
+
+def jobs(specs, seed=None):
+    """List the generation jobs, with their seeds and cache files, for a table"""
+    if seed is None:
+        seed = SEED
+    listed = []
+    for name, (generator, args, *options) in specs.items():
+        texture_seed = job_seed(seed, name)
+        scale = SCALE if SCALABLE in options[1:] else 1
+        listed.append(Job(name, generator, args, texture_seed,
+                          cache_path(generator, args, texture_seed, scale),
+                          options[0] if options else PLACEHOLDER_COLOR, scale))
+    return listed
+
+
+def job_seed(seed, name):
+    """Seed for one named texture, derived from the base seed"""
+    return zlib.crc32(f"{seed}:{name}".encode())
+
+
+def generate(generator, args, seed, scale=1):
+    """Run a generator with ``random`` seeded, leaving the caller's stream alone
+
+    With ``scale`` below 1 the texture is generated that much smaller and
+    scaled up to its full size: smoothly, unless it has a colorkey, whose
+    edges must stay exact.
+    """
+    state = random.getstate()
+    random.seed(seed)
+    try:
+        if scale == 1:
+            return generator(*args)
+        surface = generator(*scaled_args(args, scale))
+    finally:
+        random.setstate(state)
+    size = canvas.size(texture_size(args))
+    if surface.get_colorkey() is not None or surface.get_bitsize() < 24:
+        return pygame.transform.scale(surface, size)
+    return pygame.transform.smoothscale(surface, size)
+
+
+def render(jobs, workers=None):
+    """Generate a list of jobs and return their textures in raw form.
+
+    With more than one job and more than one worker the jobs are spread over
+    a pool of processes; each worker sends back raw pixel buffers rather than
+    Surfaces, and the caller turns them into Surfaces with :func:`from_raw`.
+    """
+    if workers is None:
+        workers = WORKERS
+    workers = min(workers, len(jobs))
+    if workers <= 1:
+        return [to_raw(generate(job.generator, job.args, job.seed, job.scale)) for job in jobs]
+    with concurrent.futures.ProcessPoolExecutor(workers, initializer=_init_worker,
+                                                initargs=(VECTORIZED, canvas.SCALE)) as pool:
+        return list(pool.map(_render_job, [(job.generator, job.args, job.seed, job.scale)
+                                           for job in jobs]))
+
+
+def _init_worker(vectorized, render_scale):
+    global VECTORIZED
+    VECTORIZED = vectorized
+    canvas.SCALE = render_scale
+    # Some generators render text
+    pygame.font.init()
+
+
+def _render_job(job):
+    generator, args, seed, scale = job
+    return to_raw(generate(generator, args, seed, scale))
+
+
+def to_raw(surface):
+    """Flatten a texture to ``(size, rgb_bytes, colorkey)`` for pickling or storage"""
+    colorkey = surface.get_colorkey()
+    return surface.get_size(), pygame.image.tobytes(surface, "RGB"), colorkey[:3] if colorkey else None
+
+
+def from_raw(raw):
+    """Rebuild a texture from the form returned by :func:`to_raw`"""
+    size, pixels, colorkey = raw
+    surface = pygame.image.frombytes(pixels, size, "RGB")
+    if pygame.display.get_surface() is not None:
+        surface = surface.convert()
+    if colorkey is not None:
+        surface.set_colorkey(colorkey)
+    return surface
+
+
+def cache_path(generator, args, seed, scale=1):
+    """Cache file for one texture, or None when caching is off.
+
+    The key covers the generator's name, the name and full contents of the
+    file it is defined in, its arguments, the seed, the fill backend, the
+    texture and render scales it is generated at and the contents of this
+    module.  Editing a generator, a
+    constant it reads or a fill helper invalidates its entries, and the key
+    is the same whether the scene runs on its own (as ``__main__``) or is
+    imported by the runner or ``bake.py``.
+    """
+    if not CACHE_DIR:
+        return None
+    try:
+        source_path = inspect.getsourcefile(generator)
+        source_digest = _file_digest(source_path)
+        module_digest = _file_digest(__file__)
+    except (OSError, TypeError):
+        return None
+    key = hashlib.sha1(repr((
+        os.path.basename(source_path), generator.__qualname__, source_digest,
+        args, seed, VECTORIZED, scale, canvas.SCALE, module_digest,
+    )).encode()).hexdigest()
+    return os.path.join(CACHE_DIR, f"{generator.__qualname__}-{key[:16]}{CACHE_SUFFIX}")
+
+
+def _file_digest(path):
+    digest = _file_digests.get(path)
+    if digest is None:
+        with open(path, "rb") as f:
+            digest = _file_digests[path] = hashlib.sha1(f.read()).hexdigest()
+    return digest
+
+
+def read_cached(path):
+    """Read a cached texture in raw form, or return None if it is missing or unreadable"""
+    try:
+        with open(path, "rb") as f:
+            data = f.read()
+        magic, width, height, keyed, r, g, b = _HEADER.unpack_from(data)
+    except (OSError, struct.error):
+        return None
+    if magic != _MAGIC or len(data) - _HEADER.size != width * height * 3:
+        return None
+    return (width, height), data[_HEADER.size:], (r, g, b) if keyed else None
+
+
+def load_cached(path):
+    """Load a cached texture, or return None if it is missing or unreadable"""
+    raw = read_cached(path)
+    return None if raw is None else from_raw(raw)
+
+
+def save_cached(path, raw):
+    """Write a raw texture to the cache, replacing any existing entry atomically"""
+    (width, height), pixels, colorkey = raw
+    header = _HEADER.pack(_MAGIC, width, height, colorkey is not None, *(colorkey or (0, 0, 0)))
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    temp_path = f"{path}.{os.getpid()}.tmp"
+    with open(temp_path, "wb") as f:
+        f.write(header)
+        f.write(pixels)
+    os.replace(temp_path, path)
+
+
+def _rng():
+    # Draw the NumPy seed from ``random`` so seeding the stdlib generator
+    # also fixes the vectorized fields.
+    return np.random.default_rng(random.getrandbits(64))
+
+
+def _ripple(width, height, ripple):
+    amplitude, freq_x, freq_y = ripple
+    x = canvas.unscaled(np.arange(width))[:, None]
+    y = canvas.unscaled(np.arange(height))[None, :]
+    return (amplitude * np.sin(x * freq_x) * np.cos(y * freq_y)).astype(int)
+
+
+def _row_colors(height, color, gradient):
+    bottom, strength = gradient
+    factor = np.arange(height)[:, None] / height
+    top = np.array(color)
+    return (top + (np.array(bottom) - top) * factor * strength).astype(int)
+
+
+def fill_noise(surface, color, spread, ripple=None, gradient=None):
+    """Fill a surface with a colour jittered per pixel.
+
+    Every pixel gets the same random offset in ``[-spread, spread]`` on all
+    three channels.  ``ripple`` is an ``(amplitude, freq_x, freq_y)`` triple
+    adding ``int(amplitude * sin(x * freq_x) * cos(y * freq_y))`` on top, and
+    ``gradient`` is a ``(bottom_color, strength)`` pair blending each row
+    from ``color`` towards ``bottom_color``.  Channels are clamped to 0-255.
+    Positions in the ripple are in scene units, so it keeps its look at any
+    canvas scale.
+    """
+    width, height = surface.get_size()
+
+    if VECTORIZED:
+        offset = np.zeros((width, height), dtype=int)
+        if spread:
+            offset += _rng().integers(-spread, spread + 1, size=(width, height))
+        if ripple:
+            offset += _ripple(width, height, ripple)
+        if gradient:
+            base = _row_colors(height, color, gradient)[None, :, :]
+        else:
+            base = np.array(color)[None, None, :]
+        pixels = np.clip(base + offset[:, :, None], 0, 255).astype(np.uint8)
+        pygame.surfarray.blit_array(surface, pixels)
+        return
+
+    for y in range(height):
+        if gradient:
+            bottom, strength = gradient
+            row_color = tuple(int(c + (b - c) * (y / height) * strength)
+                              for c, b in zip(color, bottom))
+        else:
+            row_color = color
+        for x in range(width):
+            variation = random.randint(-spread, spread) if spread else 0
+            if ripple:
+                amplitude, freq_x, freq_y = ripple
+                variation += int(amplitude * math.sin(canvas.unscaled(x) * freq_x)
+                                 * math.cos(canvas.unscaled(y) * freq_y))
+            surface.set_at((x, y), tuple(max(0, min(255, c + variation)) for c in row_color))
+
+
+def fill_wood_grain(surface, red, spread, lines):
+    """Fill a surface with wood grain and darken ``lines`` wavy grain lines.
+
+    The grain is ``int(10 * sin(y * 0.1) * cos(x * 0.05))`` plus a random
+    offset in ``[-spread, spread]`` on the red channel; green and blue follow
+    at 0.65 and 0.43 of it, with ``x`` and ``y`` in scene units.
+    """
+    width, height = surface.get_size()
+
+    if VECTORIZED:
+        rng = _rng()
+        x = canvas.unscaled(np.arange(width))[:, None]
+        y = canvas.unscaled(np.arange(height))[None, :]
+        grain = (10 * np.sin(y * 0.1) * np.cos(x * 0.05)).astype(int)
+        value = red + grain + rng.integers(-spread, spread + 1, size=(width, height))
+        pixels = np.stack((
+            np.clip(value, 50, 255),
+            np.clip((value * 0.65).astype(int), 40, 255),
+            np.clip((value * 0.43).astype(int), 20, 255),
+        ), axis=-1)
+
+        columns = np.arange(width)
+        for _ in range(lines):
+            line_y = random.randint(0, height)
+            line_darkness = random.randint(20, 40)
+            rows = line_y + canvas.length(3 * np.sin(canvas.unscaled(columns) * 0.02 + line_y)).astype(int)
+            inside = (rows >= 0) & (rows < height)
+            cols, rows = columns[inside], rows[inside]
+            pixels[cols, rows] = np.maximum(0, pixels[cols, rows] - line_darkness)
+
+        pygame.surfarray.blit_array(surface, pixels.astype(np.uint8))
+        return
+
+    for y in range(height):
+        for x in range(width):
+            grain = int(10 * math.sin(canvas.unscaled(y) * 0.1) * math.cos(canvas.unscaled(x) * 0.05))
+            noise = random.randint(-spread, spread)
+            color_val = red + grain + noise
+            surface.set_at((x, y), (
+                max(50, min(255, color_val)),
+                max(40, min(255, int(color_val * 0.65))),
+                max(20, min(255, int(color_val * 0.43)))
+            ))
+
+    for _ in range(lines):
+        line_y = random.randint(0, height)
+        line_darkness = random.randint(20, 40)
+        for x in range(width):
+            wave = int(canvas.length(3 * math.sin(canvas.unscaled(x) * 0.02 + line_y)))
+            y_pos = line_y + wave
+            if 0 <= y_pos < height:
+                current_color = surface.get_at((x, y_pos))
+                new_color = tuple(max(0, c - line_darkness) for c in current_color[:3])
+                surface.set_at((x, y_pos), new_color)
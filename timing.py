@@ -0,0 +1,79 @@
+"""Fixed-timestep simulation, decoupled from the render rate.
+
+The scenes' entities move by a fixed amount per update, so tying updates to
+rendered frames made the animation speed depend on the frame rate.  A
+:class:`FixedStep` turns elapsed time into a whole number of simulation
+steps at :data:`SIM_RATE` per second, and keeps the left-over fraction of a
+step so that drawing can interpolate between the last two states.
+
+Set ANIM_FPS to cap the render rate of every scene (0 for uncapped)
+without changing how fast the animation runs.
+"""
+import os
+
+# Simulation steps per second; the scenes' per-step speeds are tuned for it
+SIM_RATE = 60
+
+# Most steps run for one rendered frame; after a longer stall the simulation
+# slows down instead of trying to catch up all at once
+MAX_STEPS = 8
+
+
+def render_fps(default):
+    """The render rate cap for a scene: ANIM_FPS if set, else its own ``default``"""
+    value = os.environ.get("ANIM_FPS", "")
+    return int(value) if value else default
+
+
+def lerp(previous, current, alpha):
+    """The value ``alpha`` of the way from ``previous`` to ``current``"""
+    return previous + (current - previous) * alpha
+
+
+class FixedStep:
+    """An accumulator that runs a simulation at a fixed rate.
+
+    Each frame, call :meth:`advance` with the current time and run that many
+    updates, then draw with :attr:`alpha` as the interpolation factor
+    between the state before the last update and the state after it.
+    With ``max_steps`` set to None it never drops time, for clocks that
+    do not run in real time.
+    """
+
+    def __init__(self, rate=SIM_RATE, max_steps=MAX_STEPS):
+        self.step_ms = 1000 / rate
+        self.max_steps = max_steps
+        # Simulated time in ms: the time of the state after the last update
+        self.time = 0.0
+        self.steps = 0
+        self.accumulator = 0.0
+        self._last = None
+
+    def advance(self, now):
+        """Take the current time in ms; returns how many steps to simulate"""
+        if self._last is not None:
+            self.accumulator += now - self._last
+        self._last = now
+        steps = int(self.accumulator // self.step_ms)
+        if self.max_steps is not None and steps > self.max_steps:
+            steps = self.max_steps
+            self.accumulator = self.step_ms * steps
+        self.accumulator -= self.step_ms * steps
+        self.steps += steps
+        return steps
+
+    def step(self):
+        """The time in ms at the start of the next step; call once per update"""
+        time = self.time
+        self.time += self.step_ms
+        return time
+
+    @property
+    def alpha(self):
+        """How far the display is between the last two simulated states (0 to 1)"""
+        return self.accumulator / self.step_ms
+
+    @property
+    def render_time(self):
+        """The time in ms that the interpolated state shows"""
+        return max(0.0, self.time - self.step_ms + self.accumulator)
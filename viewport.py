@@ -0,0 +1,60 @@
+"""Show scenes at a window or output size other than the one they draw at.
+
+The scenes draw at a fixed resolution.  Set ANIM_WINDOW_SIZE=1920x1080 (or
+3840x2160, or 450x350 for a small screen) to run them in a window of that
+size instead: a scene draws on an offscreen canvas at its own resolution
+(or at ANIM_RENDER_SCALE times it, see :mod:`canvas`), and a
+:class:`Scaler` scales the canvas into the window once per frame,
+keeping its aspect ratio with black bars.  The scaled image is written
+straight into the same pixels of the window every frame, so scaling
+allocates nothing.  ``python render.py --size`` does the same for offline
+frames.
+
+Scaling is nearest-neighbour, which is cheap enough for every frame; set
+ANIM_SMOOTH_SCALE=1 for bilinear filtering.
+"""
+import os
+
+import pygame
+
+SMOOTH = os.environ.get("ANIM_SMOOTH_SCALE", "") == "1"
+
+BAR_COLOR = (0, 0, 0)
+
+
+def parse_size(value):
+    """``"1920x1080"`` as ``(1920, 1080)``; None for an empty string"""
+    if not value:
+        return None
+    width, height = value.lower().split("x")
+    return int(width), int(height)
+
+
+WINDOW_SIZE = parse_size(os.environ.get("ANIM_WINDOW_SIZE", ""))
+
+
+def fit(size, bounds):
+    """The largest rect with the aspect ratio of ``size`` centred in ``bounds``"""
+    scale = min(bounds[0] / size[0], bounds[1] / size[1])
+    rect = pygame.Rect(0, 0, round(size[0] * scale), round(size[1] * scale))
+    rect.center = (bounds[0] // 2, bounds[1] // 2)
+    return rect
+
+
+class Scaler:
+    """Scales a canvas into the middle of a target Surface"""
+
+    def __init__(self, canvas, target, smooth=None):
+        self.canvas = canvas
+        self.target = target
+        self.smooth = SMOOTH if smooth is None else smooth
+        self.rect = fit(canvas.get_size(), target.get_size())
+        target.fill(BAR_COLOR)
+        self._dest = target.subsurface(self.rect)
+
+    def scale(self):
+        """Draw the canvas, scaled, on the target"""
+        if self.smooth:
+            pygame.transform.smoothscale(self.canvas, self.rect.size, self._dest)
+        else:
+            pygame.transform.scale(self.canvas, self.rect.size, self._dest)